@@ -0,0 +1,17 @@
+{
+    'name': 'Ієрархія компаній',
+    'version': '18.0.1.0.0',
+    'summary': 'Спільний сервіс визначення головних та дочірніх компаній',
+    'description': '''
+        Спільний кешований сервіс для роботи з ієрархією компаній:
+        - Головна компанія та всі дочірні компанії одним запитом по parent_path
+        - Кешування результатів з очищенням при зміні структури компаній
+    ''',
+    'category': 'Hidden',
+    'author': 'Петровський Юрій',
+    'depends': ['base'],
+    'data': [],
+    'installable': True,
+    'application': False,
+    'license': 'LGPL-3',
+}
@@ -0,0 +1,54 @@
+from odoo import models, api, tools
+
+
+class ResCompany(models.Model):
+    _inherit = 'res.company'
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_hierarchy_company_ids(self, company_id):
+        """Повертає ID компанії та всіх її дочірніх компаній (один запит по parent_path)"""
+        return tuple(self.sudo().search([('id', 'child_of', company_id)]).ids)
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_root_company_id(self, company_id):
+        """Повертає ID головної компанії для вказаної компанії"""
+        company = self.sudo().browse(company_id)
+        return int(company.parent_path.split('/')[0]) if company.parent_path else company.id
+
+    def _get_child_company_ids(self, include_self=True):
+        """Повертає список ID компаній та всіх їх дочірніх компаній"""
+        company_ids = []
+        for company in self:
+            for company_id in self._get_hierarchy_company_ids(company.id):
+                if company_id not in company_ids and (include_self or company_id != company.id):
+                    company_ids.append(company_id)
+        return company_ids
+
+    def _get_root_company(self):
+        """Повертає головну компанію"""
+        self.ensure_one()
+        return self.browse(self._get_root_company_id(self.id))
+
+    @api.model
+    def _get_main_companies(self, company_ids):
+        """Повертає головні компанії серед вказаних"""
+        return self.browse(company_ids).filtered(lambda c: not c.parent_id)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        companies = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return companies
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'parent_id' in vals or 'active' in vals:
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
@@ -1,6 +1,6 @@
 {
     'name': 'Прихідні накладні',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.1.0',
     'category': 'Warehouse Management',
     'summary': 'Модуль для роботи з прихідними накладними',
     'description': '''
@@ -21,6 +21,7 @@
         'stock',
         'product',
         'mail',
+        'company_hierarchy',
         'web',
         'network_directory', 
         'district_directory', 
@@ -0,0 +1,3 @@
+def migrate(cr, version):
+    """Видаляємо тимчасову таблицю stock_receipt_documents_line - тепер це SQL view"""
+    cr.execute("DROP TABLE IF EXISTS stock_receipt_documents_line CASCADE")
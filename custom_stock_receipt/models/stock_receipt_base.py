@@ -163,20 +163,26 @@ class StockReceiptBase(models.AbstractModel):
             }
         }
 
-    def _do_posting(self, posting_time, custom_datetime=None):
-        """Виконує проведення документа з вказаним часом"""
-        self.ensure_one()
-        
+    def _get_posting_lines(self):
+        """Повертає позиції, які обробляє проведення документа"""
+        return getattr(self, self._get_lines_field())
+
+    def _get_posting_datetime(self, posting_time, custom_datetime=None):
+        """Повертає дату та час проведення для вибраного варіанту"""
         doc_date = self.date
-        
         if posting_time == 'start_of_day':
-            posting_datetime = datetime.combine(doc_date, time(7, 0, 0))
+            return datetime.combine(doc_date, time(7, 0, 0))
         elif posting_time == 'end_of_day':
-            posting_datetime = datetime.combine(doc_date, time(23, 0, 0))
+            return datetime.combine(doc_date, time(23, 0, 0))
         elif posting_time == 'custom_time' and custom_datetime:
-            posting_datetime = custom_datetime
-        else:
-            posting_datetime = fields.Datetime.now()
+            return custom_datetime
+        return fields.Datetime.now()
+
+    def _do_posting(self, posting_time, custom_datetime=None):
+        """Виконує проведення документа з вказаним часом"""
+        self.ensure_one()
+        
+        posting_datetime = self._get_posting_datetime(posting_time, custom_datetime)
         
         self.write({
             'state': 'posted',
@@ -245,17 +251,13 @@ class StockReceiptBase(models.AbstractModel):
         else:
             companies = self.env.company
         
-        child_company_ids = set()
-        for company in companies:
-            child_company_ids.update(company.child_ids.ids)
-        
-        _logger.info(f"Allowed company IDs: {allowed_company_ids}")
-        _logger.info(f"Found child company IDs: {child_company_ids}")
+        child_company_ids = companies._get_child_company_ids(include_self=False)
+        _logger.debug("Allowed company IDs: %s, child company IDs: %s", allowed_company_ids, child_company_ids)
         
         if child_company_ids:
-            return [('id', 'in', list(child_company_ids))]
+            return [('id', 'in', child_company_ids)]
         else:
-            _logger.warning("No child companies found")
+            _logger.debug("No child companies found")
             return [('id', '=', False)]
 
     @api.onchange('company_id')
@@ -6,65 +6,6 @@ import logging
 _logger = logging.getLogger(__name__)
 
 
-class ResCompany(models.Model):
-    _inherit = 'res.company'
-
-    @api.model
-    def name_search(self, name='', args=None, operator='ilike', limit=100):
-        args = args or []
-        context = self.env.context
-        
-        # Перевіряємо, чи виклик походить від stock.receipt.disposal
-        if context.get('_get_child_companies_domain') == 'stock.receipt.disposal,_get_child_companies_domain':
-            _logger.info("Custom name_search for stock.receipt.disposal triggered")
-            # Отримуємо компанії з контексту
-            allowed_company_ids = context.get('allowed_company_ids', [])
-            child_company_ids = set()
-            if allowed_company_ids:
-                companies = self.browse(allowed_company_ids)
-                for company in companies:
-                    child_company_ids.update(company.child_ids.ids)
-            else:
-                child_company_ids.update(self.env.company.child_ids.ids)
-            
-            # Формуємо домен тільки для дочірніх компаній
-            domain = [('id', 'in', list(child_company_ids))] if child_company_ids else [('id', '=', False)]
-            if name:
-                domain += ['|', ('name', operator, name), ('display_name', operator, name)]
-            
-            _logger.info(f"Custom name_search domain: {domain}")
-            # Виконуємо пошук і повертаємо список кортежів (id, name)
-            companies = self.search(domain + args, limit=limit)
-            return [(company.id, company.display_name) for company in companies]
-        
-        # Перевіряємо, чи виклик походить від stock.receipt.incoming (існуюча логіка)
-        elif context.get('_get_child_companies_domain') == 'stock.receipt.incoming,_get_child_companies_domain':
-            _logger.info("Custom name_search for stock.receipt.incoming triggered")
-            # Отримуємо компанії з контексту
-            allowed_company_ids = context.get('allowed_company_ids', [])
-            child_company_ids = set()
-            if allowed_company_ids:
-                companies = self.browse(allowed_company_ids)
-                for company in companies:
-                    child_company_ids.update(company.child_ids.ids)
-            else:
-                child_company_ids.update(self.env.company.child_ids.ids)
-            
-            # Формуємо домен тільки для дочірніх компаній
-            domain = [('id', 'in', list(child_company_ids))] if child_company_ids else [('id', '=', False)]
-            if name:
-                domain += ['|', ('name', operator, name), ('display_name', operator, name)]
-            
-            _logger.info(f"Custom name_search domain: {domain}")
-            # Виконуємо пошук і повертаємо список кортежів (id, name)
-            companies = self.search(domain + args, limit=limit)
-            return [(company.id, company.display_name) for company in companies]
-        
-        # Для інших випадків викликаємо стандартну логіку
-        _logger.info("Falling back to super name_search")
-        return super(ResCompany, self).name_search(name, args, operator, limit)
-
-
 class StockReceiptDisposal(models.Model):
     _name = 'stock.receipt.disposal'
     _description = 'Акт оприходування'
@@ -319,20 +260,26 @@ class StockReceiptDisposal(models.Model):
             }
         }
 
-    def _do_posting(self, posting_time, custom_datetime=None):
-        """Виконує проведення документа з вказаним часом"""
-        self.ensure_one()
-        
+    def _get_posting_lines(self):
+        """Повертає позиції, які обробляє проведення документа"""
+        return self.line_ids
+
+    def _get_posting_datetime(self, posting_time, custom_datetime=None):
+        """Повертає дату та час проведення для вибраного варіанту"""
         doc_date = self.date
-        
         if posting_time == 'start_of_day':
-            posting_datetime = datetime.combine(doc_date, time(0, 0, 0))
+            return datetime.combine(doc_date, time(0, 0, 0))
         elif posting_time == 'end_of_day':
-            posting_datetime = datetime.combine(doc_date, time(23, 59, 59))
+            return datetime.combine(doc_date, time(23, 59, 59))
         elif posting_time == 'custom_time' and custom_datetime:
-            posting_datetime = custom_datetime
-        else:
-            posting_datetime = fields.Datetime.now()
+            return custom_datetime
+        return fields.Datetime.now()
+
+    def _do_posting(self, posting_time, custom_datetime=None):
+        """Виконує проведення документа з вказаним часом"""
+        self.ensure_one()
+        
+        posting_datetime = self._get_posting_datetime(posting_time, custom_datetime)
         
         self.write({
             'state': 'posted',
@@ -401,17 +348,13 @@ class StockReceiptDisposal(models.Model):
         else:
             companies = self.env.company
         
-        child_company_ids = set()
-        for company in companies:
-            child_company_ids.update(company.child_ids.ids)
-        
-        _logger.info(f"Allowed company IDs: {allowed_company_ids}")
-        _logger.info(f"Found child company IDs: {child_company_ids}")
+        child_company_ids = companies._get_child_company_ids(include_self=False)
+        _logger.debug("Allowed company IDs: %s, child company IDs: %s", allowed_company_ids, child_company_ids)
         
         if child_company_ids:
-            return [('id', 'in', list(child_company_ids))]
+            return [('id', 'in', child_company_ids)]
         else:
-            _logger.warning("No child companies found")
+            _logger.debug("No child companies found")
             return [('id', '=', False)]
 
     @api.onchange('company_id')
@@ -605,17 +548,17 @@ class StockDisposalPostingWizard(models.TransientModel):
                 if not (0 <= wizard.custom_minute <= 59):
                     raise ValidationError('Хвилина має бути від 0 до 59!')
 
+    def _get_custom_datetime(self):
+        """Повертає власний час проведення на дату документа"""
+        if self.posting_time != 'custom_time':
+            return None
+        return datetime.combine(
+            self.disposal_id.date, 
+            time(self.custom_hour, self.custom_minute, 0)
+        )
+
     def action_confirm_posting(self):
         """Підтверджує проведення з вибраним часом"""
         self.ensure_one()
-        
-        custom_datetime = None
-        if self.posting_time == 'custom_time':
-            doc_date = self.disposal_id.date
-            custom_datetime = datetime.combine(
-                doc_date, 
-                time(self.custom_hour, self.custom_minute, 0)
-            )
-        
-        self.disposal_id._do_posting(self.posting_time, custom_datetime)
+        self.disposal_id._do_posting(self.posting_time, self._get_custom_datetime())
         return {'type': 'ir.actions.act_window_close'}
\ No newline at end of file
@@ -178,19 +178,17 @@ class StockReceiptPostingWizard(models.TransientModel):
                 if not (0 <= wizard.custom_minute <= 59):
                     raise ValidationError('Хвилина має бути від 0 до 59!')
 
+    def _get_custom_datetime(self):
+        """Повертає власний час проведення на дату документа"""
+        if self.posting_time != 'custom_time':
+            return None
+        return datetime.combine(
+            self.receipt_id.date, 
+            time(self.custom_hour, self.custom_minute, 0)
+        )
+
     def action_confirm_posting(self):
         """Підтверджує проведення з вибраним часом"""
         self.ensure_one()
-        
-        document = self.receipt_id
-        
-        custom_datetime = None
-        if self.posting_time == 'custom_time':
-            doc_date = document.date
-            custom_datetime = datetime.combine(
-                doc_date, 
-                time(self.custom_hour, self.custom_minute, 0)
-            )
-        
-        document._do_posting(self.posting_time, custom_datetime)
+        self.receipt_id._do_posting(self.posting_time, self._get_custom_datetime())
         return {'type': 'ir.actions.act_window_close'}
\ No newline at end of file
@@ -2,6 +2,7 @@ from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
 from .utils import parse_serial_numbers, format_serial_numbers, validate_serial_numbers
 import logging
+from collections import Counter
 
 _logger = logging.getLogger(__name__)
 
@@ -254,21 +255,20 @@ class StockReceiptSerialWizardLineBase(models.AbstractModel):
     @api.depends('serial_number', 'wizard_id.serial_line_ids.serial_number')
     def _compute_is_duplicate(self):
         """Перевіряє, чи є серійний номер дублікатом в межах wizard"""
+        counters = {}
         for line in self:
-            if line.serial_number:
-                other_lines = line.wizard_id.serial_line_ids.filtered(lambda l: l.id != line.id)
-                line.is_duplicate = line.serial_number in other_lines.mapped('serial_number')
-            else:
-                line.is_duplicate = False
+            if line.wizard_id not in counters:
+                counters[line.wizard_id] = Counter(
+                    line.wizard_id.serial_line_ids.filtered('serial_number').mapped('serial_number')
+                )
+            line.is_duplicate = bool(line.serial_number) and counters[line.wizard_id][line.serial_number] > 1
 
     @api.depends('serial_number')
     def _compute_is_existing(self):
-        """Перевіряє, чи існує серійний номер в системі"""
+        """Перевіряє, чи існує серійний номер в системі (один запит на всі рядки)"""
+        existing = {}
+        serials = [line.serial_number for line in self if line.serial_number]
+        if serials and 'stock.serial' in self.env:
+            existing = self.env['stock.serial']._get_serial_conflicts(serials)
         for line in self:
-            if line.serial_number:
-                existing = self.env['stock.balance'].search([
-                    ('serial_numbers', 'ilike', line.serial_number)
-                ], limit=1)
-                line.is_existing = bool(existing)
-            else:
-                line.is_existing = False
\ No newline at end of file
+            line.is_existing = bool(line.serial_number) and line.serial_number in existing
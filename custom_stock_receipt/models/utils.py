@@ -2,6 +2,7 @@
 Загальні утиліти для модуля custom_stock_receipt
 """
 import logging
+from collections import Counter
 
 _logger = logging.getLogger(__name__)
 
@@ -173,31 +174,22 @@ def validate_serial_numbers(env, serials_list, current_nomenclature_id, exclude_
     if not serials_list:
         return True, []
     
-    exclude_balance_ids = exclude_balance_ids or []
-    
     # Перевірка на дублікати в межах списку
-    unique_serials = list(set(serials_list))
-    if len(serials_list) != len(unique_serials):
-        duplicates = [serial for serial in serials_list if serials_list.count(serial) > 1]
-        return False, [f'Знайдено дублікати серійних номерів: {", ".join(set(duplicates))}']
+    duplicates = [serial for serial, count in Counter(serials_list).items() if count > 1]
+    if duplicates:
+        return False, [f'Знайдено дублікати серійних номерів: {", ".join(duplicates)}']
     
-    # Перевірка на існування в системі
-    if env.get('stock.balance'):
-        existing_serials = env['stock.balance'].search([
-            ('serial_numbers', 'ilike', serials_list[0]),
-            ('id', 'not in', exclude_balance_ids)
-        ])
-        
-        conflicts = []
-        for balance in existing_serials:
-            if balance.serial_numbers:
-                balance_serials = parse_serial_numbers(balance.serial_numbers)
-                for serial in serials_list:
-                    if serial in balance_serials and balance.nomenclature_id.id != current_nomenclature_id:
-                        conflicts.append(f"{serial} (вже в {balance.nomenclature_id.name})")
-        
+    # Перевірка на існування в системі (один запит до реєстру серійних номерів)
+    if 'stock.serial' in env:
+        conflicts = env['stock.serial']._get_serial_conflicts(
+            serials_list, current_nomenclature_id, exclude_balance_ids
+        )
         if conflicts:
-            return False, [f'Серійні номери вже використовуються:\n{chr(10).join(conflicts)}']
+            lines = [
+                f"{serial} (вже в {', '.join(conflicts[serial].mapped('nomenclature_id.name'))})"
+                for serial in serials_list if serial in conflicts
+            ]
+            return False, [f'Серійні номери вже використовуються:\n{chr(10).join(lines)}']
     
     return True, []
 
@@ -24,14 +24,10 @@ class District(models.Model):
         """Повертає першу головну компанію з вибраних користувачем"""
         allowed_company_ids = self.env.context.get('allowed_company_ids', [])
         if allowed_company_ids:
-            allowed_companies = self.env['res.company'].browse(allowed_company_ids)
-            main_companies = allowed_companies.filtered(lambda c: not c.parent_id)
+            main_companies = self.env['res.company']._get_main_companies(allowed_company_ids)
             if main_companies:
                 return main_companies[0]
-        company = self.env.company
-        while company.parent_id:
-            company = company.parent_id
-        return company
+        return self.env.company._get_root_company()
 
     @api.model
     def fields_view_get(self, view_id=None, view_type='form', toolbar=False, submenu=False):
@@ -39,13 +35,12 @@ class District(models.Model):
         res = super().fields_view_get(view_id, view_type, toolbar, submenu)
         if view_type == 'list':
             allowed_company_ids = self.env.context.get('allowed_company_ids', [])
-            _logger.info(f"District.fields_view_get: allowed_company_ids = {allowed_company_ids}")
+            _logger.debug("District.fields_view_get: allowed_company_ids = %s", allowed_company_ids)
             if allowed_company_ids:
                 try:
                     doc = etree.XML(res['arch'])
-                    allowed_companies = self.env['res.company'].browse(allowed_company_ids)
-                    main_companies = allowed_companies.filtered(lambda c: not c.parent_id)
-                    _logger.info(f"District.fields_view_get: main_companies = {main_companies.mapped('name')}")
+                    main_companies = self.env['res.company']._get_main_companies(allowed_company_ids)
+                    _logger.debug("District.fields_view_get: main_companies = %s", main_companies.ids)
                     if main_companies:
                         domain = [('parent_id', '=', False), ('id', 'in', main_companies.ids)]
                         for field_node in doc.xpath("//field[@name='company_id']"):
@@ -54,7 +49,7 @@ class District(models.Model):
                             if len(main_companies) == 1:
                                 field_node.set('readonly', '1')
                         res['arch'] = etree.tostring(doc, encoding='unicode')
-                        _logger.info(f"District: Applied domain {domain} for company_id")
+                        _logger.debug("District: Applied domain %s for company_id", domain)
                 except Exception as e:
                     _logger.error(f"District fields_view_get error: {e}")
         return res
@@ -84,12 +79,11 @@ class ResCompanyInherit(models.Model):
     @api.model
     def name_search(self, name='', args=None, operator='ilike', limit=100):
         """Фільтруємо компанії при пошуку"""
-        _logger.info(f"ResCompany.name_search called: name='{name}', args={args}, context={self.env.context}")
+        _logger.debug("ResCompany.name_search called: name=%r, args=%s", name, args)
         allowed_company_ids = self.env.context.get('allowed_company_ids', [])
         if allowed_company_ids:
-            allowed_companies = self.env['res.company'].browse(allowed_company_ids)
-            main_companies = allowed_companies.filtered(lambda c: not c.parent_id)
-            _logger.info(f"ResCompany.name_search: allowed_company_ids={allowed_company_ids}, main_companies={main_companies.mapped('name')}")
+            main_companies = self.env['res.company']._get_main_companies(allowed_company_ids)
+            _logger.debug("ResCompany.name_search: allowed_company_ids=%s, main_companies=%s", allowed_company_ids, main_companies.ids)
             if main_companies:
                 if args is None:
                     args = []
@@ -97,5 +91,5 @@ class ResCompanyInherit(models.Model):
                     ('parent_id', '=', False),
                     ('id', 'in', main_companies.ids)
                 ]
-                _logger.info(f"ResCompany.name_search: Modified args = {args}")
+                _logger.debug("ResCompany.name_search: Modified args = %s", args)
         return super().name_search(name=name, args=args, operator=operator, limit=limit)
\ No newline at end of file
@@ -27,17 +27,12 @@ class Network(models.Model):
         allowed_company_ids = self.env.context.get('allowed_company_ids', [])
         
         if allowed_company_ids:
-            # Шукаємо головні компанії серед дозволених
-            allowed_companies = self.env['res.company'].browse(allowed_company_ids)
-            main_companies = allowed_companies.filtered(lambda c: not c.parent_id)
+            main_companies = self.env['res.company']._get_main_companies(allowed_company_ids)
             if main_companies:
                 return main_companies[0]
         
         # Fallback - поточна головна компанія
-        company = self.env.company
-        while company.parent_id:
-            company = company.parent_id
-        return company
+        return self.env.company._get_root_company()
 
     @api.model
     def fields_view_get(self, view_id=None, view_type='form', toolbar=False, submenu=False):
@@ -46,16 +41,14 @@ class Network(models.Model):
 
         if view_type in ['form', 'tree', 'list']:
             allowed_company_ids = self.env.context.get('allowed_company_ids', [])
-            _logger.info(f"Network.fields_view_get: allowed_company_ids = {allowed_company_ids}")
+            _logger.debug("Network.fields_view_get: allowed_company_ids = %s", allowed_company_ids)
             
             if allowed_company_ids:
                 try:
                     doc = etree.XML(res['arch'])
                     
-                    # Знаходимо головні компанії з дозволених
-                    allowed_companies = self.env['res.company'].browse(allowed_company_ids)
-                    main_companies = allowed_companies.filtered(lambda c: not c.parent_id)
-                    _logger.info(f"Network.fields_view_get: main_companies = {main_companies.mapped('name')}")
+                    main_companies = self.env['res.company']._get_main_companies(allowed_company_ids)
+                    _logger.debug("Network.fields_view_get: main_companies = %s", main_companies.ids)
                     
                     if main_companies:
                         # Формуємо домен: тільки головні + тільки з дозволених
@@ -71,7 +64,7 @@ class Network(models.Model):
                                 field_node.set('readonly', '1')
                         
                         res['arch'] = etree.tostring(doc, encoding='unicode')
-                        _logger.info(f"Network: Applied domain {domain} for company_id")
+                        _logger.debug("Network: Applied domain %s for company_id", domain)
                         
                 except Exception as e:
                     _logger.error(f"Network fields_view_get error: {e}")
@@ -105,7 +98,7 @@ class ResCompanyInherit(models.Model):
     @api.model
     def name_search(self, name='', args=None, operator='ilike', limit=100):
         """Фільтруємо компанії при пошуку, але враховуємо контекст моделі"""
-        _logger.info(f"ResCompany.name_search called: name='{name}', args={args}, context={self.env.context}")
+        _logger.debug("ResCompany.name_search called: name=%r, args=%s", name, args)
         
         # Отримуємо allowed_company_ids з контексту
         allowed_company_ids = self.env.context.get('allowed_company_ids', [])
@@ -114,9 +107,8 @@ class ResCompanyInherit(models.Model):
         is_stock_receipt = self.env.context.get('default_model') == 'stock.receipt.incoming'
         
         if allowed_company_ids and not is_stock_receipt:
-            allowed_companies = self.env['res.company'].browse(allowed_company_ids)
-            main_companies = allowed_companies.filtered(lambda c: not c.parent_id)
-            _logger.info(f"ResCompany.name_search: allowed_company_ids={allowed_company_ids}, main_companies={main_companies.mapped('name')}")
+            main_companies = self.env['res.company']._get_main_companies(allowed_company_ids)
+            _logger.debug("ResCompany.name_search: allowed_company_ids=%s, main_companies=%s", allowed_company_ids, main_companies.ids)
             
             if main_companies:
                 # Додаємо фільтр до args лише якщо не stock.receipt.incoming
@@ -127,6 +119,6 @@ class ResCompanyInherit(models.Model):
                     ('parent_id', '=', False),
                     ('id', 'in', main_companies.ids)
                 ]
-                _logger.info(f"ResCompany.name_search: Modified args = {args}")
+                _logger.debug("ResCompany.name_search: Modified args = %s", args)
         
         return super().name_search(name=name, args=args, operator=operator, limit=limit)
\ No newline at end of file
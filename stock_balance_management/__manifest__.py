@@ -1,6 +1,6 @@
 {
     'name': 'Управління залишками',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.10.0',
     'category': 'Inventory/Inventory',
     'summary': 'Централізована система обліку залишків товарів',
     'description': '''
@@ -15,6 +15,10 @@
         - Облік товарів у працівників
         - Облік серійних номерів
         - Інформативний перегляд серійних номерів
+        - Щоденні знімки залишків для швидкого залишку на дату
+        - Оборотна відомість (PDF / XLSX)
+        - Нічна звірка залишків з журналом рухів
+        - Перебудова залишків з журналу рухів
     ''',
     'author': 'Петровський Юрій',
     'depends': [
@@ -27,12 +31,23 @@
     ],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron.xml',
         'views/stock_balance_views.xml',
+        'views/stock_serial_views.xml',
         'views/stock_balance_wizard_views.xml',
         'views/stock_balance_serial_wizard_views.xml',
+        'views/stock_transfer_views.xml',
+        'views/stock_balance_snapshot_views.xml',
+        'views/stock_turnover_report_views.xml',
+        'views/stock_balance_reconciliation_views.xml',
+        'views/stock_balance_movement_archive_views.xml',
         'views/menu_views.xml',
         'reports/stock_balance_reports.xml',
+        'reports/stock_turnover_report.xml',
     ],
+    'external_dependencies': {
+        'python': ['openpyxl'],
+    },
     'installable': True,
     'auto_install': False,
     'application': True,
@@ -0,0 +1,91 @@
+def _column_exists(cr, table, column):
+    cr.execute("""
+        SELECT EXISTS (
+            SELECT FROM information_schema.columns
+            WHERE table_name = %s AND column_name = %s
+        );
+    """, (table, column))
+    return cr.fetchone()[0]
+
+
+def migrate(cr, version):
+    """Переносимо серійні номери з текстових полів у реєстр stock_serial"""
+
+    # Серійні номери на залишках: при дублікатах перевага запису з наявністю та свіжим оновленням
+    if _column_exists(cr, 'stock_balance', 'serial_numbers'):
+        cr.execute("""
+            INSERT INTO stock_serial (
+                name, nomenclature_id, balance_id, batch_id, company_id,
+                location_type, warehouse_id, employee_id, location_id,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT DISTINCT ON (sb.nomenclature_id, serial.name)
+                serial.name, sb.nomenclature_id, sb.id, sb.batch_id, sb.company_id,
+                sb.location_type, sb.warehouse_id, sb.employee_id, sb.location_id,
+                1, NOW() AT TIME ZONE 'UTC', 1, NOW() AT TIME ZONE 'UTC'
+            FROM stock_balance sb
+            CROSS JOIN LATERAL (
+                SELECT btrim(part) AS name
+                FROM regexp_split_to_table(sb.serial_numbers, E'[\\n,]') AS part
+            ) serial
+            WHERE sb.serial_numbers IS NOT NULL
+              AND serial.name <> ''
+            ORDER BY sb.nomenclature_id, serial.name,
+                     (sb.qty_on_hand > 0) DESC, sb.last_update DESC NULLS LAST, sb.id DESC
+            ON CONFLICT (nomenclature_id, name) DO NOTHING;
+        """)
+
+    # Серійні номери партій: доповнюємо прив'язку до партії
+    if _column_exists(cr, 'stock_batch', 'serial_numbers'):
+        cr.execute("""
+            INSERT INTO stock_serial (
+                name, nomenclature_id, batch_id, company_id,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT DISTINCT ON (b.nomenclature_id, serial.name)
+                serial.name, b.nomenclature_id, b.id, b.company_id,
+                1, NOW() AT TIME ZONE 'UTC', 1, NOW() AT TIME ZONE 'UTC'
+            FROM stock_batch b
+            CROSS JOIN LATERAL (
+                SELECT btrim(part) AS name
+                FROM regexp_split_to_table(b.serial_numbers, E'[\\n,]') AS part
+            ) serial
+            WHERE b.serial_numbers IS NOT NULL
+              AND serial.name <> ''
+            ORDER BY b.nomenclature_id, serial.name, b.id DESC
+            ON CONFLICT (nomenclature_id, name)
+            DO UPDATE SET batch_id = COALESCE(stock_serial.batch_id, EXCLUDED.batch_id);
+        """)
+
+    # Серійні номери рухів: реєструємо відсутні та заповнюємо зв'язок рух-серійний номер
+    if _column_exists(cr, 'stock_balance_movement', 'serial_numbers'):
+        cr.execute("""
+            CREATE TEMPORARY TABLE tmp_movement_serial ON COMMIT DROP AS
+            SELECT DISTINCT m.id AS movement_id, m.nomenclature_id, m.batch_id,
+                   m.company_id, btrim(part) AS name
+            FROM stock_balance_movement m
+            CROSS JOIN LATERAL regexp_split_to_table(m.serial_numbers, E'[\\n,]') AS part
+            WHERE m.serial_numbers IS NOT NULL
+              AND btrim(part) <> '';
+        """)
+        cr.execute("""
+            INSERT INTO stock_serial (
+                name, nomenclature_id, batch_id, company_id,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT DISTINCT ON (t.nomenclature_id, t.name)
+                t.name, t.nomenclature_id, t.batch_id, t.company_id,
+                1, NOW() AT TIME ZONE 'UTC', 1, NOW() AT TIME ZONE 'UTC'
+            FROM tmp_movement_serial t
+            ORDER BY t.nomenclature_id, t.name, t.movement_id DESC
+            ON CONFLICT (nomenclature_id, name) DO NOTHING;
+        """)
+        cr.execute("""
+            INSERT INTO stock_balance_movement_serial_rel (movement_id, serial_id)
+            SELECT DISTINCT t.movement_id, s.id
+            FROM tmp_movement_serial t
+            JOIN stock_serial s ON s.nomenclature_id = t.nomenclature_id AND s.name = t.name
+            ON CONFLICT DO NOTHING;
+        """)
+
+    cr.execute("ANALYZE stock_serial;")
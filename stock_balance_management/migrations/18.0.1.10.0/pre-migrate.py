@@ -0,0 +1,7 @@
+def migrate(cr, version):
+    """
+    Межа знімка тепер зберігається (date_end). Для наявних знімків вона невідома - вони були
+    створені в часовому поясі користувача cron, тому видаляємо їх: залишки на дату рахуються
+    з журналу рухів, а нові знімки створює cron.
+    """
+    cr.execute("DELETE FROM stock_balance_snapshot")
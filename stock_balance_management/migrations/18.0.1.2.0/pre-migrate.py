@@ -0,0 +1,58 @@
+def migrate(cr, version):
+    """Об'єднуємо дублікати залишків перед створенням унікального індексу stock_balance_key_uniq"""
+
+    # Обмеження unique_balance_record не спрацьовує для NULL (склад/працівник/партія),
+    # тому в таблиці можуть бути дублікати одного ключа
+    cr.execute("""
+        CREATE TEMPORARY TABLE tmp_balance_duplicates ON COMMIT DROP AS
+        SELECT id, keep_id
+        FROM (
+            SELECT id, MIN(id) OVER (
+                PARTITION BY nomenclature_id, location_type, COALESCE(warehouse_id, 0),
+                             COALESCE(location_id, 0), COALESCE(employee_id, 0),
+                             COALESCE(batch_id, 0), company_id
+            ) AS keep_id
+            FROM stock_balance
+        ) ranked
+        WHERE id <> keep_id;
+    """)
+    cr.execute("SELECT COUNT(*) FROM tmp_balance_duplicates")
+    if not cr.fetchone()[0]:
+        return
+
+    cr.execute("""
+        UPDATE stock_balance keep
+        SET qty_on_hand = keep.qty_on_hand + dup.qty,
+            qty_available = keep.qty_on_hand + dup.qty
+        FROM (
+            SELECT d.keep_id, SUM(b.qty_on_hand) AS qty
+            FROM tmp_balance_duplicates d
+            JOIN stock_balance b ON b.id = d.id
+            GROUP BY d.keep_id
+        ) dup
+        WHERE keep.id = dup.keep_id;
+    """)
+    cr.execute("""
+        UPDATE stock_balance_movement m
+        SET balance_id = d.keep_id
+        FROM tmp_balance_duplicates d
+        WHERE m.balance_id = d.id;
+    """)
+    cr.execute("""
+        SELECT EXISTS (
+            SELECT FROM information_schema.tables
+            WHERE table_name = 'stock_serial'
+        );
+    """)
+    if cr.fetchone()[0]:
+        cr.execute("""
+            UPDATE stock_serial s
+            SET balance_id = d.keep_id
+            FROM tmp_balance_duplicates d
+            WHERE s.balance_id = d.id;
+        """)
+    cr.execute("""
+        DELETE FROM stock_balance b
+        USING tmp_balance_duplicates d
+        WHERE b.id = d.id;
+    """)
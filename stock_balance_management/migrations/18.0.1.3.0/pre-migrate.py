@@ -0,0 +1,10 @@
+def migrate(cr, version):
+    """Заповнюємо ключ FIFO залишків одним UPDATE замість пересчету ORM по записах"""
+    cr.execute("""
+        ALTER TABLE stock_balance ADD COLUMN IF NOT EXISTS fifo_date timestamp without time zone;
+        UPDATE stock_balance sb
+        SET fifo_date = batch.date_created
+        FROM stock_batch batch
+        WHERE batch.id = sb.batch_id
+          AND sb.fifo_date IS DISTINCT FROM batch.date_created;
+    """)
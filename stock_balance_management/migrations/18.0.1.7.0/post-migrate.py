@@ -0,0 +1,7 @@
+def migrate(cr, version):
+    """Залишок до/після рахується віконною функцією при читанні - видаляємо збережені колонки"""
+    cr.execute("""
+        ALTER TABLE stock_balance_movement
+            DROP COLUMN IF EXISTS balance_before,
+            DROP COLUMN IF EXISTS balance_after;
+    """)
@@ -1,7 +1,14 @@
+from . import stock_serial
 from . import stock_balance
 from . import stock_balance_movement
+from . import stock_balance_movement_archive
+from . import stock_balance_snapshot
+from . import stock_balance_reconciliation
+from . import product_nomenclature
+from . import stock_batch
 from . import stock_balance_wizard
+from . import stock_turnover_report
 from . import stock_balance_integration
-from . import stock_serial_report      
+from . import stock_serial_report
 from . import stock_receipt_integration
 from . import stock_balance_serial_wizard
\ No newline at end of file
@@ -0,0 +1,63 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.osv import expression
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class ProductNomenclature(models.Model):
+    _inherit = 'product.nomenclature'
+
+    balance_ids = fields.One2many(
+        'stock.balance',
+        'nomenclature_id',
+        'Залишки'
+    )
+
+    is_available_in_source = fields.Boolean(
+        'Доступна у відправника',
+        compute='_compute_is_available_in_source',
+        search='_search_is_available_in_source',
+        help='Наявність позитивного залишку в локації відправника з контексту переміщення'
+    )
+
+    @api.model
+    def _get_source_balance_domain(self):
+        """Повертає домен залишків локації відправника з контексту (або None, якщо її не вибрано)"""
+        context = self.env.context
+        transfer_type = context.get('balance_transfer_type')
+        if transfer_type in ['warehouse', 'warehouse_employee']:
+            location_type, field_name, location_id = 'warehouse', 'warehouse_id', context.get('balance_warehouse_id')
+        elif transfer_type in ['employee', 'employee_warehouse']:
+            location_type, field_name, location_id = 'employee', 'employee_id', context.get('balance_employee_id')
+        else:
+            return None
+        if not location_id:
+            return None
+        company = self.env['res.company'].browse(context.get('balance_company_id') or self.env.company.id)
+        return [
+            ('qty_available', '>', 0),
+            ('location_type', '=', location_type),
+            (field_name, '=', location_id),
+            ('company_id', 'in', company._get_child_company_ids()),
+        ]
+
+    def _compute_is_available_in_source(self):
+        available_ids = set(self.search([
+            ('id', 'in', self.ids),
+            ('is_available_in_source', '=', True),
+        ]).ids) if self.ids else set()
+        for nomenclature in self:
+            nomenclature.is_available_in_source = nomenclature.id in available_ids
+
+    def _search_is_available_in_source(self, operator, value):
+        if operator not in ('=', '!=') or not isinstance(value, bool):
+            raise UserError(_('Операція не підтримується'))
+        positive = (operator == '=') == value
+        balance_domain = self._get_source_balance_domain()
+        _logger.debug("Nomenclature source availability domain: %s", balance_domain)
+        if balance_domain is None:
+            # Відправника не вибрано - показуємо всі товари
+            return expression.TRUE_DOMAIN if positive else expression.FALSE_DOMAIN
+        return [('balance_ids', 'any' if positive else 'not any', balance_domain)]
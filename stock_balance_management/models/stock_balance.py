@@ -1,4 +1,5 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
+from odoo.tools import SQL
 from odoo.exceptions import ValidationError, UserError
 import logging
 
@@ -48,6 +49,14 @@ class StockBalance(models.Model):
         string='Партія',
         index=True
     )
+
+    fifo_date = fields.Datetime(
+        string='Дата FIFO',
+        related='batch_id.date_created',
+        store=True,
+        readonly=True,
+        help='Дата надходження партії - ключ сортування FIFO'
+    )
     
     qty_on_hand = fields.Float(
         string='Фізична кількість', 
@@ -83,8 +92,18 @@ class StockBalance(models.Model):
         readonly=True
     )
     
+    serial_ids = fields.One2many(
+        'stock.serial',
+        'balance_id',
+        string='Серійні номери',
+        readonly=True
+    )
+
     serial_numbers = fields.Text(
         string='Серійні номери',
+        compute='_compute_serial_numbers',
+        inverse='_inverse_serial_numbers',
+        search='_search_serial_numbers',
         help='Серійні номери товарів (для товарів з S/N обліком)'
     )
     
@@ -93,13 +112,6 @@ class StockBalance(models.Model):
         compute='_compute_serial_count',
         help='Кількість серійних номерів'
     )
-
-    serial_line_ids = fields.One2many(
-        'stock.balance.serial.line', 
-        'balance_id', 
-        string='Серійні номери',
-        compute='_compute_serial_lines'
-    )
     
     display_name = fields.Char(
         string='Назва',
@@ -131,34 +143,35 @@ class StockBalance(models.Model):
          'Повинна бути вказана або локація складу, або працівник, але не обидва!'),
     ]
 
-    @api.depends('serial_numbers')
+    @api.depends('serial_ids')
     def _compute_serial_count(self):
-        """Підраховує кількість серійних номерів"""
+        """Підраховує кількість серійних номерів одним запитом"""
+        counts = {}
+        if self.ids:
+            groups = self.env['stock.serial']._read_group(
+                [('balance_id', 'in', self.ids)], ['balance_id'], ['__count'],
+            )
+            counts = {balance.id: count for balance, count in groups}
+        for balance in self:
+            balance.serial_count = counts.get(balance.id, 0)
+
+    @api.depends('serial_ids.name')
+    def _compute_serial_numbers(self):
+        """Формує текстове представлення серійних номерів з реєстру"""
         for balance in self:
-            balance.serial_count = len(balance._get_serial_numbers_list())
+            balance.serial_numbers = '\n'.join(balance.serial_ids.mapped('name')) or False
 
-    @api.depends('serial_numbers', 'batch_id')
-    def _compute_serial_lines(self):
-        """Створює тимчасові записи для відображення серійних номерів"""
-        StockBalanceSerialLine = self.env['stock.balance.serial.line']
+    def _inverse_serial_numbers(self):
+        """Синхронізує реєстр серійних номерів з текстовим полем"""
+        Serial = self.env['stock.serial']
         for balance in self:
-            # Видаляємо існуючі записи (тільки для transient)
-            balance.serial_line_ids.unlink()
-            if balance.serial_numbers:
-                serials = balance._get_serial_numbers_list()
-                lines_to_create = []
-                for serial in serials:
-                    info = balance._get_serial_info(serial)
-                    lines_to_create.append({
-                        'balance_id': balance.id,
-                        'serial_number': serial,
-                        'batch_number': info['batch_number'],
-                        'document_reference': info['document_reference'],
-                        'source_document_type': info['source_document_type'],
-                        'date_created': info['date_created'],
-                    })
-                for line_data in lines_to_create:
-                    StockBalanceSerialLine.create(line_data)
+            serials = Serial._register_serials(
+                balance.nomenclature_id.id, balance.serial_numbers, balance=balance,
+            )
+            (balance.serial_ids - serials).write({'balance_id': False})
+
+    def _search_serial_numbers(self, operator, value):
+        return self.env['stock.serial']._search_by_text('serial_ids', operator, value)
 
     def _get_doc_type_display(self, doc_type):
         """Перекладає тип документу"""
@@ -172,14 +185,15 @@ class StockBalance(models.Model):
     def action_view_serials(self):
         """Швидкий перегляд серійних номерів з списку"""
         self.ensure_one()
-        if not self.serial_numbers:
+        if not self.serial_ids:
             raise UserError(_('У цього залишку немає серійних номерів для відображення.'))
         return {
             'name': _('Серійні номери: %s') % self.nomenclature_id.name,
             'type': 'ir.actions.act_window',
-            'res_model': 'stock.balance',
-            'res_id': self.id,
-            'view_mode': 'form',
+            'res_model': 'stock.serial',
+            'view_mode': 'list',
+            'domain': [('balance_id', '=', self.id)],
+            'context': {'create': False},
             'target': 'new',
         }
 
@@ -210,15 +224,7 @@ class StockBalance(models.Model):
 
     def _get_serial_numbers_list(self):
         """Повертає список серійних номерів"""
-        if not self.serial_numbers:
-            return []
-        serials = []
-        for line in self.serial_numbers.split('\n'):
-            for serial in line.split(','):
-                serial = serial.strip()
-                if serial:
-                    serials.append(serial)
-        return serials
+        return self.serial_ids.mapped('name')
 
     @api.depends('qty_on_hand')
     def _compute_available_qty(self):
@@ -261,73 +267,454 @@ class StockBalance(models.Model):
         balance = self.search(domain, limit=1)
         return balance.qty_available if balance else 0.0
 
+    def init(self):
+        """
+        Унікальний індекс по ключу залишку з урахуванням NULL (для INSERT ... ON CONFLICT)
+        та частковий індекс черги FIFO по доступних залишках.
+        """
+        tools.create_unique_index(self.env.cr, 'stock_balance_key_uniq', self._table, [
+            'nomenclature_id', 'location_type', 'COALESCE(warehouse_id, 0)',
+            'COALESCE(location_id, 0)', 'COALESCE(employee_id, 0)',
+            'COALESCE(batch_id, 0)', 'company_id',
+        ])
+        tools.create_index(self.env.cr, 'stock_balance_fifo_idx', self._table, [
+            'nomenclature_id', 'location_type', 'warehouse_id', 'employee_id', 'fifo_date', 'id',
+        ], where='qty_available > 0')
+
+    @api.model
+    def _get_balance_key(self, spec):
+        """Повертає нормалізований ключ залишку для специфікації оновлення"""
+        if spec.get('location_type', 'warehouse') == 'warehouse':
+            return (
+                spec['nomenclature_id'], 'warehouse', spec.get('warehouse_id') or None,
+                spec.get('location_id') or None, None, spec.get('batch_id') or None,
+                spec.get('company_id') or self.env.company.id,
+            )
+        return (
+            spec['nomenclature_id'], 'employee', None, None, spec.get('employee_id') or None,
+            spec.get('batch_id') or None, spec.get('company_id') or self.env.company.id,
+        )
+
+    @api.model
+    def _get_balance_lock_order(self, key):
+        """Повертає ключ сортування залишку, однаковий з порядком блокування в SQL"""
+        return tuple(0 if value is None else value for value in key)
+
+    @api.model
+    def _get_balance_scope(self, nomenclature_id, location_type, location_id):
+        """Повертає область блокування залишків: (номенклатура, склад або мінус працівник)"""
+        return (nomenclature_id, (location_id or 0) if location_type == 'warehouse' else -(location_id or 0))
+
+    @api.model
+    def _lock_balance_scopes(self, scopes):
+        """
+        Бере транзакційні advisory-блокування областей залишків (номенклатура, локація)
+        одним запитом у зростаючому порядку. Документ блокує всі області відправника та
+        одержувача до FIFO-розподілу, тому зустрічні проведення (A→B та B→A) чекають одне
+        одного на першому блокуванні, а не утримують рядки залишків навхрест.
+        Блокування знімаються в кінці транзакції; повторний запит тієї ж області не чекає.
+        """
+        scopes = sorted(set(scopes))
+        if not scopes:
+            return
+        self.env.cr.execute(SQL("""
+            SELECT pg_advisory_xact_lock(scope.nomenclature_id, scope.location_id)
+            FROM (VALUES %s) AS scope(nomenclature_id, location_id)
+            ORDER BY scope.nomenclature_id, scope.location_id
+        """, SQL(', ').join(SQL('(%s, %s)', *scope) for scope in scopes)))
+
+    @api.model
+    def _lock_balances(self, balance_ids):
+        """
+        Блокує рядки залишків (SELECT ... FOR UPDATE) у детермінованому порядку ключа.
+        Області цих залишків мають бути заблоковані раніше (_lock_balance_scopes).
+        """
+        if not balance_ids:
+            return self.browse()
+        self.flush_model()
+        self.env.cr.execute(SQL("""
+            SELECT id FROM stock_balance
+            WHERE id IN %s
+            ORDER BY nomenclature_id, location_type, COALESCE(warehouse_id, 0),
+                     COALESCE(location_id, 0), COALESCE(employee_id, 0),
+                     COALESCE(batch_id, 0), company_id
+            FOR UPDATE
+        """, tuple(balance_ids)))
+        balances = self.browse([row[0] for row in self.env.cr.fetchall()])
+        # Після очікування блокування читаємо актуальні кількості з бази
+        balances.invalidate_recordset(['qty_on_hand', 'qty_available'])
+        return balances
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self._invalidate_balance_snapshot()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        self._invalidate_balance_snapshot()
+        return super().write(vals)
+
+    def unlink(self):
+        self._invalidate_balance_snapshot()
+        return super().unlink()
+
+    @api.model
+    def _get_transaction_cache(self, name):
+        """
+        Повертає кеш name поточної транзакції на курсорі. Кеш скидається після commit
+        та rollback транзакції, а також при будь-якій зміні залишків.
+        """
+        cr = self.env.cr
+        if name not in cr.cache:
+            cr.cache[name] = {}
+            cr.postcommit.add(self._invalidate_balance_snapshot)
+            cr.postrollback.add(self._invalidate_balance_snapshot)
+        return cr.cache[name]
+
+    @api.model
+    def _get_balance_snapshot(self, location_type, location_id, company_ids):
+        """
+        Повертає {номенклатура: доступна кількість} для локації одним read_group.
+        Результат кешується в межах транзакції до наступної зміни залишків окремо для
+        користувача та режиму sudo, бо read_group фільтрується правилами доступу.
+        """
+        cache = self._get_transaction_cache('stock_balance_snapshot')
+        key = (self.env.uid, self.env.su, location_type, location_id, tuple(sorted(company_ids)))
+        if key not in cache:
+            location_field = 'warehouse_id' if location_type == 'warehouse' else 'employee_id'
+            groups = self._read_group([
+                ('location_type', '=', location_type),
+                (location_field, '=', location_id),
+                ('company_id', 'in', list(company_ids)),
+                ('qty_available', '>', 0),
+            ], ['nomenclature_id'], ['qty_available:sum'])
+            cache[key] = {nomenclature.id: qty for nomenclature, qty in groups}
+        return cache[key]
+
+    @api.model
+    def _invalidate_balance_snapshot(self):
+        """Скидає кеш знімків залишків та FIFO-розподілів поточної транзакції"""
+        self.env.cr.cache.pop('stock_balance_snapshot', None)
+        self.env.cr.cache.pop('stock_balance_fifo', None)
+
+    @api.model
+    def _allocate_fifo(self, domain, demands, lock=False):
+        """
+        Розподіляє потреби документа [(номенклатура, кількість)] по залишках за FIFO
+        одним впорядкованим запитом. Повертає кортеж розподілів ((залишок, кількість), ...)
+        у порядку потреб. Результат кешується в межах транзакції до наступної зміни залишків
+        (окремо для користувача та режиму sudo).
+        З lock=True залишки-кандидати блокуються до читання доступної кількості,
+        тому такі виклики не кешуються - блокування береться при кожному виклику.
+        """
+        demands = tuple((nomenclature_id, qty) for nomenclature_id, qty in demands)
+        cache = {} if lock else self._get_transaction_cache('stock_balance_fifo')
+        key = (self.env.uid, self.env.su, repr(domain), demands)
+        if key in cache:
+            return cache[key]
+        nomenclature_ids = list({nomenclature_id for nomenclature_id, qty in demands if qty > 0})
+        balances = self.search(domain + [
+            ('nomenclature_id', 'in', nomenclature_ids),
+            ('qty_available', '>', 0),
+        ], order='fifo_date ASC, id ASC') if nomenclature_ids else self.browse()
+        if lock:
+            self._lock_balances(balances.ids)
+        queues = {}
+        for balance in balances:
+            queues.setdefault(balance.nomenclature_id.id, []).append([balance, balance.qty_available])
+        allocations = []
+        for nomenclature_id, qty in demands:
+            remaining_qty = qty
+            allocation = []
+            for entry in queues.get(nomenclature_id, []):
+                if remaining_qty <= 0:
+                    break
+                take_qty = min(entry[1], remaining_qty)
+                if take_qty <= 0:
+                    continue
+                entry[1] -= take_qty
+                remaining_qty -= take_qty
+                allocation.append((entry[0], take_qty))
+            allocations.append(tuple(allocation))
+        cache[key] = tuple(allocations)
+        return cache[key]
+
+    @api.model
+    def update_balance_bulk(self, specs):
+        """
+        Застосовує зміни залишків пакетом: один атомарний INSERT ... ON CONFLICT DO UPDATE
+        (qty_on_hand = qty_on_hand + зміна) на всі ключі у порядку ключа залишку.
+        Перед оновленням блокуються області всіх ключів (_lock_balance_scopes).
+        Ключі з нульовою сумарною зміною не оновлюються (для них повертається наявний залишок
+        або порожній запис). Серійні номери надходжень реєструються одним пакетом на залишок.
+        Повертає список (залишок, залишок до, залишок після, зареєстровані серійні номери)
+        у порядку специфікацій.
+        """
+        if not specs:
+            return []
+        keys = [self._get_balance_key(spec) for spec in specs]
+        deltas = {}
+        uoms = {}
+        for key, spec in zip(keys, specs):
+            deltas[key] = deltas.get(key, 0.0) + spec['qty_change']
+            if key not in uoms:
+                uoms[key] = spec.get('uom_id')
+        missing_uom = {key[0] for key, uom_id in uoms.items() if not uom_id}
+        if missing_uom:
+            nomenclatures = self.env['product.nomenclature'].browse(missing_uom)
+            base_uoms = {nom.id: nom.base_uom_id.id for nom in nomenclatures}
+            uoms = {key: uom_id or base_uoms[key[0]] for key, uom_id in uoms.items()}
+
+        self._lock_balance_scopes(
+            self._get_balance_scope(key[0], key[1], key[2] if key[1] == 'warehouse' else key[4])
+            for key in deltas
+        )
+        self.flush_model()
+        # Ключі з нульовою сумарною зміною не оновлюються, щоб не створювати порожніх залишків
+        changed = {key: delta for key, delta in deltas.items() if delta}
+        after_by_key = {}
+        inserted_ids = []
+        if changed:
+            now = fields.Datetime.now()
+            uid = self.env.uid
+            rows = SQL(', ').join(
+                SQL('(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)',
+                    *key, uoms[key], delta, delta, now, uid, now, uid, now)
+                for key, delta in sorted(changed.items(), key=lambda item: self._get_balance_lock_order(item[0]))
+            )
+            self.env.cr.execute(SQL("""
+                INSERT INTO stock_balance AS sb (
+                    nomenclature_id, location_type, warehouse_id, location_id, employee_id,
+                    batch_id, company_id, uom_id, qty_on_hand, qty_available, last_update,
+                    create_uid, create_date, write_uid, write_date
+                )
+                VALUES %s
+                ON CONFLICT (nomenclature_id, location_type, COALESCE(warehouse_id, 0),
+                             COALESCE(location_id, 0), COALESCE(employee_id, 0),
+                             COALESCE(batch_id, 0), company_id)
+                DO UPDATE SET
+                    qty_on_hand = sb.qty_on_hand + EXCLUDED.qty_on_hand,
+                    qty_available = sb.qty_on_hand + EXCLUDED.qty_on_hand,
+                    last_update = EXCLUDED.last_update,
+                    write_uid = EXCLUDED.write_uid,
+                    write_date = EXCLUDED.write_date
+                RETURNING sb.id, (sb.xmax = 0) AS inserted, sb.qty_on_hand,
+                          sb.nomenclature_id, sb.location_type, sb.warehouse_id, sb.location_id,
+                          sb.employee_id, sb.batch_id, sb.company_id
+            """, rows))
+            for balance_id, inserted, qty_after, *key in self.env.cr.fetchall():
+                after_by_key[tuple(key)] = (balance_id, qty_after)
+                if inserted:
+                    inserted_ids.append(balance_id)
+        unchanged = [key for key in deltas if key not in changed]
+        if unchanged:
+            # Для незмінних ключів лише знаходимо наявні залишки
+            self.env.cr.execute(SQL("""
+                SELECT sb.id, sb.qty_on_hand,
+                       sb.nomenclature_id, sb.location_type, sb.warehouse_id, sb.location_id,
+                       sb.employee_id, sb.batch_id, sb.company_id
+                FROM stock_balance sb
+                JOIN (VALUES %s) AS k(nomenclature_id, location_type, warehouse_id, location_id,
+                                      employee_id, batch_id, company_id)
+                  ON sb.nomenclature_id = k.nomenclature_id
+                 AND sb.location_type = k.location_type
+                 AND COALESCE(sb.warehouse_id, 0) = COALESCE(k.warehouse_id, 0)
+                 AND COALESCE(sb.location_id, 0) = COALESCE(k.location_id, 0)
+                 AND COALESCE(sb.employee_id, 0) = COALESCE(k.employee_id, 0)
+                 AND COALESCE(sb.batch_id, 0) = COALESCE(k.batch_id, 0)
+                 AND sb.company_id = k.company_id
+            """, SQL(', ').join(
+                SQL('(%s, %s, %s::integer, %s::integer, %s::integer, %s::integer, %s)', *key)
+                for key in unchanged
+            )))
+            for balance_id, qty_after, *key in self.env.cr.fetchall():
+                after_by_key[tuple(key)] = (balance_id, qty_after)
+
+        if changed:
+            self.invalidate_model(['qty_on_hand', 'qty_available', 'last_update', 'write_uid', 'write_date'])
+            self._invalidate_balance_snapshot()
+        if inserted_ids:
+            inserted = self.browse(inserted_ids)
+            for fname in ('display_name', 'tracking_serial', 'fifo_date'):
+                self.env.add_to_compute(self._fields[fname], inserted)
+            inserted.flush_recordset(['display_name', 'tracking_serial', 'fifo_date'])
+
+        # Проміжні значення до/після для кожної специфікації в порядку їх застосування
+        Serial = self.env['stock.serial']
+        running = {key: qty_after - deltas[key] for key, (balance_id, qty_after) in after_by_key.items()}
+        results = []
+        serial_names = []
+        serials_by_balance = {}
+        for key, spec in zip(keys, specs):
+            balance = self.browse(after_by_key[key][0] if key in after_by_key else [])
+            before = running.get(key, 0.0)
+            running[key] = before + spec['qty_change']
+            results.append((balance, before, running[key]))
+            names = Serial._normalize_serials(spec.get('serial_numbers')) if balance and spec['qty_change'] > 0 else []
+            serial_names.append(set(names))
+            if names:
+                serials_by_balance.setdefault(balance, []).extend(names)
+        registered = {
+            balance: Serial._register_serials(
+                balance.nomenclature_id.id, names, balance=balance, batch=balance.batch_id,
+            )
+            for balance, names in serials_by_balance.items()
+        }
+        return [
+            (balance, before, after, registered[balance].filtered(lambda s: s.name in names) if names else Serial)
+            for (balance, before, after), names in zip(results, serial_names)
+        ]
+
     @api.model
     def update_balance(self, nomenclature_id, qty_change, location_type='warehouse', 
                       warehouse_id=None, employee_id=None, location_id=None, 
                       batch_id=None, uom_id=None, company_id=None, serial_numbers=None):
         """Оновлює залишок товару з правильним додаванням серійних номерів"""
-        if company_id is None:
-            company_id = self.env.company.id
-        if uom_id is None:
-            nomenclature = self.env['product.nomenclature'].browse(nomenclature_id)
-            uom_id = nomenclature.base_uom_id.id
-        domain = [
-            ('nomenclature_id', '=', nomenclature_id),
-            ('location_type', '=', location_type),
-            ('company_id', '=', company_id),
-        ]
-        if location_type == 'warehouse':
-            domain.extend([
-                ('warehouse_id', '=', warehouse_id),
-                ('location_id', '=', location_id or False),
-            ])
-        else:
-            domain.append(('employee_id', '=', employee_id))
-        if batch_id:
-            domain.append(('batch_id', '=', batch_id))
-        else:
-            domain.append(('batch_id', '=', False))
-        balance = self.search(domain, limit=1)
-        if balance:
-            new_qty = balance.qty_on_hand + qty_change
-            existing_serials = balance._get_serial_numbers_list()
-            if serial_numbers and qty_change > 0:
-                new_serials = []
-                for line in serial_numbers.split('\n'):
-                    for serial in line.split(','):
-                        serial = serial.strip()
-                        if serial and serial not in existing_serials:
-                            new_serials.append(serial)
-                all_serials = existing_serials + new_serials
-                combined_serials = '\n'.join(all_serials) if all_serials else balance.serial_numbers
-            else:
-                combined_serials = balance.serial_numbers
-            balance.write({
-                'qty_on_hand': new_qty,
-                'last_update': fields.Datetime.now(),
-                'serial_numbers': combined_serials,
-            })
-        else:
-            if qty_change != 0:
-                vals = {
-                    'nomenclature_id': nomenclature_id,
-                    'location_type': location_type,
-                    'qty_on_hand': qty_change,
-                    'uom_id': uom_id,
-                    'company_id': company_id,
-                    'batch_id': batch_id or False,
-                    'serial_numbers': serial_numbers,
-                }
-                if location_type == 'warehouse':
-                    vals.update({
-                        'warehouse_id': warehouse_id,
-                        'location_id': location_id or False,
-                    })
-                else:
-                    vals['employee_id'] = employee_id
-                balance = self.create(vals)
+        [(balance, _before, _after, _serials)] = self.update_balance_bulk([{
+            'nomenclature_id': nomenclature_id,
+            'qty_change': qty_change,
+            'location_type': location_type,
+            'warehouse_id': warehouse_id,
+            'employee_id': employee_id,
+            'location_id': location_id,
+            'batch_id': batch_id,
+            'uom_id': uom_id,
+            'company_id': company_id,
+            'serial_numbers': serial_numbers,
+        }])
         return balance
 
+    @api.model
+    def _get_rebuild_scope_sql(self, alias, company_ids, warehouse_ids=None, nomenclature_ids=None):
+        """
+        Повертає умову області перебудови для рядків з ключем залишку (alias - таблиця або підзапит).
+        Область по складах охоплює лише складські залишки цих складів.
+        """
+        alias = SQL.identifier(alias)
+        conditions = [SQL("%s.company_id = ANY(%s)", alias, list(company_ids))]
+        if warehouse_ids:
+            conditions.append(SQL(
+                "%s.location_type = 'warehouse' AND %s.warehouse_id = ANY(%s)", alias, alias, list(warehouse_ids)
+            ))
+        if nomenclature_ids:
+            conditions.append(SQL("%s.nomenclature_id = ANY(%s)", alias, list(nomenclature_ids)))
+        return SQL(" AND ").join(conditions)
+
+    @api.model
+    def _rebuild_from_movements(self, company_ids, warehouse_ids=None, nomenclature_ids=None, relink_movements=True):
+        """
+        Перебудовує залишки області з журналу рухів набором SQL запитів:
+        кількості по ключу агрегуються одним GROUP BY по ногах рухів, залишки оновлюються
+        одним INSERT ... ON CONFLICT, залишки області без рухів обнуляються.
+        Рядки залишків не видаляються - на них посилаються рухи та серійні номери.
+        Таблиця залишків блокується від змін до кінця транзакції.
+        Повертає лічильники {inserted, updated, zeroed, movements}.
+        """
+        Movement = self.env['stock.balance.movement']
+        self.flush_model()
+        Movement.flush_model()
+        cr = self.env.cr
+        cr.execute("LOCK TABLE stock_balance IN SHARE ROW EXCLUSIVE MODE")
+        now = fields.Datetime.now()
+        legs_scope = self._get_rebuild_scope_sql('legs', company_ids, warehouse_ids, nomenclature_ids)
+        cr.execute("DROP TABLE IF EXISTS stock_balance_rebuild")
+        cr.execute(SQL("""
+            CREATE TEMP TABLE stock_balance_rebuild ON COMMIT DROP AS
+            SELECT nomenclature_id, location_type, warehouse_id, location_id,
+                   employee_id, batch_id, company_id, SUM(qty) AS qty
+            FROM %(legs)s legs
+            WHERE %(scope)s
+            GROUP BY nomenclature_id, location_type, warehouse_id, location_id,
+                     employee_id, batch_id, company_id
+        """, legs=Movement._get_legs_sql(company_ids=company_ids), scope=legs_scope))
+        cr.execute("ANALYZE stock_balance_rebuild")
+
+        cr.execute(SQL("""
+            INSERT INTO stock_balance AS sb (
+                nomenclature_id, location_type, warehouse_id, location_id, employee_id,
+                batch_id, company_id, uom_id, qty_on_hand, qty_available, last_update,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT r.nomenclature_id, r.location_type, r.warehouse_id, r.location_id, r.employee_id,
+                   r.batch_id, r.company_id, n.base_uom_id, r.qty, r.qty, %(now)s,
+                   %(uid)s, %(now)s, %(uid)s, %(now)s
+            FROM stock_balance_rebuild r
+            JOIN product_nomenclature n ON n.id = r.nomenclature_id
+            WHERE r.qty <> 0
+            ON CONFLICT (nomenclature_id, location_type, COALESCE(warehouse_id, 0),
+                         COALESCE(location_id, 0), COALESCE(employee_id, 0),
+                         COALESCE(batch_id, 0), company_id)
+            DO UPDATE SET
+                qty_on_hand = EXCLUDED.qty_on_hand,
+                qty_available = EXCLUDED.qty_on_hand,
+                last_update = EXCLUDED.last_update,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+            WHERE sb.qty_on_hand IS DISTINCT FROM EXCLUDED.qty_on_hand
+            RETURNING sb.id, (sb.xmax = 0) AS inserted
+        """, now=now, uid=self.env.uid))
+        rows = cr.fetchall()
+        inserted_ids = [balance_id for balance_id, inserted in rows if inserted]
+
+        cr.execute(SQL("""
+            UPDATE stock_balance sb
+            SET qty_on_hand = 0, qty_available = 0, last_update = %(now)s,
+                write_uid = %(uid)s, write_date = %(now)s
+            WHERE %(scope)s
+              AND sb.qty_on_hand <> 0
+              AND NOT EXISTS (
+                  SELECT 1 FROM stock_balance_rebuild r
+                  WHERE r.qty <> 0
+                    AND r.nomenclature_id = sb.nomenclature_id
+                    AND r.location_type = sb.location_type
+                    AND COALESCE(r.warehouse_id, 0) = COALESCE(sb.warehouse_id, 0)
+                    AND COALESCE(r.location_id, 0) = COALESCE(sb.location_id, 0)
+                    AND COALESCE(r.employee_id, 0) = COALESCE(sb.employee_id, 0)
+                    AND COALESCE(r.batch_id, 0) = COALESCE(sb.batch_id, 0)
+                    AND r.company_id = sb.company_id
+              )
+        """, now=now, uid=self.env.uid,
+            scope=self._get_rebuild_scope_sql('sb', company_ids, warehouse_ids, nomenclature_ids)))
+        zeroed = cr.rowcount
+        cr.execute("DROP TABLE stock_balance_rebuild")
+
+        self.invalidate_model(['qty_on_hand', 'qty_available', 'last_update', 'write_uid', 'write_date'])
+        self._invalidate_balance_snapshot()
+        if inserted_ids:
+            inserted = self.browse(inserted_ids)
+            for fname in ('display_name', 'tracking_serial', 'fifo_date'):
+                self.env.add_to_compute(self._fields[fname], inserted)
+            inserted.flush_recordset(['display_name', 'tracking_serial', 'fifo_date'])
+        movements = 0
+        if relink_movements:
+            movements = Movement._recompute_balance_links(company_ids, warehouse_ids, nomenclature_ids)
+        result = {
+            'inserted': len(inserted_ids),
+            'updated': len(rows) - len(inserted_ids),
+            'zeroed': zeroed,
+            'movements': movements,
+        }
+        _logger.info("Balances rebuilt from movements for companies %s: %s", list(company_ids), result)
+        return result
+
+    def action_rebuild_from_movements(self):
+        """Перебудовує з журналу рухів залишки номенклатури вибраних записів"""
+        if not self.env.user.has_group('stock.group_stock_manager'):
+            raise UserError(_('Перебудова залишків доступна лише менеджерам складу.'))
+        for company in self.company_id:
+            balances = self.filtered(lambda b: b.company_id == company)
+            self._rebuild_from_movements(company.ids, nomenclature_ids=balances.nomenclature_id.ids)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Залишки перебудовано'),
+                'message': _('Залишки %s номенклатур перебудовано з журналу рухів.') % len(self.nomenclature_id),
+                'type': 'success',
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            },
+        }
+
     @api.model
     def get_available_qty(self, nomenclature_id, location_type='warehouse', 
                          warehouse_id=None, employee_id=None, batch_id=None, company_id=None):
@@ -362,29 +749,16 @@ class StockBalance(models.Model):
         if company_id is None:
             company_id = self.env.company.id
         domain = [
-            ('nomenclature_id', '=', nomenclature_id),
             ('location_type', '=', location_type),
             ('company_id', '=', company_id),
-            ('qty_available', '>', 0),
         ]
         if location_type == 'warehouse':
             domain.append(('warehouse_id', '=', warehouse_id))
         else:
             domain.append(('employee_id', '=', employee_id))
-        balances = self.search(domain, order='batch_id.date_created ASC, id ASC')
-        fifo_list = []
-        remaining_qty = required_qty
-        for balance in balances:
-            if remaining_qty <= 0:
-                break
-            available = min(balance.qty_available, remaining_qty)
-            if available > 0:
-                fifo_list.append({
-                    'balance': balance,
-                    'qty': available,
-                })
-                remaining_qty -= available
-        return fifo_list, remaining_qty
+        [allocation] = self._allocate_fifo(domain, [(nomenclature_id, required_qty)])
+        fifo_list = [{'balance': balance, 'qty': qty} for balance, qty in allocation]
+        return fifo_list, required_qty - sum(qty for _balance, qty in allocation)
 
     def action_view_movements(self):
         """Показує рухи по цьому залишку"""
@@ -407,17 +781,3 @@ class StockBalance(models.Model):
             'domain': domain,
             'context': {'create': False},
         }
-
-class StockBalanceSerialLine(models.TransientModel):
-    """
-    Транзієнтна модель для відображення серійних номерів у залишках (тільки для UI).
-    """
-    _name = 'stock.balance.serial.line'
-    _description = 'Серійний номер у залишках'
-
-    balance_id = fields.Many2one('stock.balance', string='Залишок', required=True, ondelete='cascade')
-    serial_number = fields.Char(string='Серійний номер', required=True)
-    batch_number = fields.Char(string='Партія')
-    document_reference = fields.Char(string='Документ')
-    source_document_type = fields.Char(string='Тип документу')
-    date_created = fields.Datetime(string='Дата створення')
\ No newline at end of file
@@ -1,8 +1,13 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
+from odoo.tools import SQL
+from datetime import timedelta
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# BRIN індекси дат журналів рухів, які підсумовує cron обслуговування
+BRIN_DATE_INDEXES = ['stock_balance_movement_date_brin_idx', 'stock_batch_movement_date_brin_idx']
+
 class StockBalanceMovement(models.Model):
     """
     Модель для обліку рухів залишків товарів (надходження, списання, переміщення, коригування).
@@ -86,14 +91,37 @@ class StockBalanceMovement(models.Model):
         default=lambda self: self.env.user
     )
     notes = fields.Text(string='Примітки')
-    serial_numbers = fields.Text(string='Серійні номери')
+    serial_ids = fields.Many2many(
+        'stock.serial',
+        'stock_balance_movement_serial_rel',
+        'movement_id',
+        'serial_id',
+        string='Серійні номери (реєстр)',
+        readonly=True
+    )
+    serial_numbers = fields.Text(
+        string='Серійні номери',
+        compute='_compute_serial_numbers',
+        inverse='_inverse_serial_numbers',
+        search='_search_serial_numbers'
+    )
     display_name = fields.Char(
         string='Назва',
         compute='_compute_display_name',
         store=True
     )
-    balance_before = fields.Float(string='Залишок до', readonly=True)
-    balance_after = fields.Float(string='Залишок після', readonly=True)
+    balance_before = fields.Float(
+        string='Залишок до',
+        compute='_compute_running_balance',
+        digits='Product Unit of Measure',
+        help='Залишок ключа до руху в хронологічному порядку (дата, id)'
+    )
+    balance_after = fields.Float(
+        string='Залишок після',
+        compute='_compute_running_balance',
+        digits='Product Unit of Measure',
+        help='Залишок ключа після руху в хронологічному порядку (дата, id)'
+    )
     balance_id = fields.Many2one(
         'stock.balance',
         string='Залишок',
@@ -108,6 +136,140 @@ class StockBalanceMovement(models.Model):
         readonly=True,
     )
 
+    def init(self):
+        """
+        Індекси журналу: ноги рухів номенклатури за період (наростаючий залишок),
+        BRIN по даті для звітів за період та номенклатура/склад з датою.
+        """
+        tools.create_index(self.env.cr, 'stock_balance_movement_nomenclature_date_idx', self._table, [
+            'nomenclature_id', 'date', 'id',
+        ])
+        self.env.cr.execute(SQL("""
+            CREATE INDEX IF NOT EXISTS stock_balance_movement_date_brin_idx ON %s
+            USING brin (date) WITH (pages_per_range = 32, autosummarize = on)
+        """, SQL.identifier(self._table)))
+        for column in ('warehouse_from_id', 'warehouse_to_id'):
+            tools.create_index(self.env.cr, f'stock_balance_movement_nomenclature_{column}_date_idx', self._table, [
+                'nomenclature_id', column, 'date',
+            ])
+
+    @api.model
+    def _cron_summarize_date_indexes(self):
+        """Підсумовує нові діапазони сторінок BRIN індексів дат, які ще не обробив autovacuum"""
+        for index in BRIN_DATE_INDEXES:
+            self.env.cr.execute(SQL("SELECT brin_summarize_new_values(to_regclass(%s))", index))
+            _logger.info("BRIN index %s: %s new page ranges summarized", index, self.env.cr.fetchone()[0])
+
+    def _compute_running_balance(self):
+        running = self._get_running_balances()
+        for movement in self:
+            movement.balance_before, movement.balance_after = running.get(movement.id, (0.0, 0.0))
+
+    def _get_primary_balance_key(self):
+        """Повертає (нога, ключ залишку) руху: нога списання, або надходження, якщо списання немає"""
+        self.ensure_one()
+        vals = {
+            'nomenclature_id': self.nomenclature_id.id,
+            'batch_id': self.batch_id.id,
+            'company_id': self.company_id.id,
+        }
+        for side in ('from', 'to'):
+            for field in ('location_%s_type', 'warehouse_%s_id', 'location_%s_id', 'employee_%s_id'):
+                value = self[field % side]
+                vals[field % side] = value.id if isinstance(value, models.BaseModel) else value
+        for leg, side in enumerate(('from', 'to')):
+            balance_leg = self._get_balance_leg(vals, side)
+            if balance_leg:
+                return leg, self.env['stock.balance']._get_balance_key(balance_leg)
+        return None, None
+
+    def _get_running_balances(self):
+        """
+        Повертає {id руху: (залишок до, залишок після)} одним запитом: найближчий знімок залишків
+        перед рухами + наростаючий підсумок ніг по ключу (SUM() OVER, порядок дата, id).
+        Рухи заднім числом враховуються без перезапису збережених значень.
+        """
+        movements = self.filtered(lambda m: m.id and m.date)
+        page = []
+        for movement in movements:
+            leg, key = movement._get_primary_balance_key()
+            if key:
+                page.append(SQL(
+                    "(%s::int, %s::int, %s::int, %s::varchar, %s::int, %s::int, %s::int, %s::int, %s::int)",
+                    movement.id, leg, *key,
+                ))
+        if not page:
+            return {}
+        Snapshot = self.env['stock.balance.snapshot']
+        self.flush_model()
+        Snapshot.flush_model()
+        snapshot_date, snapshot_end = Snapshot._get_last_snapshot(min(movements.mapped('date')))
+        legs = self._get_legs_sql(
+            snapshot_end,
+            max(movements.mapped('date')) + timedelta(seconds=1),
+            nomenclature_ids=movements.nomenclature_id.ids,
+        )
+        self.env.cr.execute(SQL("""
+            WITH page (movement_id, leg, nomenclature_id, location_type, warehouse_id,
+                       location_id, employee_id, batch_id, company_id) AS (
+                VALUES %(page)s
+            ), running AS (
+                SELECT legs.movement_id, legs.leg, legs.qty,
+                       legs.nomenclature_id, legs.location_type, legs.warehouse_id,
+                       legs.location_id, legs.employee_id, legs.batch_id, legs.company_id,
+                       SUM(legs.qty) OVER (
+                           PARTITION BY legs.nomenclature_id, legs.location_type, legs.warehouse_id,
+                                        legs.location_id, legs.employee_id, legs.batch_id, legs.company_id
+                           ORDER BY legs.date, legs.movement_id, legs.leg
+                           ROWS UNBOUNDED PRECEDING
+                       ) AS qty_after
+                FROM %(legs)s legs
+                WHERE EXISTS (
+                    SELECT 1 FROM page p
+                    WHERE p.nomenclature_id = legs.nomenclature_id
+                      AND p.location_type = legs.location_type
+                      AND COALESCE(p.warehouse_id, 0) = COALESCE(legs.warehouse_id, 0)
+                      AND COALESCE(p.location_id, 0) = COALESCE(legs.location_id, 0)
+                      AND COALESCE(p.employee_id, 0) = COALESCE(legs.employee_id, 0)
+                      AND COALESCE(p.batch_id, 0) = COALESCE(legs.batch_id, 0)
+                      AND p.company_id = legs.company_id
+                )
+            )
+            SELECT r.movement_id,
+                   COALESCE(s.qty, 0) + r.qty_after - r.qty,
+                   COALESCE(s.qty, 0) + r.qty_after
+            FROM running r
+            JOIN page p ON p.movement_id = r.movement_id AND p.leg = r.leg
+            LEFT JOIN stock_balance_snapshot s
+                   ON s.date = %(snapshot_date)s
+                  AND s.nomenclature_id = r.nomenclature_id
+                  AND s.location_type = r.location_type
+                  AND COALESCE(s.warehouse_id, 0) = COALESCE(r.warehouse_id, 0)
+                  AND COALESCE(s.location_id, 0) = COALESCE(r.location_id, 0)
+                  AND COALESCE(s.employee_id, 0) = COALESCE(r.employee_id, 0)
+                  AND COALESCE(s.batch_id, 0) = COALESCE(r.batch_id, 0)
+                  AND s.company_id = r.company_id
+        """, page=SQL(", ").join(page), legs=legs, snapshot_date=snapshot_date))
+        return {movement_id: (before, after) for movement_id, before, after in self.env.cr.fetchall()}
+
+    @api.depends('serial_ids.name')
+    def _compute_serial_numbers(self):
+        """Формує текстове представлення серійних номерів руху з реєстру"""
+        for movement in self:
+            movement.serial_numbers = '\n'.join(movement.serial_ids.mapped('name')) or False
+
+    def _inverse_serial_numbers(self):
+        """Прив'язує серійні номери руху до реєстру"""
+        Serial = self.env['stock.serial']
+        for movement in self:
+            movement.serial_ids = Serial._register_serials(
+                movement.nomenclature_id.id, movement.serial_numbers,
+                batch=movement.batch_id, company_id=movement.company_id.id,
+            )
+
+    def _search_serial_numbers(self, operator, value):
+        return self.env['stock.serial']._search_by_text('serial_ids', operator, value)
+
     @api.depends('movement_type', 'operation_type', 'nomenclature_id', 'qty', 'date')
     def _compute_display_name(self):
         """Генерує відображувану назву руху залишків"""
@@ -135,48 +297,13 @@ class StockBalanceMovement(models.Model):
                        batch_id=None, uom_id=None, document_reference=None,
                        notes=None, serial_numbers=None, company_id=None, date=None):
         """
-        Створює рух залишків та оновлює баланси, зберігає залишок до/після.
+        Створює рух залишків та оновлює баланси.
         """
-        if company_id is None:
-            company_id = self.env.company.id
-        if uom_id is None:
-            nomenclature = self.env['product.nomenclature'].browse(nomenclature_id)
-            uom_id = nomenclature.base_uom_id.id
-        if date is None:
-            date = fields.Datetime.now()
-        # Визначаємо залишок до руху
-        Balance = self.env['stock.balance']
-        domain = [
-            ('nomenclature_id', '=', nomenclature_id),
-            ('company_id', '=', company_id),
-        ]
-        if location_from_type == 'warehouse':
-            domain += [('location_type', '=', 'warehouse'), ('warehouse_id', '=', warehouse_from_id)]
-            if location_from_id:
-                domain += [('location_id', '=', location_from_id)]
-        elif location_from_type == 'employee':
-            domain += [('location_type', '=', 'employee'), ('employee_id', '=', employee_from_id)]
-        if batch_id:
-            domain += [('batch_id', '=', batch_id)]
-        else:
-            domain += [('batch_id', '=', False)]
-        balance_before = 0.0
-        balance_after = 0.0
-        balance_rec = Balance.search(domain, limit=1)
-        if balance_rec:
-            balance_before = balance_rec.qty_on_hand
-        movement_vals = {
+        return self.create_movements_bulk([{
             'nomenclature_id': nomenclature_id,
+            'qty': qty,
             'movement_type': movement_type,
             'operation_type': operation_type,
-            'qty': qty,
-            'uom_id': uom_id,
-            'date': date,
-            'document_reference': document_reference,
-            'notes': notes,
-            'serial_numbers': serial_numbers,
-            'company_id': company_id,
-            'batch_id': batch_id,
             'location_from_type': location_from_type,
             'location_to_type': location_to_type,
             'warehouse_from_id': warehouse_from_id,
@@ -185,69 +312,177 @@ class StockBalanceMovement(models.Model):
             'employee_to_id': employee_to_id,
             'location_from_id': location_from_id,
             'location_to_id': location_to_id,
-            'balance_before': balance_before,
-            'balance_id': balance_rec.id if balance_rec else False,
+            'batch_id': batch_id,
+            'uom_id': uom_id,
+            'document_reference': document_reference,
+            'notes': notes,
+            'serial_numbers': serial_numbers,
+            'company_id': company_id,
+            'date': date,
+        }])
+
+    @api.model
+    def create_movements_bulk(self, specs):
+        """
+        Створює рухи залишків пакетом: один upsert залишків та один create для всіх рухів.
+        Специфікації мають ті самі ключі, що й аргументи create_movement.
+        """
+        if not specs:
+            return self.browse()
+        now = fields.Datetime.now()
+        missing_uom = {spec['nomenclature_id'] for spec in specs if not spec.get('uom_id')}
+        base_uoms = {}
+        if missing_uom:
+            nomenclatures = self.env['product.nomenclature'].browse(missing_uom)
+            base_uoms = {nom.id: nom.base_uom_id.id for nom in nomenclatures}
+
+        vals_list = []
+        balance_specs = []
+        legs = []
+        serial_legs = []
+        for spec in specs:
+            vals = {key: value for key, value in spec.items() if value is not None}
+            vals.setdefault('company_id', self.env.company.id)
+            vals.setdefault('uom_id', base_uoms.get(spec['nomenclature_id']))
+            vals.setdefault('date', now)
+            # Серійні номери реєструє update_balance_bulk, а не inverse поля на кожен рух
+            serial_numbers = vals.pop('serial_numbers', None)
+            vals_list.append(vals)
+            from_index = to_index = None
+            for side, sign in (('from', -1), ('to', 1)):
+                leg = self._get_balance_leg(vals, side)
+                if not leg:
+                    continue
+                leg['qty_change'] = sign * vals['qty']
+                if side == 'to':
+                    leg['serial_numbers'] = serial_numbers
+                if side == 'from':
+                    from_index = len(balance_specs)
+                else:
+                    to_index = len(balance_specs)
+                balance_specs.append(leg)
+            legs.append(from_index if from_index is not None else to_index)
+            serial_legs.append((to_index, serial_numbers))
+
+        date_min = min(fields.Datetime.to_datetime(vals['date']) for vals in vals_list)
+        self.env['stock.balance.movement.archive']._check_archive_date([date_min])
+        self.env['stock.balance.snapshot']._invalidate_snapshots(date_min)
+        results = self.env['stock.balance'].update_balance_bulk(balance_specs)
+        unlinked_serials = {}
+        for vals, index, (to_index, serial_numbers) in zip(vals_list, legs, serial_legs):
+            if index is not None:
+                vals['balance_id'] = results[index][0].id
+            if to_index is not None and results[to_index][3]:
+                vals['serial_ids'] = [(6, 0, results[to_index][3].ids)]
+            elif serial_numbers:
+                key = (vals['nomenclature_id'], vals.get('batch_id'), vals['company_id'])
+                unlinked_serials.setdefault(key, []).append((vals, serial_numbers))
+        # Серійні номери рухів без надходження на залишок - одна реєстрація на номенклатуру та партію
+        Serial = self.env['stock.serial']
+        for (nomenclature_id, batch_id, company_id), entries in unlinked_serials.items():
+            names = [name for __, serial_numbers in entries for name in Serial._normalize_serials(serial_numbers)]
+            serials = Serial._register_serials(
+                nomenclature_id, names, batch=self.env['stock.batch'].browse(batch_id), company_id=company_id,
+            )
+            for vals, serial_numbers in entries:
+                entry_names = set(Serial._normalize_serials(serial_numbers))
+                vals['serial_ids'] = [(6, 0, serials.filtered(lambda s: s.name in entry_names).ids)]
+        return self.create(vals_list)
+
+    @api.model
+    def _get_balance_leg(self, vals, side):
+        """Повертає специфікацію оновлення залишку для сторони руху (from/to)"""
+        location_type = vals.get(f'location_{side}_type')
+        if location_type not in ('warehouse', 'employee'):
+            return None
+        leg = {
+            'nomenclature_id': vals['nomenclature_id'],
+            'location_type': location_type,
+            'batch_id': vals.get('batch_id'),
+            'uom_id': vals.get('uom_id'),
+            'company_id': vals['company_id'],
         }
-        movement = self.create(movement_vals)
-        self._update_balances_from_movement(movement)
-        # Визначаємо залишок після руху
-        balance_rec_after = Balance.search(domain, limit=1)
-        if balance_rec_after:
-            movement.balance_after = balance_rec_after.qty_on_hand
+        if location_type == 'warehouse':
+            leg.update(
+                warehouse_id=vals.get(f'warehouse_{side}_id'),
+                location_id=vals.get(f'location_{side}_id'),
+            )
         else:
-            movement.balance_after = 0.0
-        return movement
+            leg['employee_id'] = vals.get(f'employee_{side}_id')
+        return leg
 
-    def _update_balances_from_movement(self, movement):
+    @api.model
+    def _get_legs_sql(self, date_from=None, date_to=None, company_ids=None, nomenclature_ids=None,
+                      with_archive=True):
         """
-        Оновлює баланси на основі руху (списання з джерела, надходження в призначення).
+        Повертає SQL підзапит ніг рухів: одна нога на сторону руху зі знаковою кількістю
+        (списання з локації -qty, надходження +qty) та ключем залишку як у _get_balance_leg.
+        Колонки: nomenclature_id, location_type, warehouse_id, location_id, employee_id,
+        batch_id, company_id, qty, date, movement_id, leg (0 - списання, 1 - надходження).
+        Період [date_from, date_to), компанії company_ids, номенклатура nomenclature_ids.
+        Якщо період сягає архівованих дат, ноги читаються також з архіву рухів.
         """
-        Balance = self.env['stock.balance']
-        # Списання з локації відправлення
-        if movement.location_from_type in ['warehouse', 'employee']:
-            if movement.location_from_type == 'warehouse':
-                Balance.update_balance(
-                    nomenclature_id=movement.nomenclature_id.id,
-                    qty_change=-movement.qty,
-                    location_type='warehouse',
-                    warehouse_id=movement.warehouse_from_id.id,
-                    location_id=movement.location_from_id.id if movement.location_from_id else None,
-                    batch_id=movement.batch_id.id if movement.batch_id else None,
-                    uom_id=movement.uom_id.id,
-                    company_id=movement.company_id.id,
-                )
-            else:  # employee
-                Balance.update_balance(
-                    nomenclature_id=movement.nomenclature_id.id,
-                    qty_change=-movement.qty,
-                    location_type='employee',
-                    employee_id=movement.employee_from_id.id,
-                    batch_id=movement.batch_id.id if movement.batch_id else None,
-                    uom_id=movement.uom_id.id,
-                    company_id=movement.company_id.id,
-                )
-        # Надходження в локацію призначення
-        if movement.location_to_type in ['warehouse', 'employee']:
-            if movement.location_to_type == 'warehouse':
-                Balance.update_balance(
-                    nomenclature_id=movement.nomenclature_id.id,
-                    qty_change=movement.qty,
-                    location_type='warehouse',
-                    warehouse_id=movement.warehouse_to_id.id,
-                    location_id=movement.location_to_id.id if movement.location_to_id else None,
-                    batch_id=movement.batch_id.id if movement.batch_id else None,
-                    uom_id=movement.uom_id.id,
-                    company_id=movement.company_id.id,
-                    serial_numbers=movement.serial_numbers,
-                )
-            else:  # employee
-                Balance.update_balance(
-                    nomenclature_id=movement.nomenclature_id.id,
-                    qty_change=movement.qty,
-                    location_type='employee',
-                    employee_id=movement.employee_to_id.id,
-                    batch_id=movement.batch_id.id if movement.batch_id else None,
-                    uom_id=movement.uom_id.id,
-                    company_id=movement.company_id.id,
-                    serial_numbers=movement.serial_numbers,
-                )
\ No newline at end of file
+        conditions = [SQL("TRUE")]
+        if date_from:
+            conditions.append(SQL("m.date >= %s", date_from))
+        if date_to:
+            conditions.append(SQL("m.date < %s", date_to))
+        if company_ids:
+            conditions.append(SQL("m.company_id = ANY(%s)", list(company_ids)))
+        if nomenclature_ids:
+            conditions.append(SQL("m.nomenclature_id = ANY(%s)", list(nomenclature_ids)))
+        where = SQL(" AND ").join(conditions)
+        tables = [SQL("stock_balance_movement")]
+        archive_end = with_archive and self.env['stock.balance.movement.archive']._get_archive_end()
+        if archive_end and (not date_from or date_from < archive_end):
+            tables.append(SQL("stock_balance_movement_archive"))
+        legs = [
+            SQL("""
+                SELECT m.nomenclature_id,
+                       m.location_%(side)s_type AS location_type,
+                       CASE WHEN m.location_%(side)s_type = 'warehouse' THEN m.warehouse_%(side)s_id END AS warehouse_id,
+                       CASE WHEN m.location_%(side)s_type = 'warehouse' THEN m.location_%(side)s_id END AS location_id,
+                       CASE WHEN m.location_%(side)s_type = 'employee' THEN m.employee_%(side)s_id END AS employee_id,
+                       m.batch_id,
+                       m.company_id,
+                       %(sign)s * m.qty AS qty,
+                       m.date,
+                       m.id AS movement_id,
+                       %(leg)s AS leg
+                FROM %(table)s m
+                WHERE m.location_%(side)s_type IN ('warehouse', 'employee') AND %(where)s
+            """, table=table, side=SQL(side), sign=sign, leg=leg, where=where)
+            for table in tables
+            for leg, (side, sign) in enumerate((('from', -1), ('to', 1)))
+        ]
+        return SQL("(%s)", SQL(" UNION ALL ").join(legs))
+
+    @api.model
+    def _recompute_balance_links(self, company_ids, warehouse_ids=None, nomenclature_ids=None):
+        """
+        Відновлює посилання рухів області на залишок одним UPDATE: рух посилається на залишок
+        ноги списання, або надходження, якщо списання немає. Залишок до/після не зберігається,
+        а рахується при читанні (_get_running_balances). Повертає кількість змінених рухів.
+        """
+        self.flush_model()
+        scope = self.env['stock.balance']._get_rebuild_scope_sql('legs', company_ids, warehouse_ids, nomenclature_ids)
+        self.env.cr.execute(SQL("""
+            UPDATE stock_balance_movement m
+            SET balance_id = sb.id
+            FROM %(legs)s legs
+            JOIN stock_balance sb
+              ON sb.nomenclature_id = legs.nomenclature_id
+             AND sb.location_type = legs.location_type
+             AND COALESCE(sb.warehouse_id, 0) = COALESCE(legs.warehouse_id, 0)
+             AND COALESCE(sb.location_id, 0) = COALESCE(legs.location_id, 0)
+             AND COALESCE(sb.employee_id, 0) = COALESCE(legs.employee_id, 0)
+             AND COALESCE(sb.batch_id, 0) = COALESCE(legs.batch_id, 0)
+             AND sb.company_id = legs.company_id
+            WHERE m.id = legs.movement_id
+              AND legs.leg = CASE WHEN m.location_from_type IN ('warehouse', 'employee') THEN 0 ELSE 1 END
+              AND %(scope)s
+              AND m.balance_id IS DISTINCT FROM sb.id
+        """, legs=self._get_legs_sql(company_ids=company_ids, with_archive=False), scope=scope))
+        count = self.env.cr.rowcount
+        self.invalidate_model(['balance_id'])
+        return count
@@ -0,0 +1,137 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+from dateutil.relativedelta import relativedelta
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Колонки, що переносяться з stock_balance_movement в архів (id зберігається)
+ARCHIVE_COLUMNS = [
+    'id', 'nomenclature_id', 'movement_type', 'operation_type',
+    'location_from_type', 'location_to_type', 'warehouse_from_id', 'warehouse_to_id',
+    'employee_from_id', 'employee_to_id', 'location_from_id', 'location_to_id',
+    'batch_id', 'qty', 'uom_id', 'date', 'document_reference', 'company_id', 'user_id', 'notes',
+]
+
+
+class StockBalanceMovementArchive(models.Model):
+    """
+    Архів рухів залишків закритих періодів: компактна копія рядків stock.balance.movement
+    з тими ж id та колонками ключа, без службових полів. Журнал рухів (_get_legs_sql)
+    читає архів лише коли період запиту сягає архівованих дат.
+    """
+    _name = 'stock.balance.movement.archive'
+    _description = 'Архів рухів залишків'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    nomenclature_id = fields.Many2one('product.nomenclature', string='Номенклатура', required=True, index=True)
+    movement_type = fields.Selection(
+        selection=lambda self: self.env['stock.balance.movement']._fields['movement_type'].selection,
+        string='Тип руху', required=True,
+    )
+    operation_type = fields.Selection(
+        selection=lambda self: self.env['stock.balance.movement']._fields['operation_type'].selection,
+        string='Тип операції', required=True,
+    )
+    location_from_type = fields.Selection(
+        selection=lambda self: self.env['stock.balance.movement']._fields['location_from_type'].selection,
+        string='Тип локації (з)',
+    )
+    location_to_type = fields.Selection(
+        selection=lambda self: self.env['stock.balance.movement']._fields['location_to_type'].selection,
+        string='Тип локації (в)',
+    )
+    warehouse_from_id = fields.Many2one('stock.warehouse', string='Склад (з)')
+    warehouse_to_id = fields.Many2one('stock.warehouse', string='Склад (в)')
+    employee_from_id = fields.Many2one('hr.employee', string='Працівник (з)')
+    employee_to_id = fields.Many2one('hr.employee', string='Працівник (в)')
+    location_from_id = fields.Many2one('stock.location', string='Локація (з)')
+    location_to_id = fields.Many2one('stock.location', string='Локація (в)')
+    batch_id = fields.Many2one('stock.batch', string='Партія')
+    qty = fields.Float(string='Кількість', required=True, digits='Product Unit of Measure')
+    uom_id = fields.Many2one('uom.uom', string='Одиниця виміру', required=True)
+    date = fields.Datetime(string='Дата та час', required=True, index=True)
+    document_reference = fields.Char(string='Документ')
+    company_id = fields.Many2one('res.company', string='Компанія', required=True)
+    user_id = fields.Many2one('res.users', string='Користувач', required=True)
+    notes = fields.Text(string='Примітки')
+    serial_numbers = fields.Text(string='Серійні номери')
+
+    @api.model
+    def _get_archive_end(self):
+        """Повертає момент (UTC), до якого рухи залишків перенесені в архів, або False"""
+        value = self.env['ir.config_parameter'].sudo().get_param('stock_balance_management.archive_date_end')
+        return fields.Datetime.to_datetime(value) if value else False
+
+    @api.model
+    def _check_archive_date(self, dates):
+        """Забороняє рухи залишків в архівованому (закритому) періоді"""
+        archive_end = self._get_archive_end()
+        if archive_end and dates and min(dates) < archive_end:
+            raise UserError(_('Період до %s закрито та архівовано. Рухи залишків в ньому неможливі.') % archive_end)
+
+    @api.model
+    def _archive_movements(self, date):
+        """
+        Закриває період до кінця дня date: за параметром archive_opening_snapshot створює
+        знімок залишків на date (залишок на початок відкритого періоду по кожному ключу,
+        від якого рахуються звіти без читання архіву), переносить рухи залишків та партій
+        з датою до кінця дня в архівні таблиці. Повертає кількість перенесених рухів залишків.
+        """
+        Snapshot = self.env['stock.balance.snapshot']
+        date_end = Snapshot._get_date_end(date)
+        archive_end = self._get_archive_end()
+        if archive_end and date_end <= archive_end:
+            return 0
+        opening = self.env['ir.config_parameter'].sudo().get_param(
+            'stock_balance_management.archive_opening_snapshot', '1'
+        ) not in ('0', 'False', 'false', '')
+        if opening:
+            # Межа архіву збігається з межею знімка на початок відкритого періоду
+            date_end = Snapshot._create_snapshot(date)
+        self.env['stock.balance.movement'].flush_model()
+        columns = SQL(", ").join(SQL.identifier(column) for column in ARCHIVE_COLUMNS)
+        self.env.cr.execute(SQL("""
+            INSERT INTO stock_balance_movement_archive (%(columns)s, serial_numbers)
+            SELECT %(m_columns)s, serials.names
+            FROM stock_balance_movement m
+            LEFT JOIN LATERAL (
+                SELECT string_agg(s.name, E'\\n' ORDER BY s.name) AS names
+                FROM stock_balance_movement_serial_rel rel
+                JOIN stock_serial s ON s.id = rel.serial_id
+                WHERE rel.movement_id = m.id
+            ) serials ON TRUE
+            WHERE m.date < %(date_end)s
+        """, columns=columns, date_end=date_end, m_columns=SQL(", ").join(
+            SQL.identifier('m', column) for column in ARCHIVE_COLUMNS
+        )))
+        count = self.env.cr.rowcount
+        self.env.cr.execute(SQL("DELETE FROM stock_balance_movement WHERE date < %s", date_end))
+        self.env['ir.config_parameter'].sudo().set_param(
+            'stock_balance_management.archive_date_end', fields.Datetime.to_string(date_end),
+        )
+        self.env['stock.balance.movement'].invalidate_model()
+        self.invalidate_model()
+        batch_count = self.env['stock.batch.movement.archive']._archive_movements(date_end)
+        _logger.info(
+            "Movements before %s archived: %s balance movements, %s batch movements",
+            date_end, count, batch_count,
+        )
+        return count
+
+    @api.model
+    def _cron_archive_movements(self):
+        """
+        Архівує рухи місяців, старших за archive_keep_months (0 - не архівувати):
+        період закривається на останній день місяця.
+        """
+        keep_months = int(self.env['ir.config_parameter'].sudo().get_param(
+            'stock_balance_management.archive_keep_months', 0
+        ))
+        if keep_months <= 0:
+            return
+        month_start = fields.Date.context_today(self).replace(day=1) - relativedelta(months=keep_months)
+        self._archive_movements(month_start - timedelta(days=1))
@@ -0,0 +1,184 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+
+class StockBalanceReconciliation(models.Model):
+    """
+    Звірка залишків з журналом рухів. Очікувана кількість по кожному ключу залишку
+    рахується одним агрегуючим запитом по рухах компанії і порівнюється з stock.balance;
+    розбіжності записуються в рядки звірки і можуть бути виправлені.
+    """
+    _name = 'stock.balance.reconciliation'
+    _description = 'Звірка залишків з журналом рухів'
+    _order = 'date_start desc, id desc'
+    _rec_name = 'date_start'
+
+    date_start = fields.Datetime('Початок', required=True, readonly=True, default=fields.Datetime.now)
+    duration = fields.Float('Тривалість, с', readonly=True, digits=(16, 1))
+    company_ids = fields.Many2many('res.company', string='Компанії', readonly=True)
+    state = fields.Selection([
+        ('done', 'Виконано'),
+        ('repaired', 'Виправлено'),
+    ], 'Статус', default='done', readonly=True)
+    discrepancy_count = fields.Integer('Розбіжностей', readonly=True)
+    line_ids = fields.One2many('stock.balance.reconciliation.line', 'reconciliation_id', 'Розбіжності', readonly=True)
+
+    @api.model
+    def _get_tolerance(self):
+        """Допустима розбіжність: половина одиниці останнього знаку точності кількості"""
+        digits = self.env['decimal.precision'].precision_get('Product Unit of Measure')
+        return 0.5 * 10 ** -digits
+
+    @api.model
+    def run_reconciliation(self, companies=None, repair=False):
+        """Звіряє залишки вказаних (за замовчуванням всіх) компаній з журналом рухів"""
+        companies = companies or self.env['res.company'].sudo().search([])
+        start = time.perf_counter()
+        self.env['stock.balance'].flush_model()
+        self.env['stock.balance.movement'].flush_model()
+        reconciliation = self.create({'company_ids': [(6, 0, companies.ids)]})
+        reconciliation.flush_recordset()
+        for company in companies:
+            company_start = time.perf_counter()
+            count = reconciliation._reconcile_company(company)
+            _logger.info(
+                "Balance reconciliation for %s: %s discrepancies in %.1f s",
+                company.name, count, time.perf_counter() - company_start,
+            )
+        self.env['stock.balance.reconciliation.line'].invalidate_model()
+        reconciliation.write({
+            'discrepancy_count': len(reconciliation.line_ids),
+            'duration': time.perf_counter() - start,
+        })
+        if repair and reconciliation.line_ids:
+            reconciliation.action_repair()
+        return reconciliation
+
+    def _reconcile_company(self, company):
+        """
+        Одним запитом агрегує ноги рухів компанії по ключу залишку, з'єднує з залишками
+        (FULL JOIN по ключу з COALESCE, як в унікальному індексі залишків) і записує розбіжності.
+        """
+        self.ensure_one()
+        Movement = self.env['stock.balance.movement']
+        self.env.cr.execute(SQL("""
+            WITH ledger AS (
+                SELECT nomenclature_id, location_type, warehouse_id, location_id,
+                       employee_id, batch_id, company_id, SUM(qty) AS qty
+                FROM %(legs)s legs
+                GROUP BY nomenclature_id, location_type, warehouse_id, location_id,
+                         employee_id, batch_id, company_id
+            ), balance AS (
+                SELECT id, nomenclature_id, location_type, warehouse_id, location_id,
+                       employee_id, batch_id, company_id, qty_on_hand
+                FROM stock_balance
+                WHERE company_id = %(company_id)s
+            )
+            INSERT INTO stock_balance_reconciliation_line (
+                reconciliation_id, balance_id, nomenclature_id, location_type, warehouse_id,
+                location_id, employee_id, batch_id, company_id, balance_qty, ledger_qty, difference,
+                repaired, create_uid, create_date, write_uid, write_date
+            )
+            SELECT %(reconciliation_id)s, b.id,
+                   COALESCE(b.nomenclature_id, l.nomenclature_id),
+                   COALESCE(b.location_type, l.location_type),
+                   COALESCE(b.warehouse_id, l.warehouse_id),
+                   COALESCE(b.location_id, l.location_id),
+                   COALESCE(b.employee_id, l.employee_id),
+                   COALESCE(b.batch_id, l.batch_id),
+                   COALESCE(b.company_id, l.company_id),
+                   COALESCE(b.qty_on_hand, 0),
+                   COALESCE(l.qty, 0),
+                   COALESCE(b.qty_on_hand, 0) - COALESCE(l.qty, 0),
+                   FALSE, %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM ledger l
+            FULL JOIN balance b
+                ON b.nomenclature_id = l.nomenclature_id
+               AND b.location_type = l.location_type
+               AND COALESCE(b.warehouse_id, 0) = COALESCE(l.warehouse_id, 0)
+               AND COALESCE(b.location_id, 0) = COALESCE(l.location_id, 0)
+               AND COALESCE(b.employee_id, 0) = COALESCE(l.employee_id, 0)
+               AND COALESCE(b.batch_id, 0) = COALESCE(l.batch_id, 0)
+               AND b.company_id = l.company_id
+            WHERE ABS(COALESCE(b.qty_on_hand, 0) - COALESCE(l.qty, 0)) > %(tolerance)s
+        """,
+            legs=Movement._get_legs_sql(company_ids=[company.id]),
+            company_id=company.id,
+            reconciliation_id=self.id,
+            uid=self.env.uid,
+            tolerance=self._get_tolerance(),
+        ))
+        return self.env.cr.rowcount
+
+    def action_repair(self):
+        """Приводить залишки з розбіжностями до кількості за журналом рухів"""
+        for reconciliation in self:
+            lines = reconciliation.line_ids.filtered(lambda l: not l.repaired)
+            if not lines:
+                raise UserError(_('Немає розбіжностей для виправлення.'))
+            self.env['stock.balance'].update_balance_bulk([{
+                'nomenclature_id': line.nomenclature_id.id,
+                'qty_change': -line.difference,
+                'location_type': line.location_type,
+                'warehouse_id': line.warehouse_id.id,
+                'location_id': line.location_id.id,
+                'employee_id': line.employee_id.id,
+                'batch_id': line.batch_id.id,
+                'company_id': line.company_id.id,
+            } for line in lines])
+            lines.repaired = True
+            reconciliation.state = 'repaired'
+            _logger.warning("Balance reconciliation %s: repaired %s balances", reconciliation.id, len(lines))
+
+    @api.model
+    def _cron_reconcile(self):
+        """Нічна звірка залишків; виправлення - за параметром reconciliation_auto_repair"""
+        repair = self.env['ir.config_parameter'].sudo().get_param(
+            'stock_balance_management.reconciliation_auto_repair', '0'
+        ) not in ('0', 'False', 'false', '')
+        self.run_reconciliation(repair=repair)
+
+    @api.model
+    def action_run_reconciliation(self):
+        """Запускає звірку вручну та відкриває її результат"""
+        reconciliation = self.run_reconciliation()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': reconciliation.id,
+            'view_mode': 'form',
+        }
+
+
+class StockBalanceReconciliationLine(models.Model):
+    """Розбіжність залишку з журналом рухів"""
+    _name = 'stock.balance.reconciliation.line'
+    _description = 'Розбіжність звірки залишків'
+    _order = 'reconciliation_id desc, nomenclature_id'
+
+    reconciliation_id = fields.Many2one(
+        'stock.balance.reconciliation', 'Звірка', required=True, ondelete='cascade', index=True
+    )
+    balance_id = fields.Many2one(
+        'stock.balance', 'Залишок', ondelete='set null',
+        help='Порожньо - залишку немає, хоча за журналом рухів він має бути'
+    )
+    nomenclature_id = fields.Many2one('product.nomenclature', 'Номенклатура', required=True)
+    location_type = fields.Selection([
+        ('warehouse', 'Склад'),
+        ('employee', 'Працівник'),
+    ], 'Тип локації', required=True)
+    warehouse_id = fields.Many2one('stock.warehouse', 'Склад')
+    location_id = fields.Many2one('stock.location', 'Локація складу')
+    employee_id = fields.Many2one('hr.employee', 'Працівник')
+    batch_id = fields.Many2one('stock.batch', 'Партія')
+    company_id = fields.Many2one('res.company', 'Компанія', required=True)
+    balance_qty = fields.Float('Залишок', digits='Product Unit of Measure')
+    ledger_qty = fields.Float('За журналом рухів', digits='Product Unit of Measure')
+    difference = fields.Float('Розбіжність', digits='Product Unit of Measure')
+    repaired = fields.Boolean('Виправлено')
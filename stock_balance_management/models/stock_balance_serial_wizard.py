@@ -27,8 +27,9 @@ class StockBalanceSerialWizard(models.TransientModel):
             balance = self.env['stock.balance'].browse(balance_id)
             res['balance_id'] = balance_id
             
-            serials = balance.get_serial_numbers_list()
-            res['serial_line_ids'] = [(0, 0, {'serial_number': serial}) for serial in serials]
+            res['serial_line_ids'] = [
+                (0, 0, {'serial_number': serial}) for serial in balance.serial_ids.mapped('name')
+            ]
         
         return res
 
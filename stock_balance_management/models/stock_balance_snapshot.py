@@ -0,0 +1,190 @@
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+from datetime import datetime, time, timedelta
+import logging
+import pytz
+
+_logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY_COLUMNS = SQL(
+    "nomenclature_id, location_type, warehouse_id, location_id, employee_id, batch_id, company_id"
+)
+
+
+class StockBalanceSnapshot(models.Model):
+    """
+    Знімки залишків на кінець дня по ключу залишку (номенклатура, локація, партія, компанія).
+    Залишок на довільну дату = найближчий знімок + рухи після нього. Межа знімка зберігається
+    моментом date_end (UTC), тому читання не залежить від часового поясу користувача.
+    """
+    _name = 'stock.balance.snapshot'
+    _description = 'Знімок залишків на дату'
+    _order = 'date desc, nomenclature_id'
+
+    date = fields.Date(
+        string='Дата знімка',
+        required=True,
+        readonly=True,
+        index=True,
+        help='Залишок на кінець дня'
+    )
+    date_end = fields.Datetime(
+        string='Межа знімка',
+        required=True,
+        readonly=True,
+        index=True,
+        help='Знімок враховує рухи з датою до цього моменту (UTC)'
+    )
+    nomenclature_id = fields.Many2one(
+        'product.nomenclature',
+        string='Номенклатура',
+        required=True,
+        readonly=True
+    )
+    location_type = fields.Selection([
+        ('warehouse', 'Склад'),
+        ('employee', 'Працівник'),
+    ], string='Тип локації', required=True, readonly=True)
+    warehouse_id = fields.Many2one('stock.warehouse', string='Склад', readonly=True)
+    location_id = fields.Many2one('stock.location', string='Локація складу', readonly=True)
+    employee_id = fields.Many2one('hr.employee', string='Працівник', readonly=True)
+    batch_id = fields.Many2one('stock.batch', string='Партія', readonly=True)
+    company_id = fields.Many2one('res.company', string='Компанія', required=True, readonly=True)
+    qty = fields.Float(
+        string='Кількість',
+        readonly=True,
+        digits='Product Unit of Measure'
+    )
+
+    def init(self):
+        """Унікальний індекс по даті та ключу залишку"""
+        tools.create_unique_index(self.env.cr, 'stock_balance_snapshot_key_uniq', self._table, [
+            'date', 'nomenclature_id', 'location_type', 'COALESCE(warehouse_id, 0)',
+            'COALESCE(location_id, 0)', 'COALESCE(employee_id, 0)',
+            'COALESCE(batch_id, 0)', 'company_id',
+        ])
+
+    @api.model
+    def _get_tz(self):
+        return pytz.timezone(self.env.context.get('tz') or self.env.user.tz or 'UTC')
+
+    @api.model
+    def _get_date_end(self, date):
+        """Повертає момент (UTC) кінця дня date у часовому поясі користувача"""
+        local_end = self._get_tz().localize(datetime.combine(date + timedelta(days=1), time.min))
+        return local_end.astimezone(pytz.utc).replace(tzinfo=None)
+
+    @api.model
+    def _get_last_snapshot_date(self, max_date=None):
+        """Повертає дату останнього знімка (не пізніше max_date)"""
+        self.flush_model(['date'])
+        if max_date:
+            self.env.cr.execute(SQL("SELECT MAX(date) FROM stock_balance_snapshot WHERE date <= %s", max_date))
+        else:
+            self.env.cr.execute(SQL("SELECT MAX(date) FROM stock_balance_snapshot"))
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _get_last_snapshot(self, moment):
+        """Повертає (дата, межа) останнього знімка з межею не пізніше moment, або (None, None)"""
+        self.flush_model(['date', 'date_end'])
+        self.env.cr.execute(SQL("""
+            SELECT date, date_end FROM stock_balance_snapshot
+            WHERE date_end <= %s
+            ORDER BY date_end DESC
+            LIMIT 1
+        """, moment))
+        return self.env.cr.fetchone() or (None, None)
+
+    @api.model
+    def _create_snapshot(self, date):
+        """
+        Створює знімок залишків на кінець дня date одним INSERT ... SELECT:
+        попередній знімок + ноги рухів між його межею та межею нового знімка.
+        Повертає межу створеного знімка.
+        """
+        self.env['stock.balance.movement'].flush_model()
+        self.flush_model()
+        date_end = self._get_date_end(date)
+        self.env.cr.execute(SQL("DELETE FROM stock_balance_snapshot WHERE date = %s", date))
+        previous, previous_end = self._get_last_snapshot(date_end)
+        legs = self.env['stock.balance.movement']._get_legs_sql(previous_end, date_end)
+        now = fields.Datetime.now()
+        self.env.cr.execute(SQL("""
+            INSERT INTO stock_balance_snapshot (
+                date, date_end, nomenclature_id, location_type, warehouse_id, location_id, employee_id,
+                batch_id, company_id, qty, create_uid, create_date, write_uid, write_date
+            )
+            SELECT %(date)s, %(date_end)s, %(key)s, SUM(qty), %(uid)s, %(now)s, %(uid)s, %(now)s
+            FROM (
+                SELECT %(key)s, qty FROM stock_balance_snapshot WHERE date = %(previous)s
+                UNION ALL
+                SELECT %(key)s, qty FROM %(legs)s legs
+            ) src
+            GROUP BY %(key)s
+            HAVING SUM(qty) <> 0
+        """, date=date, date_end=date_end, key=SNAPSHOT_KEY_COLUMNS, uid=self.env.uid, now=now,
+            previous=previous, legs=legs))
+        _logger.info("Balance snapshot for %s created: %s rows (previous: %s)", date, self.env.cr.rowcount, previous)
+        self.invalidate_model()
+        return date_end
+
+    @api.model
+    def _invalidate_snapshots(self, moment):
+        """Видаляє знімки, які не враховують рух з датою moment (заднім числом)"""
+        self.flush_model()
+        self.env.cr.execute(SQL("DELETE FROM stock_balance_snapshot WHERE date_end > %s", moment))
+        if self.env.cr.rowcount:
+            _logger.info("Balance snapshots from %s invalidated by back-dated movement", moment)
+            self.invalidate_model()
+
+    @api.model
+    def _cron_create_snapshots(self):
+        """Створює знімок залишків на кінець попереднього дня (або місяця)"""
+        interval = self.env['ir.config_parameter'].sudo().get_param(
+            'stock_balance_management.snapshot_interval', 'daily'
+        )
+        date = fields.Date.context_today(self) - timedelta(days=1)
+        if interval == 'monthly' and (date + timedelta(days=1)).day != 1:
+            return
+        last = self._get_last_snapshot_date()
+        if last and last >= date:
+            return
+        self._create_snapshot(date)
+
+    @api.model
+    def get_balance_at(self, at, nomenclature_ids=None, location_type=None, warehouse_ids=None,
+                       employee_ids=None, batch_ids=None, company_ids=None):
+        """
+        Повертає залишки на момент at (datetime UTC, або дата - на кінець дня) списком словників
+        з ключем залишку та qty. Бере найближчий знімок і додає лише рухи після нього.
+        """
+        if isinstance(at, datetime):
+            moment = at
+        else:
+            moment = self._get_date_end(fields.Date.to_date(at))
+        self.env['stock.balance.movement'].flush_model()
+        snapshot_date, snapshot_end = self._get_last_snapshot(moment)
+        legs = self.env['stock.balance.movement']._get_legs_sql(snapshot_end, moment)
+        conditions = [SQL("TRUE")]
+        for column, values in (
+            ('nomenclature_id', nomenclature_ids), ('warehouse_id', warehouse_ids),
+            ('employee_id', employee_ids), ('batch_id', batch_ids), ('company_id', company_ids),
+        ):
+            if values:
+                conditions.append(SQL("%s IN %s", SQL.identifier(column), tuple(values)))
+        if location_type:
+            conditions.append(SQL("location_type = %s", location_type))
+        self.env.cr.execute(SQL("""
+            SELECT %(key)s, SUM(qty) AS qty
+            FROM (
+                SELECT %(key)s, qty FROM stock_balance_snapshot WHERE date = %(snapshot_date)s
+                UNION ALL
+                SELECT %(key)s, qty FROM %(legs)s legs
+            ) src
+            WHERE %(where)s
+            GROUP BY %(key)s
+            HAVING SUM(qty) <> 0
+        """, key=SNAPSHOT_KEY_COLUMNS, snapshot_date=snapshot_date, legs=legs,
+            where=SQL(" AND ").join(conditions)))
+        return self.env.cr.dictfetchall()
@@ -64,18 +64,18 @@ class StockBalanceReportWizard(models.TransientModel):
     def action_generate_report(self):
         """
         Генерує звіт по залишках відповідно до вибраного типу.
+        Звіт відкривається з доменом фільтрів, групування виконує read_group.
         """
         self.ensure_one()
         domain = self._get_balance_domain()
-        balances = self.env['stock.balance'].search(domain)
         if self.report_type == 'by_employee':
-            return self._generate_employee_report(balances)
+            return self._generate_employee_report(domain)
         elif self.report_type == 'by_warehouse':
-            return self._generate_warehouse_report(balances)
+            return self._generate_warehouse_report(domain)
         elif self.report_type == 'by_batch':
-            return self._generate_batch_report(balances)
+            return self._generate_batch_report(domain)
         else:
-            return self._generate_summary_report(balances)
+            return self._generate_summary_report(domain)
 
     def _get_balance_domain(self):
         """
@@ -94,7 +94,7 @@ class StockBalanceReportWizard(models.TransientModel):
             domain.append(('nomenclature_id.category_id', 'child_of', self.category_ids.ids))
         return domain
 
-    def _generate_summary_report(self, balances):
+    def _generate_summary_report(self, domain):
         """
         Генерує зведений звіт по залишках.
         """
@@ -103,58 +103,55 @@ class StockBalanceReportWizard(models.TransientModel):
             'name': 'Зведений звіт по залишках',
             'res_model': 'stock.balance',
             'view_mode': 'list',
-            'domain': [('id', 'in', balances.ids)],
+            'domain': domain,
             'context': {
                 'group_by': ['nomenclature_id'],
                 'search_default_group_by_nomenclature': 1,
             }
         }
 
-    def _generate_employee_report(self, balances):
+    def _generate_employee_report(self, domain):
         """
         Генерує звіт по залишках у працівників.
         """
-        employee_balances = balances.filtered(lambda b: b.location_type == 'employee')
         return {
             'type': 'ir.actions.act_window',
             'name': 'Звіт по залишках у працівників',
             'res_model': 'stock.balance',
             'view_mode': 'list',
-            'domain': [('id', 'in', employee_balances.ids)],
+            'domain': domain + [('location_type', '=', 'employee')],
             'context': {
                 'group_by': ['employee_id', 'nomenclature_id'],
                 'search_default_group_by_employee': 1,
             }
         }
 
-    def _generate_warehouse_report(self, balances):
+    def _generate_warehouse_report(self, domain):
         """
         Генерує звіт по залишках на складах.
         """
-        warehouse_balances = balances.filtered(lambda b: b.location_type == 'warehouse')
         return {
             'type': 'ir.actions.act_window',
             'name': 'Звіт по залишках на складах',
             'res_model': 'stock.balance',
             'view_mode': 'list',
-            'domain': [('id', 'in', warehouse_balances.ids)],
+            'domain': domain + [('location_type', '=', 'warehouse')],
             'context': {
                 'group_by': ['warehouse_id', 'nomenclature_id'],
                 'search_default_group_by_warehouse': 1,
             }
         }
 
-    def _generate_batch_report(self, balances):
+    def _generate_batch_report(self, domain):
         """
         Генерує звіт по залишках партій.
         """
-        batch_balances = balances.filtered(lambda b: b.batch_id)
         return {
             'type': 'ir.actions.act_window',
             'name': 'Звіт по залишках партій',
             'res_model': 'stock.balance',
             'view_mode': 'list',
-            'domain': [('id', 'in', batch_balances.ids)],
+            'domain': domain + [('batch_id', '!=', False)],
             'context': {
                 'group_by': ['batch_id', 'nomenclature_id'],
                 'search_default_group_by_batch': 1,
@@ -280,4 +277,72 @@ class StockBalanceAdjustmentWizard(models.TransientModel):
                 'message': _('Залишки успішно скориговано на %s') % self.adjustment_qty,
                 'type': 'success',
             }
-        }
\ No newline at end of file
+        }
+
+class StockBalanceRebuildWizard(models.TransientModel):
+    """
+    Wizard для перебудови залишків з журналу рухів (після міграцій або помилкового імпорту).
+    """
+    _name = 'stock.balance.rebuild.wizard'
+    _description = 'Wizard для перебудови залишків з журналу рухів'
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Компанія',
+        required=True,
+        default=lambda self: self.env.company
+    )
+    warehouse_ids = fields.Many2many(
+        'stock.warehouse',
+        'balance_rebuild_warehouse_rel',
+        'wizard_id',
+        'warehouse_id',
+        string='Склади',
+        help='Порожньо - всі склади та працівники компанії'
+    )
+    nomenclature_ids = fields.Many2many(
+        'product.nomenclature',
+        'balance_rebuild_nomenclature_rel',
+        'wizard_id',
+        'nomenclature_id',
+        string='Номенклатура',
+        help='Порожньо - вся номенклатура'
+    )
+    relink_movements = fields.Boolean(
+        string='Відновити посилання рухів на залишки',
+        default=True
+    )
+    state = fields.Selection([
+        ('draft', 'Параметри'),
+        ('done', 'Результат'),
+    ], default='draft')
+    inserted_count = fields.Integer(string='Створено залишків', readonly=True)
+    updated_count = fields.Integer(string='Змінено залишків', readonly=True)
+    zeroed_count = fields.Integer(string='Обнулено залишків', readonly=True)
+    movement_count = fields.Integer(string='Змінено рухів', readonly=True)
+
+    def action_rebuild(self):
+        """
+        Перебудовує залишки вибраної області з журналу рухів.
+        """
+        self.ensure_one()
+        result = self.env['stock.balance']._rebuild_from_movements(
+            self.company_id.ids,
+            warehouse_ids=self.warehouse_ids.ids,
+            nomenclature_ids=self.nomenclature_ids.ids,
+            relink_movements=self.relink_movements,
+        )
+        self.write({
+            'state': 'done',
+            'inserted_count': result['inserted'],
+            'updated_count': result['updated'],
+            'zeroed_count': result['zeroed'],
+            'movement_count': result['movements'],
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
@@ -0,0 +1,45 @@
+from odoo import models, fields, api
+
+
+class StockBatch(models.Model):
+    """
+    Серійні номери партії зберігаються в реєстрі stock.serial.
+    """
+    _inherit = 'stock.batch'
+
+    serial_ids = fields.One2many(
+        'stock.serial',
+        'batch_id',
+        string='Серійні номери (реєстр)',
+        readonly=True
+    )
+
+    serial_numbers = fields.Text(
+        'Серійні номери',
+        compute='_compute_serial_numbers',
+        inverse='_inverse_serial_numbers',
+        search='_search_serial_numbers',
+        help='Серійні номери товарів у партії (для товарів з S/N обліком)'
+    )
+
+    @api.depends('serial_ids.name')
+    def _compute_serial_numbers(self):
+        """Формує текстове представлення серійних номерів партії з реєстру"""
+        for batch in self:
+            batch.serial_numbers = '\n'.join(batch.serial_ids.mapped('name')) or False
+
+    def _inverse_serial_numbers(self):
+        """Реєструє серійні номери партії"""
+        Serial = self.env['stock.serial']
+        for batch in self:
+            serials = Serial._register_serials(
+                batch.nomenclature_id.id, batch.serial_numbers, batch=batch,
+            )
+            (batch.serial_ids - serials).write({'batch_id': False})
+
+    def _search_serial_numbers(self, operator, value):
+        return self.env['stock.serial']._search_by_text('serial_ids', operator, value)
+
+    def _get_serial_numbers_list(self):
+        """Повертає список серійних номерів з партії"""
+        return self.serial_ids.mapped('name')
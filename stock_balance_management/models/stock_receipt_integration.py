@@ -1,173 +1,148 @@
 # stock_balance_management/models/stock_receipt_integration.py
-# ВИПРАВЛЕННЯ: Уникаємо подвоєння залишків без зміни batch модуля
+# Оновлення залишків при проведенні прихідних документів одним пакетом на документ
 
 from odoo import models, fields, api, _
-from odoo.exceptions import UserError
 import logging
 
 _logger = logging.getLogger(__name__)
 
-class StockReceiptIncoming(models.Model):
+
+class StockReceiptBalanceMixin(models.AbstractModel):
     """
-    Інтеграція з прихідними накладними для оновлення залишків (унікнення дублювання рухів).
+    Спільна логіка оновлення залишків для прихідних документів.
     """
-    _inherit = 'stock.receipt.incoming'
+    _name = 'stock.receipt.balance.mixin'
+    _description = 'Оновлення залишків з прихідних документів'
 
-    def _do_posting(self, posting_time, custom_datetime=None):
+    def _get_balance_operation_type(self):
+        """Повертає тип операції руху залишків"""
+        raise NotImplementedError()
+
+    def _get_balance_batch_source_type(self):
+        """Повертає тип документу джерела партії"""
+        raise NotImplementedError()
+
+    def _get_balance_movement_notes(self):
+        """Повертає примітку для рухів залишків"""
+        raise NotImplementedError()
+
+    def _get_balance_batches(self):
         """
-        Розширює метод проведення для оновлення залишків після проведення документа.
+        Повертає партії позицій документів одним запитом:
+        {(номер документа, номенклатура): перша знайдена партія}.
         """
-        _logger.info(f"[BALANCE] Starting posting for receipt {self.number}")
-        result = super()._do_posting(posting_time, custom_datetime)
-        # Перевіряємо, чи рухи вже створені для цього документа
-        existing_movements = self.env['stock.balance.movement'].search([
-            ('document_reference', '=', self.number),
-            ('operation_type', '=', 'receipt')
+        lines = self._get_posting_lines().filtered(lambda l: l.qty > 0)
+        batches = self.env['stock.batch'].search([
+            ('source_document_type', '=', self._get_balance_batch_source_type()),
+            ('source_document_number', 'in', self.mapped('number')),
+            ('nomenclature_id', 'in', lines.nomenclature_id.ids),
         ])
-        if existing_movements:
-            _logger.info(f"[BALANCE] Movements already exist for {self.number}, skipping creation")
-            return result
-        _logger.info(f"[BALANCE] Creating balance movements for receipt {self.number}")
-        for line in self.line_ids:
-            try:
-                self._create_balance_movement_for_line(line)
-                _logger.info(f"[BALANCE] Balance movement created for {line.nomenclature_id.name}")
-            except Exception as e:
-                _logger.error(f"[BALANCE] Failed to create balance movement for {line.nomenclature_id.name}: {e}")
-        return result
+        batch_by_key = {}
+        for batch in batches:
+            batch_by_key.setdefault((batch.source_document_number, batch.nomenclature_id.id), batch)
+        return batch_by_key
 
-    def _create_balance_movement_for_line(self, line):
+    def _get_balance_movement_specs(self, batches=None):
         """
-        Створює рух залишків для позиції накладної (з урахуванням серійних номерів).
+        Формує специфікації рухів залишків для всіх позицій документа.
+        batches - партії з _get_balance_batches (за замовчуванням шукаються для документа).
         """
-        if line.qty <= 0:
-            _logger.warning(f"Skipping line with qty <= 0: {line.nomenclature_id.name}")
-            return
-        location = line.location_id or self.warehouse_id.lot_stock_id
-        batch = self.env['stock.batch'].search([
-            ('source_document_type', '=', 'receipt'),
-            ('source_document_number', '=', self.number),
-            ('nomenclature_id', '=', line.nomenclature_id.id)
-        ], limit=1)
-        serial_numbers_to_pass = None
-        if line.serial_numbers:
-            cleaned_serials = line.serial_numbers.strip()
-            if cleaned_serials and line.nomenclature_id.tracking_serial:
-                serial_numbers_to_pass = cleaned_serials
-        try:
-            movement = self.env['stock.balance.movement'].create_movement(
-                nomenclature_id=line.nomenclature_id.id,
-                qty=line.qty,
-                movement_type='in',
-                operation_type='receipt',
-                location_to_type='warehouse',
-                warehouse_to_id=self.warehouse_id.id,
-                location_to_id=location.id,
-                batch_id=batch.id if batch else None,
-                uom_id=line.selected_uom_id.id or line.product_uom_id.id,
-                document_reference=self.number,
-                notes=f'Прихідна накладна {self.number}',
-                serial_numbers=serial_numbers_to_pass,
-                company_id=self.company_id.id,
-                date=self.posting_datetime,
-            )
-            _logger.info(f"Created movement ID: {movement.id} with serial_numbers: '{movement.serial_numbers}'")
-            self.message_post(
-                body=_('Створено рух залишків для %s: +%s %s') % (
-                    line.nomenclature_id.name, 
-                    line.qty, 
-                    (line.selected_uom_id or line.product_uom_id).name
-                ),
-                message_type='notification'
-            )
-        except Exception as e:
-            _logger.error(f"ERROR creating balance movement for {line.nomenclature_id.name}: {e}")
-            import traceback
-            _logger.error(f"Traceback: {traceback.format_exc()}")
+        self.ensure_one()
+        lines = self._get_posting_lines().filtered(lambda l: l.qty > 0)
+        if batches is None:
+            batches = self._get_balance_batches()
+        operation_type = self._get_balance_operation_type()
+        notes = self._get_balance_movement_notes()
+        specs = []
+        for line in lines:
+            location = line.location_id or self.warehouse_id.lot_stock_id
+            batch = batches.get((self.number, line.nomenclature_id.id))
+            serial_numbers = None
+            if line.serial_numbers and line.nomenclature_id.tracking_serial:
+                serial_numbers = line.serial_numbers.strip() or None
+            specs.append({
+                'nomenclature_id': line.nomenclature_id.id,
+                'qty': line.qty,
+                'movement_type': 'in',
+                'operation_type': operation_type,
+                'location_to_type': 'warehouse',
+                'warehouse_to_id': self.warehouse_id.id,
+                'location_to_id': location.id,
+                'batch_id': batch.id if batch else None,
+                'uom_id': line.selected_uom_id.id or line.product_uom_id.id,
+                'document_reference': self.number,
+                'notes': notes,
+                'serial_numbers': serial_numbers,
+                'company_id': self.company_id.id,
+                'date': self.posting_datetime,
+            })
+        return specs
+
+    def _create_balance_movements(self):
+        """Створює рухи залишків документа одним пакетом (без дублювання)"""
+        self.ensure_one()
+        operation_type = self._get_balance_operation_type()
+        if self.env['stock.balance.movement'].search_count([
+            ('document_reference', '=', self.number),
+            ('operation_type', '=', operation_type),
+        ], limit=1):
+            _logger.info("[BALANCE] Movements already exist for %s, skipping creation", self.number)
+            return self.env['stock.balance.movement']
+        specs = self._get_balance_movement_specs()
+        movements = self.env['stock.balance.movement'].create_movements_bulk(specs)
+        if movements:
             self.message_post(
-                body=_('Помилка оновлення залишків для %s: %s') % (line.nomenclature_id.name, str(e)),
+                body=_('Створено рухи залишків: %s позицій') % len(movements),
                 message_type='notification'
             )
-            raise
+        return movements
 
-class StockReceiptDisposal(models.Model):
+
+class StockReceiptIncoming(models.Model):
     """
-    Інтеграція з актами оприходування для оновлення залишків (унікнення дублювання рухів).
+    Інтеграція з прихідними накладними для оновлення залишків.
     """
-    _inherit = 'stock.receipt.disposal'
+    _name = 'stock.receipt.incoming'
+    _inherit = ['stock.receipt.incoming', 'stock.receipt.balance.mixin']
+
+    def _get_balance_operation_type(self):
+        return 'receipt'
+
+    def _get_balance_batch_source_type(self):
+        return 'receipt'
+
+    def _get_balance_movement_notes(self):
+        return f'Прихідна накладна {self.number}'
 
     def _do_posting(self, posting_time, custom_datetime=None):
         """
         Розширює метод проведення для оновлення залишків після проведення документа.
         """
-        _logger.info(f"[BALANCE] Starting posting for disposal {self.number}")
         result = super()._do_posting(posting_time, custom_datetime)
-        existing_movements = self.env['stock.balance.movement'].search([
-            ('document_reference', '=', self.number),
-            ('operation_type', '=', 'disposal')
-        ])
-        if existing_movements:
-            _logger.info(f"[BALANCE] Movements already exist for {self.number}, skipping creation")
-            return result
-        _logger.info(f"[BALANCE] Creating balance movements for disposal {self.number}")
-        for line in self.line_ids:
-            try:
-                self._create_balance_movement_for_line(line)
-                _logger.info(f"[BALANCE] Balance movement created for {line.nomenclature_id.name}")
-            except Exception as e:
-                _logger.error(f"[BALANCE] Failed to create balance movement for {line.nomenclature_id.name}: {e}")
+        self._create_balance_movements()
         return result
 
-    def _create_balance_movement_for_line(self, line):
+
+class StockReceiptDisposal(models.Model):
+    """
+    Інтеграція з актами оприходування для оновлення залишків.
+    """
+    _name = 'stock.receipt.disposal'
+    _inherit = ['stock.receipt.disposal', 'stock.receipt.balance.mixin']
+
+    def _get_balance_operation_type(self):
+        return 'disposal'
+
+    def _get_balance_batch_source_type(self):
+        return 'inventory'
+
+    def _get_balance_movement_notes(self):
+        return f'Акт оприходування {self.number}'
+
+    def _do_posting(self, posting_time, custom_datetime=None):
         """
-        Створює рух залишків для позиції акта (з урахуванням серійних номерів).
+        Розширює метод проведення для оновлення залишків після проведення документа.
         """
-        if line.qty <= 0:
-            _logger.warning(f"Skipping line with qty <= 0: {line.nomenclature_id.name}")
-            return
-        location = line.location_id or self.warehouse_id.lot_stock_id
-        batch = self.env['stock.batch'].search([
-            ('source_document_type', '=', 'inventory'),
-            ('source_document_number', '=', self.number),
-            ('nomenclature_id', '=', line.nomenclature_id.id)
-        ], limit=1)
-        serial_numbers_to_pass = None
-        if line.serial_numbers:
-            cleaned_serials = line.serial_numbers.strip()
-            if cleaned_serials and line.nomenclature_id.tracking_serial:
-                serial_numbers_to_pass = cleaned_serials
-        try:
-            movement = self.env['stock.balance.movement'].create_movement(
-                nomenclature_id=line.nomenclature_id.id,
-                qty=line.qty,
-                movement_type='in',
-                operation_type='disposal',
-                location_to_type='warehouse',
-                warehouse_to_id=self.warehouse_id.id,
-                location_to_id=location.id,
-                batch_id=batch.id if batch else None,
-                uom_id=line.selected_uom_id.id or line.product_uom_id.id,
-                document_reference=self.number,
-                notes=f'Акт оприходування {self.number}',
-                serial_numbers=serial_numbers_to_pass,
-                company_id=self.company_id.id,
-                date=self.posting_datetime,
-            )
-            _logger.info(f"Created movement ID: {movement.id} with serial_numbers: '{movement.serial_numbers}'")
-            self.message_post(
-                body=_('Створено рух залишків для %s: +%s %s') % (
-                    line.nomenclature_id.name, 
-                    line.qty, 
-                    (line.selected_uom_id or line.product_uom_id).name
-                ),
-                message_type='notification'
-            )
-        except Exception as e:
-            _logger.error(f"ERROR creating balance movement: {e}")
-            import traceback
-            _logger.error(f"Traceback: {traceback.format_exc()}")
-            self.message_post(
-                body=_('Помилка оновлення залишків для %s: %s') % (line.nomenclature_id.name, str(e)),
-                message_type='notification'
-            )
-            raise
\ No newline at end of file
+        result = super()._do_posting(posting_time, custom_datetime)
+        self._create_balance_movements()
+        return result
@@ -0,0 +1,164 @@
+from odoo import models, fields, api, _
+from odoo.addons.custom_stock_receipt.models.utils import parse_serial_numbers
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class StockSerial(models.Model):
+    """
+    Реєстр серійних номерів: один запис на серійний номер з прив'язкою до залишку та партії.
+    """
+    _name = 'stock.serial'
+    _description = 'Серійний номер'
+    _order = 'nomenclature_id, name'
+
+    name = fields.Char(
+        string='Серійний номер',
+        required=True,
+        index=True
+    )
+
+    nomenclature_id = fields.Many2one(
+        'product.nomenclature',
+        string='Номенклатура',
+        required=True,
+        index=True
+    )
+
+    balance_id = fields.Many2one(
+        'stock.balance',
+        string='Залишок',
+        ondelete='set null',
+        index=True,
+        help='Поточний залишок, на якому знаходиться серійний номер'
+    )
+
+    batch_id = fields.Many2one(
+        'stock.batch',
+        string='Партія',
+        ondelete='set null',
+        index=True
+    )
+
+    location_type = fields.Selection(
+        related='balance_id.location_type',
+        store=True,
+        index=True,
+        readonly=True
+    )
+
+    warehouse_id = fields.Many2one(
+        related='balance_id.warehouse_id',
+        store=True,
+        index=True,
+        readonly=True
+    )
+
+    employee_id = fields.Many2one(
+        related='balance_id.employee_id',
+        store=True,
+        index=True,
+        readonly=True
+    )
+
+    location_id = fields.Many2one(
+        related='balance_id.location_id',
+        store=True,
+        readonly=True
+    )
+
+    company_id = fields.Many2one(
+        'res.company',
+        string='Компанія',
+        required=True,
+        index=True,
+        default=lambda self: self.env.company
+    )
+
+    document_reference = fields.Char(
+        string='Документ',
+        related='batch_id.source_document_number',
+        readonly=True
+    )
+
+    source_document_type = fields.Selection(
+        string='Тип документу',
+        related='batch_id.source_document_type',
+        readonly=True
+    )
+
+    date_created = fields.Datetime(
+        string='Дата створення',
+        related='batch_id.date_created',
+        readonly=True
+    )
+
+    _sql_constraints = [
+        ('unique_nomenclature_serial',
+         'unique(nomenclature_id, name)',
+         'Серійний номер має бути унікальним в межах номенклатури!'),
+    ]
+
+    @api.model
+    def _normalize_serials(self, serials):
+        """Повертає список унікальних серійних номерів зі збереженням порядку"""
+        if not serials:
+            return []
+        if isinstance(serials, str):
+            serials = parse_serial_numbers(serials)
+        return list(dict.fromkeys(s.strip() for s in serials if s and s.strip()))
+
+    @api.model
+    def _register_serials(self, nomenclature_id, serials, balance=None, batch=None, company_id=None):
+        """Реєструє серійні номери та переносить їх на залишок/партію одним пакетом"""
+        names = self._normalize_serials(serials)
+        if not names:
+            return self.browse()
+        existing = self.search([
+            ('nomenclature_id', '=', nomenclature_id),
+            ('name', 'in', names),
+        ])
+        vals = {}
+        if balance:
+            vals.update(balance_id=balance.id, company_id=balance.company_id.id)
+        if batch:
+            vals['batch_id'] = batch.id
+        if vals and existing:
+            existing.write(vals)
+        known = set(existing.mapped('name'))
+        missing = [name for name in names if name not in known]
+        if not missing:
+            return existing
+        company_id = vals.get('company_id') or company_id or (batch and batch.company_id.id) or self.env.company.id
+        created = self.create([{
+            'name': name,
+            'nomenclature_id': nomenclature_id,
+            'balance_id': vals.get('balance_id', False),
+            'batch_id': vals.get('batch_id', False),
+            'company_id': company_id,
+        } for name in missing])
+        return existing | created
+
+    @api.model
+    def _search_by_text(self, field_name, operator, value):
+        """Перетворює домен по текстовому полю серійних номерів у домен по реєстру"""
+        if not value and operator in ('=', '!='):
+            return [(field_name, operator, False)]
+        return [(f'{field_name}.name', operator, value)]
+
+    @api.model
+    def _get_serial_conflicts(self, serials, nomenclature_id=None, exclude_balance_ids=None):
+        """Повертає серійні номери, що вже знаходяться на залишках, одним запитом по індексу"""
+        names = self._normalize_serials(serials)
+        if not names:
+            return {}
+        domain = [('name', 'in', names), ('balance_id', '!=', False)]
+        if nomenclature_id:
+            domain.append(('nomenclature_id', '!=', nomenclature_id))
+        if exclude_balance_ids:
+            domain.append(('balance_id', 'not in', list(exclude_balance_ids)))
+        conflicts = {}
+        for serial in self.search(domain):
+            conflicts[serial.name] = conflicts.get(serial.name, self.browse()) | serial
+        return conflicts
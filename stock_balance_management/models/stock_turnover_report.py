@@ -0,0 +1,245 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+from odoo.tools import SQL
+from datetime import timedelta
+import base64
+import io
+import logging
+import openpyxl
+
+_logger = logging.getLogger(__name__)
+
+TURNOVER_XLSX_COLUMNS = [
+    ('location_name', 'Локація'),
+    ('category_name', 'Категорія'),
+    ('nomenclature_name', 'Номенклатура'),
+    ('batch_number', 'Партія'),
+    ('uom_name', 'Од. виміру'),
+    ('opening_qty', 'Залишок на початок'),
+    ('in_qty', 'Надійшло'),
+    ('out_qty', 'Вибуло'),
+    ('closing_qty', 'Залишок на кінець'),
+]
+
+
+class StockTurnoverReportWizard(models.TransientModel):
+    """
+    Wizard оборотної відомості: залишок на початок, надходження, вибуття та залишок на кінець
+    періоду по локаціях (склад / працівник) та номенклатурі.
+    """
+    _name = 'stock.turnover.report.wizard'
+    _description = 'Оборотна відомість по залишках'
+
+    date_from = fields.Date(string='Дата з', required=True, default=lambda self: fields.Date.context_today(self).replace(day=1))
+    date_to = fields.Date(string='Дата по', required=True, default=fields.Date.context_today)
+    company_id = fields.Many2one(
+        'res.company',
+        string='Компанія',
+        required=True,
+        default=lambda self: self.env.company
+    )
+    location_type = fields.Selection([
+        ('all', 'Всі локації'),
+        ('warehouse', 'Склади'),
+        ('employee', 'Працівники'),
+    ], string='Локації', required=True, default='all')
+    warehouse_ids = fields.Many2many(
+        'stock.warehouse',
+        'turnover_report_warehouse_rel',
+        'wizard_id',
+        'warehouse_id',
+        string='Склади'
+    )
+    employee_ids = fields.Many2many(
+        'hr.employee',
+        'turnover_report_employee_rel',
+        'wizard_id',
+        'employee_id',
+        string='Працівники'
+    )
+    nomenclature_ids = fields.Many2many(
+        'product.nomenclature',
+        'turnover_report_nomenclature_rel',
+        'wizard_id',
+        'nomenclature_id',
+        string='Номенклатура'
+    )
+    category_ids = fields.Many2many(
+        'product.nomenclature.category',
+        'turnover_report_category_rel',
+        'wizard_id',
+        'category_id',
+        string='Категорії товарів'
+    )
+    detail_level = fields.Selection([
+        ('nomenclature', 'По номенклатурі'),
+        ('category', 'По категоріях'),
+    ], string='Деталізація', required=True, default='nomenclature')
+    group_by_batch = fields.Boolean(string='Розбивка по партіях', default=False)
+    xlsx_file = fields.Binary(string='Файл XLSX', readonly=True, attachment=False)
+    xlsx_filename = fields.Char(string='Ім\'я файлу')
+
+    @api.constrains('date_from', 'date_to')
+    def _check_dates(self):
+        for wizard in self:
+            if wizard.date_from > wizard.date_to:
+                raise ValidationError(_('Дата початку не може бути пізніше дати закінчення.'))
+
+    def _get_turnover_filters(self):
+        """Повертає SQL умови фільтрів wizard для рядків ніг (src) та номенклатури (pn, cat)"""
+        conditions = [SQL("src.company_id = %s", self.company_id.id)]
+        if self.location_type != 'all':
+            conditions.append(SQL("src.location_type = %s", self.location_type))
+        # Склади та працівники - різні сторони локацій, тому вибрані разом об'єднуються через OR;
+        # сторона, відсічена типом локацій, не фільтрується
+        location_conditions = []
+        if self.warehouse_ids and self.location_type != 'employee':
+            location_conditions.append(SQL("src.warehouse_id IN %s", tuple(self.warehouse_ids.ids)))
+        if self.employee_ids and self.location_type != 'warehouse':
+            location_conditions.append(SQL("src.employee_id IN %s", tuple(self.employee_ids.ids)))
+        if location_conditions:
+            conditions.append(SQL("(%s)", SQL(" OR ").join(location_conditions)))
+        if self.nomenclature_ids:
+            conditions.append(SQL("src.nomenclature_id IN %s", tuple(self.nomenclature_ids.ids)))
+        if self.category_ids:
+            # Категорія разом з дочірніми - за префіксом parent_path
+            conditions.append(SQL(
+                "cat.parent_path LIKE ANY(%s)", [f'{path}%' for path in self.category_ids.mapped('parent_path')],
+            ))
+        return SQL(" AND ").join(conditions)
+
+    def _get_turnover_query(self):
+        """
+        Формує запит оборотної відомості. Джерело - найближчий знімок залишків до початку періоду
+        та ноги рухів після нього; залишок на початок, надходження, вибуття та залишок на кінець
+        рахуються одним проходом агрегатами з FILTER по даті.
+        """
+        self.ensure_one()
+        Snapshot = self.env['stock.balance.snapshot']
+        period_start = Snapshot._get_date_end(self.date_from - timedelta(days=1))
+        period_end = Snapshot._get_date_end(self.date_to)
+        snapshot_date, snapshot_end = Snapshot._get_last_snapshot(period_start)
+        legs = self.env['stock.balance.movement']._get_legs_sql(snapshot_end, period_end)
+        nomenclature = SQL("NULL::integer") if self.detail_level == 'category' else SQL("src.nomenclature_id")
+        batch = SQL("src.batch_id") if self.group_by_batch else SQL("NULL::integer")
+        group_by = [SQL("src.location_type"), SQL("src.warehouse_id"), SQL("src.employee_id"), SQL("pn.category_id")]
+        if self.detail_level != 'category':
+            group_by.append(nomenclature)
+        if self.group_by_batch:
+            group_by.append(batch)
+        lang = self.env.lang or 'en_US'
+        return SQL("""
+            WITH src AS (
+                SELECT nomenclature_id, location_type, warehouse_id, employee_id, batch_id, company_id,
+                       qty, NULL::timestamp AS date
+                FROM stock_balance_snapshot
+                WHERE date = %(snapshot_date)s
+                UNION ALL
+                SELECT nomenclature_id, location_type, warehouse_id, employee_id, batch_id, company_id,
+                       qty, date
+                FROM %(legs)s legs
+            ), turnover AS (
+                SELECT src.location_type, src.warehouse_id, src.employee_id,
+                       %(nomenclature)s AS nomenclature_id, pn.category_id, %(batch)s AS batch_id,
+                       COALESCE(SUM(src.qty) FILTER (WHERE src.date IS NULL OR src.date < %(start)s), 0) AS opening_qty,
+                       COALESCE(SUM(src.qty) FILTER (WHERE src.date >= %(start)s AND src.qty > 0), 0) AS in_qty,
+                       COALESCE(-SUM(src.qty) FILTER (WHERE src.date >= %(start)s AND src.qty < 0), 0) AS out_qty,
+                       COALESCE(SUM(src.qty), 0) AS closing_qty
+                FROM src
+                JOIN product_nomenclature pn ON pn.id = src.nomenclature_id
+                LEFT JOIN product_nomenclature_category cat ON cat.id = pn.category_id
+                WHERE %(where)s
+                GROUP BY %(group_by)s
+            )
+            SELECT t.*,
+                   CASE WHEN t.location_type = 'warehouse' THEN sw.name ELSE he.name END AS location_name,
+                   COALESCE(pn.name->>%(lang)s, pn.name->>'en_US', '') AS nomenclature_name,
+                   COALESCE(cat.complete_name, '') AS category_name,
+                   COALESCE(batch.batch_number, '') AS batch_number,
+                   COALESCE(uom.name->>%(lang)s, uom.name->>'en_US', '') AS uom_name
+            FROM turnover t
+            LEFT JOIN stock_warehouse sw ON sw.id = t.warehouse_id
+            LEFT JOIN hr_employee he ON he.id = t.employee_id
+            LEFT JOIN product_nomenclature pn ON pn.id = t.nomenclature_id
+            LEFT JOIN product_nomenclature_category cat ON cat.id = t.category_id
+            LEFT JOIN stock_batch batch ON batch.id = t.batch_id
+            LEFT JOIN uom_uom uom ON uom.id = pn.base_uom_id
+            WHERE t.opening_qty <> 0 OR t.in_qty <> 0 OR t.out_qty <> 0
+            ORDER BY location_name, category_name, nomenclature_name, batch_number
+        """, snapshot_date=snapshot_date, legs=legs, nomenclature=nomenclature, batch=batch,
+            start=period_start, where=self._get_turnover_filters(),
+            group_by=SQL(", ").join(group_by), lang=lang)
+
+    def get_turnover_data(self):
+        """Повертає рядки оборотної відомості списком словників"""
+        self.ensure_one()
+        self.env['stock.balance.movement'].flush_model()
+        self.env.cr.execute(self._get_turnover_query())
+        rows = self.env.cr.dictfetchall()
+        _logger.debug("Turnover report %s - %s: %s rows", self.date_from, self.date_to, len(rows))
+        return rows
+
+    def get_turnover_totals(self, rows):
+        """Повертає підсумки оборотної відомості по колонках кількостей"""
+        return {
+            column: sum(row[column] for row in rows)
+            for column in ('opening_qty', 'in_qty', 'out_qty', 'closing_qty')
+        }
+
+    def get_report_title(self):
+        self.ensure_one()
+        return _('Оборотна відомість за період %s - %s') % (
+            self.date_from.strftime('%d.%m.%Y'), self.date_to.strftime('%d.%m.%Y'),
+        )
+
+    def action_print_pdf(self):
+        """Друкує оборотну відомість через QWeb PDF"""
+        self.ensure_one()
+        return self.env.ref('stock_balance_management.action_report_stock_turnover').report_action(self)
+
+    def action_export_xlsx(self):
+        """Експортує оборотну відомість у XLSX і повертає посилання на завантаження"""
+        self.ensure_one()
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet(_('Оборотна відомість'))
+        sheet.append([self.get_report_title()])
+        sheet.append([label for __, label in TURNOVER_XLSX_COLUMNS])
+        rows = self.get_turnover_data()
+        for row in rows:
+            sheet.append([row[column] for column, __ in TURNOVER_XLSX_COLUMNS])
+        totals = self.get_turnover_totals(rows)
+        sheet.append([_('Всього')] + [''] * 4 + [
+            totals[column] for column in ('opening_qty', 'in_qty', 'out_qty', 'closing_qty')
+        ])
+        output = io.BytesIO()
+        workbook.save(output)
+        self.write({
+            'xlsx_file': base64.b64encode(output.getvalue()),
+            'xlsx_filename': f'turnover_{self.date_from}_{self.date_to}.xlsx',
+        })
+        return {
+            'type': 'ir.actions.act_url',
+            'url': (
+                f'/web/content/?model={self._name}&id={self.id}'
+                '&field=xlsx_file&filename_field=xlsx_filename&download=true'
+            ),
+            'target': 'self',
+        }
+
+
+class ReportStockTurnover(models.AbstractModel):
+    """Дані QWeb звіту оборотної відомості"""
+    _name = 'report.stock_balance_management.turnover_report_template'
+    _description = 'Звіт: оборотна відомість'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        docs = self.env['stock.turnover.report.wizard'].browse(docids)
+        lines = {doc.id: doc.get_turnover_data() for doc in docs}
+        return {
+            'doc_ids': docids,
+            'doc_model': 'stock.turnover.report.wizard',
+            'docs': docs,
+            'lines': lines,
+            'totals': {doc.id: doc.get_turnover_totals(lines[doc.id]) for doc in docs},
+        }
@@ -0,0 +1,24 @@
+"""
+Загальні утиліти для модуля stock_balance_management
+"""
+import logging
+from contextlib import contextmanager
+
+from psycopg2.extensions import ISOLATION_LEVEL_READ_COMMITTED
+
+_logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def read_committed_env(env):
+    """
+    Відкриває окремий курсор з рівнем ізоляції READ COMMITTED і повертає середовище на ньому.
+    Транзакція комітиться на виході з блоку (або відкочується при помилці). Рівень ізоляції
+    встановлюється на з'єднанні, тому діє і на транзакції після cr.commit() всередині блоку.
+
+    Конкурентні атомарні оновлення залишків у READ COMMITTED чекають на блокування рядка
+    і застосовуються до актуального значення замість помилки серіалізації та повтору запиту.
+    """
+    with env.registry.cursor() as cr:
+        cr._cnx.set_isolation_level(ISOLATION_LEVEL_READ_COMMITTED)
+        yield env(cr=cr)
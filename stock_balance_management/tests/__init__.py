@@ -0,0 +1,5 @@
+from . import test_balance_concurrency
+from . import test_balance_snapshot
+from . import test_turnover_report
+from . import test_batch_transfer
+from . import test_movements_bulk
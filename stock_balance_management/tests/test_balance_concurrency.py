@@ -0,0 +1,159 @@
+import threading
+
+from odoo import api, SUPERUSER_ID
+from odoo.modules.registry import Registry
+from odoo.tests.common import BaseCase, get_db_name, tagged
+
+from odoo.addons.stock_balance_management.models.utils import read_committed_env
+
+
+@tagged('-standard', 'post_install', '-at_install', 'stock_balance_stress')
+class TestStockBalanceConcurrency(BaseCase):
+    """
+    Стрес-тест паралельного проведення: N курсорів одночасно змінюють ті самі залишки.
+    Тест комітить дані в базу (з компенсацією в кінці), тому не входить до стандартного набору:
+    odoo-bin -d <db> --test-tags stock_balance_stress
+    """
+
+    WORKERS = 8
+    ROUNDS = 20
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.registry = Registry(get_db_name())
+
+    def _get_keys(self, env):
+        """Повертає специфікації ключів залишків для тесту (склад + дві номенклатури)"""
+        warehouse = env['stock.warehouse'].search([], limit=1)
+        nomenclatures = env['product.nomenclature'].search([], limit=2)
+        if not warehouse or len(nomenclatures) < 2:
+            self.skipTest('Потрібні склад та дві номенклатури')
+        return [{
+            'nomenclature_id': nomenclature.id,
+            'location_type': 'warehouse',
+            'warehouse_id': warehouse.id,
+            'location_id': warehouse.lot_stock_id.id,
+            'company_id': warehouse.company_id.id,
+            'uom_id': nomenclature.base_uom_id.id,
+        } for nomenclature in nomenclatures]
+
+    def _get_qty(self, keys):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            return [sum(env['stock.balance'].search([
+                ('nomenclature_id', '=', key['nomenclature_id']),
+                ('location_type', '=', 'warehouse'),
+                ('warehouse_id', '=', key['warehouse_id']),
+                ('location_id', '=', key['location_id']),
+                ('batch_id', '=', False),
+                ('company_id', '=', key['company_id']),
+            ]).mapped('qty_on_hand')) for key in keys]
+
+    def _apply(self, keys, changes, reverse=False):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            with read_committed_env(env) as posting_env:
+                specs = [dict(key, qty_change=change) for key in keys for change in changes]
+                if reverse:
+                    specs.reverse()
+                posting_env['stock.balance'].update_balance_bulk(specs)
+
+    def test_parallel_balance_updates(self):
+        with self.registry.cursor() as cr:
+            keys = self._get_keys(api.Environment(cr, SUPERUSER_ID, {}))
+        initial = self._get_qty(keys)
+        errors = []
+        barrier = threading.Barrier(self.WORKERS)
+
+        def worker(index):
+            try:
+                barrier.wait()
+                for _round in range(self.ROUNDS):
+                    # Непарні потоки передають ключі у зворотному порядку: без
+                    # детермінованого порядку блокувань це призводило б до deadlock
+                    self._apply(keys, [2.0, -1.0], reverse=index % 2)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(self.WORKERS)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertFalse(errors, 'Паралельні оновлення завершились з помилками: %s' % errors)
+            expected = [qty + self.WORKERS * self.ROUNDS for qty in initial]
+            self.assertEqual(self._get_qty(keys), expected)
+        finally:
+            # Повертаємо залишки до початкових значень
+            for key, before, after in zip(keys, initial, self._get_qty(keys)):
+                if after != before:
+                    self._apply([key], [before - after])
+
+    def test_opposite_transfers(self):
+        """Зустрічні переміщення A→B та B→A одних номенклатур проводяться паралельно без deadlock"""
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            warehouses = env['stock.warehouse'].search([('company_id', '=', env.company.id)], limit=2)
+            nomenclatures = env['product.nomenclature'].search([('tracking_serial', '=', False)], limit=2)
+            if len(warehouses) < 2 or len(nomenclatures) < 2:
+                self.skipTest('Потрібні два склади компанії та дві номенклатури без серійного обліку')
+            keys = [{
+                'nomenclature_id': nomenclature.id,
+                'location_type': 'warehouse',
+                'warehouse_id': warehouse.id,
+                'location_id': warehouse.lot_stock_id.id,
+                'company_id': warehouse.company_id.id,
+                'uom_id': nomenclature.base_uom_id.id,
+            } for warehouse in warehouses for nomenclature in nomenclatures]
+            first, second = warehouses
+            transfer_ids = env['stock.transfer'].create([{
+                'transfer_type': 'warehouse',
+                'company_id': env.company.id,
+                'warehouse_from_id': (first if index % 2 else second).id,
+                'warehouse_to_id': (second if index % 2 else first).id,
+                'state': 'confirmed',
+                'line_ids': [(0, 0, {
+                    'nomenclature_id': nomenclature.id,
+                    'selected_uom_id': nomenclature.base_uom_id.id,
+                    'qty': 1.0,
+                }) for nomenclature in nomenclatures],
+            } for index in range(self.WORKERS)]).ids
+        # Запас на обох складах, щоб кожне переміщення мало що списати
+        self._apply(keys, [self.WORKERS])
+        initial = self._get_totals(keys)
+        errors = []
+        barrier = threading.Barrier(self.WORKERS)
+
+        def worker(transfer_id):
+            try:
+                with self.registry.cursor() as cr:
+                    env = api.Environment(cr, SUPERUSER_ID, {})
+                    with read_committed_env(env) as posting_env:
+                        barrier.wait()
+                        posting_env['stock.transfer'].browse(transfer_id).action_done()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(transfer_id,)) for transfer_id in transfer_ids]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertFalse(errors, 'Зустрічні переміщення завершились з помилками: %s' % errors)
+            # Порівну переміщень в обидва боки: підсумки складів не змінюються
+            self.assertEqual(self._get_totals(keys), initial)
+        finally:
+            self._apply(keys, [-self.WORKERS])
+
+    def _get_totals(self, keys):
+        """Повертає загальні кількості номенклатур на складах ключів (по всіх партіях)"""
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            return [sum(env['stock.balance'].search([
+                ('nomenclature_id', '=', key['nomenclature_id']),
+                ('location_type', '=', 'warehouse'),
+                ('warehouse_id', '=', key['warehouse_id']),
+            ]).mapped('qty_on_hand')) for key in keys]
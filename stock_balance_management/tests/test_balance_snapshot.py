@@ -0,0 +1,58 @@
+from datetime import date, datetime
+
+from odoo.tests.common import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install', 'stock_balance_snapshot')
+class TestStockBalanceSnapshot(TransactionCase):
+    """Знімок залишків, створений в одному часовому поясі, читається в іншому без розбіжностей"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        category = cls.env['product.nomenclature.category'].create({'name': 'Snapshot TZ'})
+        cls.nomenclature = cls.env['product.nomenclature'].create({
+            'name': 'Snapshot TZ',
+            'category_id': category.id,
+            'base_uom_id': cls.env.ref('uom.product_uom_unit').id,
+        })
+        cls.warehouse = cls.env['stock.warehouse'].create({'name': 'Snapshot TZ', 'code': 'SNTZ'})
+
+    def _create_movement(self, qty, moment):
+        self.env['stock.balance.movement'].create_movement(
+            self.nomenclature.id, qty, 'in', 'adjustment',
+            location_to_type='warehouse',
+            warehouse_to_id=self.warehouse.id,
+            location_to_id=self.warehouse.lot_stock_id.id,
+            company_id=self.warehouse.company_id.id,
+            date=moment,
+        )
+
+    def _get_qty(self, tz, moment):
+        rows = self.env['stock.balance.snapshot'].with_context(tz=tz).get_balance_at(
+            moment, nomenclature_ids=self.nomenclature.ids, warehouse_ids=self.warehouse.ids,
+        )
+        return sum(row['qty'] for row in rows)
+
+    def test_snapshot_read_in_other_timezone(self):
+        Snapshot = self.env['stock.balance.snapshot']
+        self._create_movement(5.0, datetime(2026, 1, 10, 12, 0))
+        # UTC+14: кінець 11.01 за місцевим часом - 11.01 10:00 UTC
+        date_end = Snapshot.with_context(tz='Pacific/Kiritimati')._create_snapshot(date(2026, 1, 11))
+        self.assertEqual(date_end, datetime(2026, 1, 11, 10, 0))
+        # Рух після межі знімка, але до кінця 11.01 в UTC-11
+        self._create_movement(3.0, datetime(2026, 1, 11, 20, 0))
+        moment = datetime(2026, 1, 12, 12, 0)
+        self.assertEqual(self._get_qty('Pacific/Pago_Pago', moment), 8.0)
+        self.assertEqual(self._get_qty('Pacific/Kiritimati', moment), 8.0)
+        self.assertEqual(self._get_qty('Pacific/Pago_Pago', datetime(2026, 1, 11, 11, 0)), 5.0)
+
+    def test_backdated_movement_invalidates_snapshot(self):
+        Snapshot = self.env['stock.balance.snapshot']
+        self._create_movement(5.0, datetime(2026, 1, 10, 12, 0))
+        Snapshot.with_context(tz='Pacific/Kiritimati')._create_snapshot(date(2026, 1, 11))
+        # Заднім числом до межі знімка: знімок має бути видалений незалежно від поясу читача
+        Snapshot = Snapshot.with_context(tz='Pacific/Pago_Pago')
+        self._create_movement(2.0, datetime(2026, 1, 11, 9, 0))
+        self.assertFalse(Snapshot.search([('date', '=', date(2026, 1, 11))]))
+        self.assertEqual(self._get_qty('Pacific/Pago_Pago', datetime(2026, 1, 12, 12, 0)), 7.0)
@@ -0,0 +1,69 @@
+from odoo.tests.common import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install', 'stock_batch_transfer')
+class TestStockBatchTransfer(TransactionCase):
+    """Переміщення між складом і працівником не змінюють поточну кількість партії"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        category = cls.env['product.nomenclature.category'].create({'name': 'Batch Transfer'})
+        cls.nomenclature = cls.env['product.nomenclature'].create({
+            'name': 'Batch Transfer',
+            'category_id': category.id,
+            'base_uom_id': cls.env.ref('uom.product_uom_unit').id,
+        })
+        cls.warehouse = cls.env['stock.warehouse'].create({'name': 'Batch Transfer', 'code': 'BTRF'})
+        cls.company = cls.warehouse.company_id
+        cls.employee = cls.env['hr.employee'].create({'name': 'Batch Transfer', 'company_id': cls.company.id})
+        partner = cls.env['res.partner'].create({'name': 'Batch Transfer'})
+        receipt = cls.env['stock.receipt.incoming'].create({
+            'partner_id': partner.id,
+            'warehouse_id': cls.warehouse.id,
+            'company_id': cls.company.id,
+            'line_ids': [(0, 0, {
+                'nomenclature_id': cls.nomenclature.id,
+                'qty': 10.0,
+                'price_unit_no_vat': 1.0,
+            })],
+        })
+        receipt._do_posting('current_time')
+        cls.batch = cls.env['stock.batch'].search([('source_document_number', '=', receipt.number)])
+
+    def _post_transfer(self, transfer_type, qty, **locations):
+        transfer = self.env['stock.transfer'].create(dict(
+            locations,
+            transfer_type=transfer_type,
+            company_id=self.company.id,
+            line_ids=[(0, 0, {
+                'nomenclature_id': self.nomenclature.id,
+                'selected_uom_id': self.nomenclature.base_uom_id.id,
+                'qty': qty,
+            })],
+        ))
+        transfer.action_confirm()
+        transfer.action_done()
+        return transfer
+
+    def _get_warehouse_qty(self):
+        return sum(self.env['stock.balance'].search([
+            ('nomenclature_id', '=', self.nomenclature.id),
+            ('location_type', '=', 'warehouse'),
+            ('warehouse_id', '=', self.warehouse.id),
+        ]).mapped('qty_on_hand'))
+
+    def test_warehouse_employee_warehouse(self):
+        self.assertEqual(len(self.batch), 1)
+        self.assertEqual(self.batch.current_qty, 10.0)
+        self._post_transfer('warehouse_employee', 4.0,
+                            warehouse_from_id=self.warehouse.id, employee_to_id=self.employee.id)
+        self.assertEqual(self.batch.current_qty, 10.0)
+        self.assertEqual(self._get_warehouse_qty(), 6.0)
+        self._post_transfer('employee_warehouse', 4.0,
+                            employee_from_id=self.employee.id, warehouse_to_id=self.warehouse.id)
+        self.assertEqual(self.batch.current_qty, 10.0)
+        self.assertEqual(self.batch.state, 'active')
+        self.assertEqual(self._get_warehouse_qty(), 10.0)
+        movements = self.env['stock.batch.movement'].search([('batch_id', '=', self.batch.id)])
+        self.assertEqual(movements.mapped('movement_type').count('transfer_out'), 2)
@@ -0,0 +1,54 @@
+from odoo.tests.common import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install', 'stock_balance_bulk')
+class TestStockBalanceMovementsBulk(TransactionCase):
+    """Пакетне створення рухів: серійні номери з реєстру залишку, без порожніх залишків"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        category = cls.env['product.nomenclature.category'].create({'name': 'Movements Bulk'})
+        cls.nomenclature = cls.env['product.nomenclature'].create({
+            'name': 'Movements Bulk',
+            'category_id': category.id,
+            'base_uom_id': cls.env.ref('uom.product_uom_unit').id,
+            'tracking_serial': True,
+        })
+        cls.warehouse = cls.env['stock.warehouse'].create({'name': 'Movements Bulk', 'code': 'MVBK'})
+
+    def _get_spec(self, qty, serial_numbers=None):
+        return {
+            'nomenclature_id': self.nomenclature.id,
+            'qty': qty,
+            'movement_type': 'in',
+            'operation_type': 'adjustment',
+            'location_to_type': 'warehouse',
+            'warehouse_to_id': self.warehouse.id,
+            'location_to_id': self.warehouse.lot_stock_id.id,
+            'company_id': self.warehouse.company_id.id,
+            'serial_numbers': serial_numbers,
+        }
+
+    def _get_balances(self):
+        return self.env['stock.balance'].search([
+            ('nomenclature_id', '=', self.nomenclature.id),
+            ('warehouse_id', '=', self.warehouse.id),
+        ])
+
+    def test_serials_linked_from_balance_registration(self):
+        movements = self.env['stock.balance.movement'].create_movements_bulk([
+            self._get_spec(2.0, 'SN-BULK-1\nSN-BULK-2'),
+            self._get_spec(1.0, 'SN-BULK-3'),
+        ])
+        balance = self._get_balances()
+        self.assertEqual(movements.balance_id, balance)
+        self.assertEqual(movements[0].serial_ids.mapped('name'), ['SN-BULK-1', 'SN-BULK-2'])
+        self.assertEqual(movements[1].serial_ids.mapped('name'), ['SN-BULK-3'])
+        serials = self.env['stock.serial'].search([('nomenclature_id', '=', self.nomenclature.id)])
+        self.assertEqual(len(serials), 3)
+        self.assertEqual(serials.balance_id, balance)
+
+    def test_zero_change_creates_no_balance(self):
+        self.env['stock.balance.movement'].create_movements_bulk([self._get_spec(0.0)])
+        self.assertFalse(self._get_balances())
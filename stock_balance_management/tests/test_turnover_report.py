@@ -0,0 +1,65 @@
+from datetime import date, datetime
+
+from odoo.tests.common import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install', 'stock_turnover_report')
+class TestStockTurnoverReport(TransactionCase):
+    """Фільтри складів і працівників оборотної відомості"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        category = cls.env['product.nomenclature.category'].create({'name': 'Turnover Filters'})
+        cls.nomenclature = cls.env['product.nomenclature'].create({
+            'name': 'Turnover Filters',
+            'category_id': category.id,
+            'base_uom_id': cls.env.ref('uom.product_uom_unit').id,
+        })
+        cls.warehouse = cls.env['stock.warehouse'].create({'name': 'Turnover Filters', 'code': 'TRNF'})
+        cls.employee = cls.env['hr.employee'].create({'name': 'Turnover Filters'})
+        cls.company = cls.warehouse.company_id
+
+    def _create_movements(self):
+        Movement = self.env['stock.balance.movement']
+        moment = datetime(2026, 2, 10, 12, 0)
+        Movement.create_movement(
+            self.nomenclature.id, 5.0, 'in', 'adjustment',
+            location_to_type='warehouse',
+            warehouse_to_id=self.warehouse.id,
+            location_to_id=self.warehouse.lot_stock_id.id,
+            company_id=self.company.id,
+            date=moment,
+        )
+        Movement.create_movement(
+            self.nomenclature.id, 2.0, 'in', 'adjustment',
+            location_to_type='employee',
+            employee_to_id=self.employee.id,
+            company_id=self.company.id,
+            date=moment,
+        )
+
+    def _get_locations(self, location_type):
+        wizard = self.env['stock.turnover.report.wizard'].create({
+            'date_from': date(2026, 2, 1),
+            'date_to': date(2026, 2, 28),
+            'company_id': self.company.id,
+            'location_type': location_type,
+            'warehouse_ids': [(6, 0, self.warehouse.ids)],
+            'employee_ids': [(6, 0, self.employee.ids)],
+            'nomenclature_ids': [(6, 0, self.nomenclature.ids)],
+        })
+        return {
+            (row['location_type'], row['warehouse_id'] or row['employee_id']): row['in_qty']
+            for row in wizard.get_turnover_data()
+        }
+
+    def test_warehouses_and_employees_selected(self):
+        self._create_movements()
+        self.assertEqual(self._get_locations('all'), {
+            ('warehouse', self.warehouse.id): 5.0,
+            ('employee', self.employee.id): 2.0,
+        })
+        # Працівники не фільтрують склади, якщо тип локацій - склади, і навпаки
+        self.assertEqual(self._get_locations('warehouse'), {('warehouse', self.warehouse.id): 5.0})
+        self.assertEqual(self._get_locations('employee'), {('employee', self.employee.id): 2.0})
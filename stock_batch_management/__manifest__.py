@@ -1,6 +1,6 @@
 {
     'name': 'Stock Batch Management',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.4.0',
     'category': 'Inventory/Inventory',
     'summary': 'Партійний облік товарів з FIFO логікою',
     'description': '''
@@ -26,6 +26,7 @@
         'data/sequence.xml',
         'views/stock_batch_views.xml',
         'views/stock_batch_movement_views.xml',
+        'views/stock_batch_movement_archive_views.xml',
         'views/product_nomenclature_views.xml',
         'views/stock_receipt_incoming_views.xml',
         'views/stock_batch_report_wizard_views.xml',
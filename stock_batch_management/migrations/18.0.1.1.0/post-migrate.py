@@ -0,0 +1,28 @@
+def migrate(cr, version):
+    """Перераховуємо поточну кількість партій з журналу рухів (раніше обчислювалась з серійних номерів)"""
+    cr.execute("""
+        UPDATE stock_batch batch
+        SET current_qty = GREATEST(COALESCE(moves.qty, batch.initial_qty), 0)
+        FROM stock_batch source
+        LEFT JOIN (
+            SELECT batch_id, SUM(CASE
+                WHEN movement_type IN ('in', 'transfer_in') THEN qty
+                WHEN movement_type IN ('out', 'transfer_out') THEN -qty
+                WHEN movement_type = 'adjustment' AND operation_type = 'adjustment_out' THEN -qty
+                WHEN movement_type = 'adjustment' THEN qty
+                ELSE 0
+            END) AS qty
+            FROM stock_batch_movement
+            GROUP BY batch_id
+        ) moves ON moves.batch_id = source.id
+        WHERE source.id = batch.id;
+
+        UPDATE stock_batch
+        SET available_qty = current_qty - reserved_qty,
+            state = CASE
+                WHEN NOT is_active THEN 'blocked'
+                WHEN current_qty <= 0 THEN 'depleted'
+                WHEN expiry_date IS NOT NULL AND expiry_date < CURRENT_DATE THEN 'expired'
+                ELSE 'active'
+            END;
+    """)
@@ -1,5 +1,6 @@
 from . import stock_batch
 from . import stock_batch_movement
+from . import stock_batch_movement_archive
 from . import product_nomenclature
 from . import stock_receipt_incoming
 from . import stock_batch_report_wizard
@@ -1,4 +1,5 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
+from odoo.tools import SQL
 from odoo.exceptions import ValidationError, UserError
 import logging
 
@@ -58,10 +59,10 @@ class StockBatch(models.Model):
     
     current_qty = fields.Float(
         'Поточна кількість', 
-        compute='_compute_current_qty',
-        store=True,
+        default=0.0,
+        readonly=True,
         digits='Product Unit of Measure',
-        tracking=True
+        help='Підтримується рухами партії (stock.batch.movement)'
     )
     
     reserved_qty = fields.Float(
@@ -154,17 +155,31 @@ class StockBatch(models.Model):
          'Кількості мають бути не менше нуля, початкова кількість більше нуля!'),
     ]
 
-    @api.depends('initial_qty', 'nomenclature_id.tracking_serial', 'serial_numbers')
-    def _compute_current_qty(self):
-        """Обчислює поточну кількість на основі серійних номерів або початкової кількості"""
-        for batch in self:
-            # Якщо товар обліковується по серійних номерах
-            if batch.nomenclature_id.tracking_serial:
-                # Поточна кількість = кількість серійних номерів
-                batch.current_qty = len(batch._get_serial_numbers_list())
-            else:
-                # Для звичайних товарів - поточна кількість = початкова (поки що без списання)
-                batch.current_qty = batch.initial_qty
+    def init(self):
+        """Частковий індекс черги FIFO по активних партіях з доступною кількістю"""
+        tools.create_index(self.env.cr, 'stock_batch_fifo_idx', self._table, [
+            'nomenclature_id', 'location_id', 'company_id', 'date_created', 'id',
+        ], where="state = 'active' AND available_qty > 0")
+
+    def _apply_qty_deltas(self, deltas):
+        """
+        Атомарно змінює поточну кількість партій {id партії: зміна} одним UPDATE
+        і позначає залежні поля (доступна кількість, статус) до перерахунку.
+        """
+        deltas = {batch_id: delta for batch_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        self.flush_model(['current_qty'])
+        rows = SQL(', ').join(SQL('(%s, %s)', batch_id, delta) for batch_id, delta in sorted(deltas.items()))
+        self.env.cr.execute(SQL("""
+            UPDATE stock_batch AS batch
+            SET current_qty = batch.current_qty + delta.qty
+            FROM (VALUES %s) AS delta(id, qty)
+            WHERE batch.id = delta.id
+        """, rows))
+        batches = self.browse(list(deltas))
+        batches.invalidate_recordset(['current_qty'])
+        batches.modified(['current_qty'])
 
     @api.depends('current_qty', 'reserved_qty')
     def _compute_available_qty(self):
@@ -289,15 +304,12 @@ class StockBatch(models.Model):
                 (self.current_qty, qty)
             )
         
-        # Списуємо з поточної кількості
-        self.current_qty -= qty
-        
         # Якщо було резервування, зменшуємо його відповідно
         if self.reserved_qty > 0:
             reserved_to_reduce = min(self.reserved_qty, qty)
             self.reserved_qty -= reserved_to_reduce
         
-        # Створюємо рух
+        # Створюємо рух (рух зменшує поточну кількість партії)
         self.env['stock.batch.movement'].create({
             'batch_id': self.id,
             'movement_type': 'out',
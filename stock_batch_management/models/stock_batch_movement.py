@@ -1,4 +1,5 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
+from odoo.tools import SQL
 
 class StockBatchMovement(models.Model):
     _name = 'stock.batch.movement'
@@ -92,8 +93,67 @@ class StockBatchMovement(models.Model):
         store=True
     )
 
+    def init(self):
+        """
+        Індекси звітів за період: BRIN по даті (журнал дописується в хронологічному порядку,
+        тому діапазони сторінок корелюють з датою) та b-tree партії/локації з датою.
+        """
+        self.env.cr.execute(SQL("""
+            CREATE INDEX IF NOT EXISTS stock_batch_movement_date_brin_idx ON %s
+            USING brin (date) WITH (pages_per_range = 32, autosummarize = on)
+        """, SQL.identifier(self._table)))
+        for column in ('batch_id', 'location_from_id', 'location_to_id'):
+            tools.create_index(self.env.cr, f'stock_batch_movement_{column}_date_idx', self._table, [column, 'date'])
+
     @api.depends('movement_type', 'operation_type', 'qty', 'uom_id', 'date', 'document_reference')
     def _compute_display_name(self):
         for movement in self:
             operation_label = dict(movement._fields['operation_type'].selection).get(movement.operation_type, movement.operation_type)
-            movement.display_name = f"{operation_label}: {movement.qty} {movement.uom_id.name if movement.uom_id else ''} ({movement.date.strftime('%d.%m.%Y %H:%M') if movement.date else ''})"
\ No newline at end of file
+            movement.display_name = f"{operation_label}: {movement.qty} {movement.uom_id.name if movement.uom_id else ''} ({movement.date.strftime('%d.%m.%Y %H:%M') if movement.date else ''})"
+
+    @api.model
+    def _get_qty_sign(self, movement_type, operation_type):
+        """
+        Повертає знак впливу руху на поточну кількість партії. Переміщення (transfer_out/transfer_in)
+        не змінюють кількість: товар лишається на обліку, змінюється лише його місце, а рух
+        надходження створюється не для всіх типів переміщень.
+        """
+        if movement_type == 'in':
+            return 1
+        if movement_type == 'out':
+            return -1
+        if movement_type == 'adjustment':
+            return -1 if operation_type == 'adjustment_out' else 1
+        return 0
+
+    def _get_batch_qty_deltas(self):
+        """Повертає зміни поточної кількості партій від рухів {id партії: зміна}"""
+        deltas = {}
+        for movement in self:
+            sign = self._get_qty_sign(movement.movement_type, movement.operation_type)
+            if sign:
+                deltas[movement.batch_id.id] = deltas.get(movement.batch_id.id, 0.0) + sign * movement.qty
+        return deltas
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        movements = super().create(vals_list)
+        self.env['stock.batch.movement.archive']._check_archive_date(movements.mapped('date'))
+        self.env['stock.batch']._apply_qty_deltas(movements._get_batch_qty_deltas())
+        return movements
+
+    def write(self, vals):
+        if not {'batch_id', 'movement_type', 'operation_type', 'qty'} & set(vals):
+            return super().write(vals)
+        deltas = {batch_id: -qty for batch_id, qty in self._get_batch_qty_deltas().items()}
+        result = super().write(vals)
+        for batch_id, qty in self._get_batch_qty_deltas().items():
+            deltas[batch_id] = deltas.get(batch_id, 0.0) + qty
+        self.env['stock.batch']._apply_qty_deltas(deltas)
+        return result
+
+    def unlink(self):
+        deltas = {batch_id: -qty for batch_id, qty in self._get_batch_qty_deltas().items()}
+        result = super().unlink()
+        self.env['stock.batch']._apply_qty_deltas(deltas)
+        return result
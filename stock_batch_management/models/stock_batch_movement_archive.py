@@ -0,0 +1,84 @@
+from odoo import models, fields, api, _
+from odoo.tools import SQL
+from odoo.exceptions import UserError
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Колонки, що переносяться з stock_batch_movement в архів (id зберігається)
+ARCHIVE_COLUMNS = [
+    'id', 'batch_id', 'movement_type', 'operation_type', 'qty', 'uom_id', 'location_from_id',
+    'location_to_id', 'document_reference', 'date', 'company_id', 'user_id', 'notes',
+]
+
+
+class StockBatchMovementArchive(models.Model):
+    """
+    Архів рухів партій закритих періодів: компактна копія рядків stock.batch.movement
+    з тими ж id та колонками. Звіти читають архів лише коли період сягає архівованих дат.
+    """
+    _name = 'stock.batch.movement.archive'
+    _description = 'Архів рухів партій'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    batch_id = fields.Many2one('stock.batch', 'Партія', required=True, ondelete='cascade', index=True)
+    movement_type = fields.Selection(
+        selection=lambda self: self.env['stock.batch.movement']._fields['movement_type'].selection,
+        string='Тип руху', required=True,
+    )
+    operation_type = fields.Selection(
+        selection=lambda self: self.env['stock.batch.movement']._fields['operation_type'].selection,
+        string='Тип операції', required=True,
+    )
+    qty = fields.Float('Кількість', required=True, digits='Product Unit of Measure')
+    uom_id = fields.Many2one('uom.uom', 'Одиниця виміру', required=True)
+    location_from_id = fields.Many2one('stock.location', 'Локація (з)')
+    location_to_id = fields.Many2one('stock.location', 'Локація (в)')
+    document_reference = fields.Char('Документ')
+    date = fields.Datetime('Дата та час', required=True, index=True)
+    company_id = fields.Many2one('res.company', 'Компанія', required=True)
+    user_id = fields.Many2one('res.users', 'Користувач', required=True)
+    notes = fields.Text('Примітки')
+
+    @api.model
+    def _get_archive_end(self):
+        """Повертає момент (UTC), до якого рухи партій перенесені в архів, або False"""
+        value = self.env['ir.config_parameter'].sudo().get_param('stock_batch_management.archive_date_end')
+        return fields.Datetime.to_datetime(value) if value else False
+
+    @api.model
+    def _archive_movements(self, date_end):
+        """
+        Переносить рухи партій з датою до date_end в архів одним запитом (DELETE ... RETURNING
+        в INSERT). Поточна кількість партій не змінюється - рухи лише переміщуються.
+        Повертає кількість перенесених рухів.
+        """
+        self.env['stock.batch.movement'].flush_model()
+        columns = SQL(", ").join(SQL.identifier(column) for column in ARCHIVE_COLUMNS)
+        self.env.cr.execute(SQL("""
+            WITH moved AS (
+                DELETE FROM stock_batch_movement
+                WHERE date < %(date_end)s
+                RETURNING %(columns)s
+            )
+            INSERT INTO stock_batch_movement_archive (%(columns)s)
+            SELECT %(columns)s FROM moved
+        """, columns=columns, date_end=date_end))
+        count = self.env.cr.rowcount
+        archive_end = self._get_archive_end()
+        if not archive_end or archive_end < date_end:
+            self.env['ir.config_parameter'].sudo().set_param(
+                'stock_batch_management.archive_date_end', fields.Datetime.to_string(date_end),
+            )
+        self.env['stock.batch.movement'].invalidate_model()
+        self.invalidate_model()
+        _logger.info("Batch movements before %s archived: %s", date_end, count)
+        return count
+
+    @api.model
+    def _check_archive_date(self, dates):
+        """Забороняє рухи партій в архівованому (закритому) періоді"""
+        archive_end = self._get_archive_end()
+        if archive_end and dates and min(dates) < archive_end:
+            raise UserError(_('Період до %s закрито та архівовано. Рухи партій в ньому неможливі.') % archive_end)
@@ -1,6 +1,10 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
 from datetime import datetime, timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
 
 class StockBatchReportWizard(models.TransientModel):
     _name = 'stock.batch.report.wizard'
@@ -151,9 +155,6 @@ class StockBatchReportWizard(models.TransientModel):
 
     def _get_batch_domain(self):
         """Формує domain для пошуку партій"""
-        import logging
-        _logger = logging.getLogger(__name__)
-        
         domain = []
         
         # Логіка компаній: якщо вибрана головна компанія, шукаємо у всіх дочірніх
@@ -162,12 +163,7 @@ class StockBatchReportWizard(models.TransientModel):
         
         if current_company == parent_company:
             # Вибрана головна компанія - шукаємо у всіх дочірніх
-            child_companies = self.env['res.company'].search([
-                '|',
-                ('id', '=', parent_company.id),
-                ('parent_id', '=', parent_company.id)
-            ])
-            domain.append(('company_id', 'in', child_companies.ids))
+            domain.append(('company_id', 'in', parent_company._get_child_company_ids()))
         else:
             # Вибрана конкретна дочірня компанія
             domain.append(('company_id', '=', current_company.id))
@@ -198,234 +194,151 @@ class StockBatchReportWizard(models.TransientModel):
         if not self.show_blocked:
             domain.append(('is_active', '=', True))
         
-        _logger.info(f"Batch domain: {domain}")
+        _logger.debug("Batch domain: %s", domain)
         
         return domain
 
-    def _group_movement_data(self, movements):
-        """Групує дані рухів відповідно до рівня деталізації"""
-        grouped_data = {}
-        
-        for movement in movements:
-            key = self._get_movement_group_key(movement)
-            
-            if key not in grouped_data:
-                grouped_data[key] = {
-                    'key': key,
-                    'name': self._get_group_name(movement, 'movement'),
-                    'qty_in': 0.0,
-                    'qty_out': 0.0,
-                    'movements_count': 0,
-                    'movements': [],
-                    'uom_name': movement.uom_id.name if movement.uom_id else '',
-                }
-            
-            if movement.movement_type == 'in':
-                grouped_data[key]['qty_in'] += movement.qty
-            elif movement.movement_type == 'out':
-                grouped_data[key]['qty_out'] += movement.qty
-            
-            grouped_data[key]['movements_count'] += 1
-            grouped_data[key]['movements'].append(movement.id)
-            grouped_data[key]['qty_total'] = grouped_data[key]['qty_in'] + grouped_data[key]['qty_out']
-        
-        return list(grouped_data.values())
-
-    def _group_balance_data(self, batches):
-        """Групує дані залишків відповідно до рівня деталізації"""
-        import logging
-        _logger = logging.getLogger(__name__)
-        _logger.info(f"Grouping {len(batches)} batches for balance report")
-        
-        grouped_data = {}
-        
-        for batch in batches:
-            key = self._get_balance_group_key(batch)
-            
-            if key not in grouped_data:
-                grouped_data[key] = {
-                    'key': key,
-                    'name': self._get_group_name(batch, 'balance'),
-                    'company_name': batch.company_id.name,  # Додаємо компанію
-                    'total_qty': 0.0,
-                    'available_qty': 0.0,
-                    'batches_count': 0,
-                    'batches': [],
-                    'states': set(),
-                    'uom_name': batch.uom_id.name if batch.uom_id else '',
-                }
-            
-            grouped_data[key]['total_qty'] += batch.current_qty
-            grouped_data[key]['available_qty'] += batch.available_qty
-            grouped_data[key]['batches_count'] += 1
-            grouped_data[key]['batches'].append(batch.id)
-            grouped_data[key]['states'].add(batch.state)
-        
-        # Визначаємо загальний статус для групи
-        for data in grouped_data.values():
-            states = data['states']
-            if len(states) == 1:
-                data['state'] = list(states)[0]
-            else:
-                data['state'] = 'mixed'
-            # Прибираємо set для серіалізації
-            del data['states']
-        
-        result = list(grouped_data.values())
-        _logger.info(f"Grouped balance data: {len(result)} groups")
-        
-        return result
-    
-    def _get_group_name(self, record, record_type):
-        """Повертає назву групи для відображення"""
-        if record_type == 'movement':
-            if self.detail_level == 'warehouse':
-                warehouse = record.location_from_id.warehouse_id or record.location_to_id.warehouse_id
-                return warehouse.name if warehouse else 'Невизначений склад'
-            elif self.detail_level == 'nomenclature':
-                return record.batch_id.nomenclature_id.name
-            else:  # batch
-                return f"{record.batch_id.batch_number} ({record.batch_id.nomenclature_id.name})"
-        else:  # balance
-            if self.detail_level == 'warehouse':
-                return record.location_id.warehouse_id.name if record.location_id.warehouse_id else 'Невизначений склад'
-            elif self.detail_level == 'nomenclature':
-                return record.nomenclature_id.name
-            else:  # batch
-                return f"{record.batch_number} ({record.nomenclature_id.name})"
-
-    def _get_movement_group_key(self, movement):
-        """Повертає ключ групування для руху"""
+    def _get_group_sql(self):
+        """Повертає SQL ключа та назви групи (аліаси batch, pn, sw) відповідно до рівня деталізації"""
+        nomenclature_name = SQL(
+            "COALESCE(pn.name->>%s, pn.name->>'en_US')", self.env.lang or 'en_US',
+        )
         if self.detail_level == 'warehouse':
-            warehouse = movement.location_from_id.warehouse_id or movement.location_to_id.warehouse_id
-            return f"warehouse_{warehouse.id if warehouse else 0}"
+            return (
+                SQL("'warehouse_' || COALESCE(sw.id, 0)"),
+                SQL("COALESCE(sw.name, %s)", 'Невизначений склад'),
+            )
         elif self.detail_level == 'nomenclature':
-            return f"nomenclature_{movement.batch_id.nomenclature_id.id}"
+            return SQL("'nomenclature_' || pn.id"), nomenclature_name
         else:  # batch
-            return f"batch_{movement.batch_id.id}"
+            return (
+                SQL("'batch_' || batch.id"),
+                SQL("batch.batch_number || ' (' || %s || ')'", nomenclature_name),
+            )
+
+    def _get_movement_source_sql(self, domain):
+        """
+        Повертає SQL джерело рухів за domain: журнал рухів, а якщо період звіту
+        сягає архівованих дат - також архів рухів партій.
+        """
+        models_to_read = ['stock.batch.movement']
+        archive_end = self.env['stock.batch.movement.archive']._get_archive_end()
+        if archive_end and fields.Datetime.to_datetime(self.date_from) < archive_end:
+            models_to_read.append('stock.batch.movement.archive')
+        sources = []
+        for model_name in models_to_read:
+            Model = self.env[model_name]
+            sources.append(SQL("""
+                SELECT id, batch_id, movement_type, qty, uom_id, location_from_id, location_to_id
+                FROM %(table)s
+                WHERE id IN %(ids)s
+            """, table=SQL.identifier(Model._table), ids=Model._search(domain).subselect()))
+        return SQL("(%s)", SQL(" UNION ALL ").join(sources))
 
-    def _get_balance_group_key(self, batch):
-        """Повертає ключ групування для залишку"""
+    def _group_movement_data(self, domain):
+        """Групує дані рухів відповідно до рівня деталізації одним GROUP BY запитом"""
+        group_key, group_name = self._get_group_sql()
+        self.env.cr.execute(SQL("""
+            SELECT %(key)s AS key,
+                   %(name)s AS name,
+                   SUM(CASE WHEN m.movement_type = 'in' THEN m.qty ELSE 0 END) AS qty_in,
+                   SUM(CASE WHEN m.movement_type = 'out' THEN m.qty ELSE 0 END) AS qty_out,
+                   COUNT(*) AS movements_count,
+                   MIN(COALESCE(uom.name->>%(lang)s, uom.name->>'en_US')) AS uom_name
+            FROM %(movements)s m
+            JOIN stock_batch batch ON batch.id = m.batch_id
+            JOIN product_nomenclature pn ON pn.id = batch.nomenclature_id
+            LEFT JOIN stock_location loc_from ON loc_from.id = m.location_from_id
+            LEFT JOIN stock_location loc_to ON loc_to.id = m.location_to_id
+            LEFT JOIN stock_warehouse sw ON sw.id = COALESCE(loc_from.warehouse_id, loc_to.warehouse_id)
+            LEFT JOIN uom_uom uom ON uom.id = m.uom_id
+            GROUP BY 1, 2
+            ORDER BY 2
+        """, key=group_key, name=group_name, lang=self.env.lang or 'en_US',
+            movements=self._get_movement_source_sql(domain)))
+        result = self.env.cr.dictfetchall()
+        for data in result:
+            data['qty_total'] = data['qty_in'] + data['qty_out']
+        return result
+
+    def _group_balance_data(self, domain):
+        """Групує дані залишків відповідно до рівня деталізації одним GROUP BY запитом"""
+        query = self.env['stock.batch']._search(domain)
+        group_key, group_name = self._get_group_sql()
+        self.env.cr.execute(SQL("""
+            SELECT %(key)s AS key,
+                   %(name)s AS name,
+                   STRING_AGG(DISTINCT company.name, ', ') AS company_name,
+                   SUM(batch.current_qty) AS total_qty,
+                   SUM(batch.available_qty) AS available_qty,
+                   SUM(batch.reserved_qty) AS reserved_qty,
+                   COUNT(*) AS batches_count,
+                   CASE WHEN COUNT(DISTINCT batch.state) = 1 THEN MIN(batch.state) ELSE 'mixed' END AS state,
+                   MIN(COALESCE(uom.name->>%(lang)s, uom.name->>'en_US')) AS uom_name
+            FROM stock_batch batch
+            JOIN product_nomenclature pn ON pn.id = batch.nomenclature_id
+            JOIN res_company company ON company.id = batch.company_id
+            LEFT JOIN stock_location loc ON loc.id = batch.location_id
+            LEFT JOIN stock_warehouse sw ON sw.id = loc.warehouse_id
+            LEFT JOIN uom_uom uom ON uom.id = batch.uom_id
+            WHERE batch.id IN %(ids)s
+            GROUP BY 1, 2
+            ORDER BY 2
+        """, key=group_key, name=group_name, lang=self.env.lang or 'en_US', ids=query.subselect()))
+        result = self.env.cr.dictfetchall()
+        _logger.debug("Grouped balance data: %s groups", len(result))
+        return result
+
+    def _get_report_row_names(self, data):
+        """Повертає поля назви рядка звіту відповідно до рівня деталізації"""
         if self.detail_level == 'warehouse':
-            return f"warehouse_{batch.location_id.warehouse_id.id if batch.location_id.warehouse_id else 0}"
+            return {'warehouse_name': data['name']}
         elif self.detail_level == 'nomenclature':
-            return f"nomenclature_{batch.nomenclature_id.id}"
-        else:  # batch
-            return f"batch_{batch.id}"
+            return {'nomenclature_name': data['name']}
+        return {'batch_number': data['name']}
+
+    def _create_report_records(self, report_type, vals_list):
+        """Замінює рядки звіту цього wizard новими одним пакетом"""
+        self.ensure_one()
+        ReportData = self.env['stock.batch.report.data']
+        ReportData.search([
+            ('wizard_id', '=', self.id),
+            ('report_type', '=', report_type),
+        ]).unlink()
+        return ReportData.create([
+            dict(vals, wizard_id=self.id, report_type=report_type) for vals in vals_list
+        ])
 
     def _create_movement_report_records(self, report_data):
         """Створює записи для звіту руху товарів"""
-        MovementReport = self.env['stock.batch.movement.report']
-        
-        # Очищаємо попередні записи
-        MovementReport.search([]).unlink()
-        
-        records = []
-        for data in report_data:
-            record_vals = {
-                'wizard_id': self.id,
-                'qty_in': data['qty_in'],
-                'qty_out': data['qty_out'],
-                'movements_count': data['movements_count'],
-            }
-            
-            # Заповнюємо поля залежно від рівня деталізації
-            key_parts = data['key'].split('_')
-            key_type = key_parts[0]
-            key_id = int(key_parts[1]) if len(key_parts) > 1 and key_parts[1].isdigit() else None
-            
-            if key_type == 'warehouse' and key_id:
-                warehouse = self.env['stock.warehouse'].browse(key_id)
-                record_vals.update({
-                    'warehouse_id': warehouse.id,
-                    'uom_id': warehouse.company_id.currency_id.id if warehouse else None,
-                })
-            elif key_type == 'nomenclature' and key_id:
-                nomenclature = self.env['product.nomenclature'].browse(key_id)
-                if nomenclature.exists():
-                    record_vals.update({
-                        'nomenclature_id': nomenclature.id,
-                        'category_id': nomenclature.categ_id.id if hasattr(nomenclature, 'categ_id') else None,
-                        'uom_id': nomenclature.uom_id.id if hasattr(nomenclature, 'uom_id') else None,
-                    })
-            elif key_type == 'batch' and key_id:
-                batch = self.env['stock.batch'].browse(key_id)
-                if batch.exists():
-                    record_vals.update({
-                        'batch_id': batch.id,
-                        'nomenclature_id': batch.nomenclature_id.id,
-                        'warehouse_id': batch.location_id.warehouse_id.id if batch.location_id.warehouse_id else None,
-                        'category_id': batch.nomenclature_id.categ_id.id if hasattr(batch.nomenclature_id, 'categ_id') else None,
-                        'uom_id': batch.uom_id.id,
-                    })
-            
-            records.append(MovementReport.create(record_vals))
-        
-        return MovementReport.browse([r.id for r in records])
+        return self._create_report_records('movement', [dict(
+            self._get_report_row_names(data),
+            qty_in=data['qty_in'],
+            qty_out=data['qty_out'],
+            qty_total=data['qty_total'],
+            movements_count=data['movements_count'],
+            uom_name=data['uom_name'],
+        ) for data in report_data])
 
     def _create_balance_report_records(self, report_data):
         """Створює записи для звіту залишків товарів"""
-        BalanceReport = self.env['stock.batch.balance.report']
-        
-        # Очищаємо попередні записи
-        BalanceReport.search([]).unlink()
-        
-        records = []
-        for data in report_data:
-            record_vals = {
-                'wizard_id': self.id,
-                'total_qty': data['total_qty'],
-                'available_qty': data['available_qty'],
-                'reserved_qty': data['reserved_qty'],
-                'batches_count': data['batches_count'],
-                'state': data.get('state', 'mixed'),
-            }
-            
-            # Заповнюємо поля залежно від рівня деталізації
-            key_parts = data['key'].split('_')
-            key_type = key_parts[0]
-            key_id = int(key_parts[1]) if len(key_parts) > 1 and key_parts[1].isdigit() else None
-            
-            if key_type == 'warehouse' and key_id:
-                warehouse = self.env['stock.warehouse'].browse(key_id)
-                record_vals.update({
-                    'warehouse_id': warehouse.id,
-                })
-            elif key_type == 'nomenclature' and key_id:
-                nomenclature = self.env['product.nomenclature'].browse(key_id)
-                if nomenclature.exists():
-                    record_vals.update({
-                        'nomenclature_id': nomenclature.id,
-                        'category_id': nomenclature.categ_id.id if hasattr(nomenclature, 'categ_id') else None,
-                        'uom_id': nomenclature.uom_id.id if hasattr(nomenclature, 'uom_id') else None,
-                    })
-            elif key_type == 'batch' and key_id:
-                batch = self.env['stock.batch'].browse(key_id)
-                if batch.exists():
-                    record_vals.update({
-                        'batch_id': batch.id,
-                        'nomenclature_id': batch.nomenclature_id.id,
-                        'warehouse_id': batch.location_id.warehouse_id.id if batch.location_id.warehouse_id else None,
-                        'category_id': batch.nomenclature_id.categ_id.id if hasattr(batch.nomenclature_id, 'categ_id') else None,
-                        'uom_id': batch.uom_id.id,
-                        'state': batch.state,
-                    })
-            
-            records.append(BalanceReport.create(record_vals))
-        
-        return BalanceReport.browse([r.id for r in records])
+        return self._create_report_records('balance', [dict(
+            self._get_report_row_names(data),
+            total_qty=data['total_qty'],
+            available_qty=data['available_qty'],
+            reserved_qty=data['reserved_qty'],
+            batches_count=data['batches_count'],
+            state=data.get('state', 'mixed'),
+            uom_name=data['uom_name'],
+        ) for data in report_data])
 
     def get_movement_report_data(self):
         """Повертає дані для звіту руху товарів"""
-        domain = self._get_movement_domain()
-        movements = self.env['stock.batch.movement'].search(domain, order='date desc')
-        return self._group_movement_data(movements)
+        return self._group_movement_data(self._get_movement_domain())
     
     def get_balance_report_data(self):
         """Повертає дані для звіту залишків товарів"""
-        domain = self._get_batch_domain()
-        batches = self.env['stock.batch'].search(domain)
-        return self._group_balance_data(batches)
+        return self._group_balance_data(self._get_batch_domain())
     
     def get_report_title(self):
         """Повертає заголовок звіту"""
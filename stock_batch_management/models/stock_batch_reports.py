@@ -1,11 +1,20 @@
 from odoo import models, fields, api, _
 
 class StockBatchReportData(models.TransientModel):
-    """Модель для передачі даних в QWeb звіт"""
+    """
+    Модель для передачі даних в QWeb звіт.
+    Рядки належать своєму wizard і видаляються разом з ним автоочищенням тимчасових моделей.
+    """
     _name = 'stock.batch.report.data'
     _description = 'Дані звіту по партіях'
 
-    wizard_id = fields.Many2one('stock.batch.report.wizard', 'Wizard')
+    wizard_id = fields.Many2one(
+        'stock.batch.report.wizard',
+        'Wizard',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
     report_type = fields.Selection([
         ('movement', 'Рух товарів'),
         ('balance', 'Залишки товарів'),
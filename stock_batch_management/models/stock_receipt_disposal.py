@@ -28,7 +28,7 @@ class StockReceiptDisposal(models.Model):
         result = super()._do_posting(posting_time, custom_datetime)
         
         # Створюємо партії для кожної позиції
-        for line in self.line_ids:
+        for line in self._get_posting_lines():
             self._create_batch_for_line(line)
         
         return result
@@ -49,7 +49,6 @@ class StockReceiptDisposal(models.Model):
                 'source_document_type': 'inventory',
                 'source_document_number': self.number,
                 'initial_qty': line.qty,
-                'current_qty': line.qty,
                 'uom_id': line.selected_uom_id.id or line.product_uom_id.id,
                 'location_id': location.id,
                 'company_id': self.company_id.id,
@@ -28,7 +28,7 @@ class StockReceiptIncoming(models.Model):
         result = super()._do_posting(posting_time, custom_datetime)
         
         # Створюємо партії для кожної позиції
-        for line in self.line_ids:
+        for line in self._get_posting_lines():
             self._create_batch_for_line(line)
         
         return result
@@ -0,0 +1,33 @@
+{
+    'name': 'Бенчмарк складського обліку',
+    'version': '18.0.1.0.0',
+    'category': 'Hidden',
+    'summary': 'Генератор синтетичних даних та заміри гарячих сценаріїв складу',
+    'description': '''
+        Інструмент вимірювання продуктивності складського обліку на локальній базі:
+        - Генератор даних: ієрархія компаній, склади, працівники, номенклатура з одиницями
+          виміру, партії та серійні номери (до мільйонів)
+        - Сценарії: проведення прихідних накладних та актів оприходування, переміщення з FIFO,
+          відкриття позиції переміщення, wizard серійних номерів, звіти та зведена сторінка
+        - Для кожного сценарію: час виконання, кількість SQL запитів, пікова пам'ять
+        - Порівняння запусків з базовим (baseline)
+        Не встановлювати на робочу базу - генератор створює дані в поточній базі.
+    ''',
+    'author': 'Петровський Юрій',
+    'depends': [
+        'hr',
+        'company_hierarchy',
+        'custom_nomenclature',
+        'custom_stock_receipt',
+        'stock_transfer',
+        'stock_batch_management',
+        'stock_balance_management',
+    ],
+    'data': [
+        'security/ir.model.access.csv',
+        'views/stock_benchmark_run_views.xml',
+    ],
+    'installable': True,
+    'application': False,
+    'license': 'LGPL-3',
+}
@@ -0,0 +1,3 @@
+from . import stock_benchmark_generator
+from . import stock_benchmark_scenario
+from . import stock_benchmark_run
@@ -0,0 +1,154 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+import logging
+import math
+
+_logger = logging.getLogger(__name__)
+
+BENCHMARK_PREFIX = 'BENCH'
+
+
+class StockBenchmarkGenerator(models.AbstractModel):
+    """
+    Генератор синтетичних даних для бенчмарку складського обліку.
+    Документи проводяться штатними методами, масові серійні номери додаються SQL запитом.
+    """
+    _name = 'stock.benchmark.generator'
+    _description = 'Генератор даних бенчмарку'
+
+    @api.model
+    def generate(self, companies=3, warehouses_per_company=2, employees_per_company=5,
+                 nomenclatures=200, serial_share=0.1, serials=10000, qty=1000.0):
+        """
+        Створює набір даних і повертає його опис (словник id), який приймають сценарії бенчмарку.
+        Кожен склад отримує прихідну накладну на всю номенклатуру; серійні номери рівномірно
+        розподіляються по залишках номенклатури з обліком S/N.
+        """
+        env = self.with_context(tracking_disable=True, mail_create_nolog=True, mail_notrack=True).env
+        generator = self.with_env(env)
+        company_records = generator._generate_companies(companies)
+        warehouses = generator._generate_warehouses(company_records, warehouses_per_company)
+        employees = generator._generate_employees(company_records, employees_per_company)
+        nomenclature_records = generator._generate_nomenclatures(nomenclatures, serial_share)
+        serial_nomenclatures = nomenclature_records.filtered('tracking_serial')
+        serials_per_balance = math.ceil(serials / max(len(serial_nomenclatures) * len(warehouses), 1))
+        partner = env['res.partner'].create({'name': f'{BENCHMARK_PREFIX} Постачальник'})
+        receipts = generator._generate_receipts(
+            warehouses, nomenclature_records, partner, qty, serials_per_balance,
+        )
+        serial_count = generator._generate_serials(receipts, serials_per_balance)
+        dataset = {
+            'company_ids': company_records.ids,
+            'warehouse_ids': warehouses.ids,
+            'employee_ids': employees.ids,
+            'nomenclature_ids': (nomenclature_records - serial_nomenclatures).ids,
+            'serial_nomenclature_ids': serial_nomenclatures.ids,
+            'partner_id': partner.id,
+            'receipt_ids': receipts.ids,
+            'serial_count': serial_count,
+        }
+        _logger.info(
+            "Benchmark dataset: %s companies, %s warehouses, %s employees, %s nomenclatures, %s serials",
+            len(company_records), len(warehouses), len(employees), len(nomenclature_records), serial_count,
+        )
+        return dataset
+
+    @api.model
+    def _generate_companies(self, count):
+        """Створює головну компанію та count - 1 дочірніх"""
+        root = self.env['res.company'].create({'name': f'{BENCHMARK_PREFIX} Головна компанія'})
+        children = self.env['res.company'].create([{
+            'name': f'{BENCHMARK_PREFIX} Філія {index}',
+            'parent_id': root.id,
+        } for index in range(1, count)])
+        companies = root | children
+        self.env.user.company_ids |= companies
+        return companies
+
+    @api.model
+    def _generate_warehouses(self, companies, per_company):
+        vals_list = []
+        for company in companies:
+            for index in range(per_company):
+                vals_list.append({
+                    'name': f'{BENCHMARK_PREFIX} Склад {company.id}-{index}',
+                    'code': f'B{len(vals_list):04d}',
+                    'company_id': company.id,
+                })
+        return self.env['stock.warehouse'].create(vals_list)
+
+    @api.model
+    def _generate_employees(self, companies, per_company):
+        return self.env['hr.employee'].create([{
+            'name': f'{BENCHMARK_PREFIX} Працівник {company.id}-{index}',
+            'company_id': company.id,
+        } for company in companies for index in range(per_company)])
+
+    @api.model
+    def _generate_nomenclatures(self, count, serial_share):
+        """Створює номенклатуру з базовою одиницею та додатковою одиницею виміру"""
+        category = self.env['product.nomenclature.category'].create({'name': f'{BENCHMARK_PREFIX} Категорія'})
+        unit = self.env.ref('uom.product_uom_unit')
+        dozen = self.env.ref('uom.product_uom_dozen')
+        serial_count = int(count * serial_share)
+        nomenclatures = self.env['product.nomenclature'].create([{
+            'name': f'{BENCHMARK_PREFIX} Товар {index}',
+            'category_id': category.id,
+            'base_uom_id': unit.id,
+            'tracking_serial': index < serial_count,
+        } for index in range(count)])
+        # Рядки одиниць виміру вставляються напряму: create рядка пише повідомлення в чат номенклатури
+        now = fields.Datetime.now()
+        self.env.cr.execute(SQL("""
+            INSERT INTO product_nomenclature_uom_line (
+                product_id, uom_id, coefficient, is_default, create_uid, create_date, write_uid, write_date
+            )
+            SELECT product_id, uom.id, uom.coefficient, uom.is_default, %(uid)s, %(now)s, %(uid)s, %(now)s
+            FROM unnest(%(ids)s) AS product_id
+            CROSS JOIN (VALUES (%(unit)s, 1.0, TRUE), (%(dozen)s, 12.0, FALSE)) AS uom(id, coefficient, is_default)
+        """, uid=self.env.uid, now=now, ids=nomenclatures.ids, unit=unit.id, dozen=dozen.id))
+        return nomenclatures
+
+    @api.model
+    def _generate_receipts(self, warehouses, nomenclatures, partner, qty, serials_per_balance):
+        """Створює та проводить по одній прихідній накладній на склад (партії, залишки, рухи)"""
+        receipts = self.env['stock.receipt.incoming']
+        for warehouse in warehouses:
+            Receipt = self.env['stock.receipt.incoming'].with_company(warehouse.company_id)
+            receipt = Receipt.create({
+                'partner_id': partner.id,
+                'warehouse_id': warehouse.id,
+                'company_id': warehouse.company_id.id,
+                'line_ids': [(0, 0, {
+                    'nomenclature_id': nomenclature.id,
+                    'qty': serials_per_balance if nomenclature.tracking_serial else qty,
+                    'price_unit_no_vat': 1.0,
+                }) for nomenclature in nomenclatures],
+            })
+            receipt._do_posting('current_time')
+            receipts |= receipt
+        return receipts
+
+    @api.model
+    def _generate_serials(self, receipts, serials_per_balance):
+        """Додає серійні номери на залишки номенклатури з обліком S/N одним INSERT ... SELECT"""
+        self.env.flush_all()
+        self.env.cr.execute(SQL("""
+            INSERT INTO stock_serial (
+                name, nomenclature_id, balance_id, batch_id, location_type, warehouse_id,
+                employee_id, location_id, company_id, create_uid, create_date, write_uid, write_date
+            )
+            SELECT %(prefix)s || '-' || sb.id || '-' || gs.n, sb.nomenclature_id, sb.id, sb.batch_id,
+                   sb.location_type, sb.warehouse_id, sb.employee_id, sb.location_id, sb.company_id,
+                   %(uid)s, %(now)s, %(uid)s, %(now)s
+            FROM stock_balance_movement sbm
+            JOIN stock_balance sb ON sb.id = sbm.balance_id
+            JOIN product_nomenclature pn ON pn.id = sb.nomenclature_id AND pn.tracking_serial
+            CROSS JOIN generate_series(1, %(per_balance)s) AS gs(n)
+            WHERE sbm.document_reference IN %(numbers)s
+            ON CONFLICT DO NOTHING
+        """, prefix=BENCHMARK_PREFIX, uid=self.env.uid, now=fields.Datetime.now(),
+            per_balance=serials_per_balance, numbers=tuple(receipts.mapped('number'))))
+        count = self.env.cr.rowcount
+        self.env.invalidate_all()
+        return count
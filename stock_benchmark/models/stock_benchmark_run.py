@@ -0,0 +1,81 @@
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class StockBenchmarkRun(models.Model):
+    """Запуск бенчмарку: результати сценаріїв та порівняння з базовим запуском"""
+    _name = 'stock.benchmark.run'
+    _description = 'Запуск бенчмарку'
+    _order = 'date desc, id desc'
+
+    name = fields.Char('Назва', required=True)
+    date = fields.Datetime('Дата запуску', required=True, default=fields.Datetime.now)
+    is_baseline = fields.Boolean('Базовий запуск', default=False)
+    dataset_info = fields.Text('Набір даних', readonly=True)
+    result_ids = fields.One2many('stock.benchmark.result', 'run_id', 'Результати')
+
+    @api.model
+    def run_benchmark(self, dataset, name=None, scenarios=None, is_baseline=False):
+        """
+        Запускає сценарії на наборі даних генератора, зберігає результати
+        та пише в лог порівняння з базовим запуском.
+        """
+        results = self.env['stock.benchmark.scenario'].run_scenarios(dataset, scenarios)
+        run = self.create({
+            'name': name or f'Бенчмарк {fields.Datetime.now()}',
+            'dataset_info': ', '.join(f'{key}: {len(value) if isinstance(value, list) else value}'
+                                      for key, value in dataset.items()),
+            'result_ids': [(0, 0, result) for result in results],
+        })
+        if is_baseline:
+            run.action_set_baseline()
+        run._log_comparison()
+        return run
+
+    @api.model
+    def _get_baseline(self):
+        return self.search([('is_baseline', '=', True)], limit=1)
+
+    def action_set_baseline(self):
+        """Робить запуск базовим для порівняння (попередній базовий знімається)"""
+        self.ensure_one()
+        self.search([('is_baseline', '=', True), ('id', '!=', self.id)]).is_baseline = False
+        self.is_baseline = True
+
+    def _log_comparison(self):
+        self.ensure_one()
+        for result in self.result_ids:
+            _logger.info(
+                "Benchmark %s: %.1f ms (%+.1f%%), %s queries (baseline %s), %.0f KiB",
+                result.scenario, result.wall_time, result.wall_time_delta,
+                result.query_count, result.baseline_query_count, result.peak_memory,
+            )
+
+
+class StockBenchmarkResult(models.Model):
+    """Результат сценарію в запуску бенчмарку"""
+    _name = 'stock.benchmark.result'
+    _description = 'Результат сценарію бенчмарку'
+    _order = 'run_id, id'
+
+    run_id = fields.Many2one('stock.benchmark.run', 'Запуск', required=True, ondelete='cascade', index=True)
+    scenario = fields.Char('Сценарій', required=True)
+    wall_time = fields.Float('Час, мс', digits=(16, 1))
+    query_count = fields.Integer('SQL запитів')
+    peak_memory = fields.Float('Пікова пам\'ять, КіБ', digits=(16, 0))
+    baseline_wall_time = fields.Float('Базовий час, мс', compute='_compute_baseline', digits=(16, 1))
+    baseline_query_count = fields.Integer('Базово SQL запитів', compute='_compute_baseline')
+    wall_time_delta = fields.Float('Зміна часу, %', compute='_compute_baseline', digits=(16, 1))
+
+    def _compute_baseline(self):
+        baseline = self.env['stock.benchmark.run']._get_baseline()
+        baseline_results = {result.scenario: result for result in baseline.result_ids}
+        for result in self:
+            base = baseline_results.get(result.scenario)
+            result.baseline_wall_time = base.wall_time if base else 0.0
+            result.baseline_query_count = base.query_count if base else 0
+            result.wall_time_delta = (
+                (result.wall_time - base.wall_time) / base.wall_time * 100 if base and base.wall_time else 0.0
+            )
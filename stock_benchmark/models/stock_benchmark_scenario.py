@@ -0,0 +1,225 @@
+from odoo import models, api
+import gc
+import logging
+import time
+import tracemalloc
+import uuid
+
+_logger = logging.getLogger(__name__)
+
+# Сценарії у порядку запуску: (код, метод підготовки)
+BENCHMARK_SCENARIOS = [
+    ('receipt_posting', '_prepare_receipt_posting'),
+    ('disposal_posting', '_prepare_disposal_posting'),
+    ('transfer_done_fifo', '_prepare_transfer_done_fifo'),
+    ('transfer_line_form', '_prepare_transfer_line_form'),
+    ('serial_wizard_1k', '_prepare_serial_wizard_1k'),
+    ('balance_report', '_prepare_balance_report'),
+    ('batch_report', '_prepare_batch_report'),
+    ('serial_report', '_prepare_serial_report'),
+    ('receipt_dashboard', '_prepare_receipt_dashboard'),
+]
+
+
+class StockBenchmarkScenario(models.AbstractModel):
+    """
+    Сценарії бенчмарку. Метод _prepare_<код> готує дані (поза заміром)
+    і повертає функцію, яка вимірюється.
+    """
+    _name = 'stock.benchmark.scenario'
+    _description = 'Сценарії бенчмарку'
+
+    DOCUMENT_LINES = 50
+    SERIAL_WIZARD_SIZE = 1000
+
+    @api.model
+    def run_scenarios(self, dataset, scenarios=None):
+        """Запускає сценарії (всі або вибрані коди) та повертає список результатів замірів"""
+        results = []
+        for code, method in BENCHMARK_SCENARIOS:
+            if scenarios and code not in scenarios:
+                continue
+            func = getattr(self, method)(dataset)
+            result = self._measure(func)
+            result['scenario'] = code
+            _logger.info(
+                "Benchmark %s: %.1f ms, %s queries, %.0f KiB peak",
+                code, result['wall_time'], result['query_count'], result['peak_memory'],
+            )
+            results.append(result)
+        return results
+
+    @api.model
+    def _measure(self, func):
+        """
+        Вимірює час виконання, кількість SQL запитів і пікову пам'ять Python.
+        Кеш ORM очищується перед заміром; відкладені записи скидаються в базу в межах заміру.
+        """
+        self.env.flush_all()
+        self.env.invalidate_all()
+        gc.collect()
+        cr = self.env.cr
+        tracemalloc.start()
+        query_count = cr.sql_log_count
+        start = time.perf_counter()
+        func()
+        self.env.flush_all()
+        wall_time = time.perf_counter() - start
+        __, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'wall_time': wall_time * 1000,
+            'query_count': cr.sql_log_count - query_count,
+            'peak_memory': peak / 1024,
+        }
+
+    def _get_benchmark_records(self, dataset):
+        warehouses = self.env['stock.warehouse'].browse(dataset['warehouse_ids'])
+        nomenclatures = self.env['product.nomenclature'].browse(dataset['nomenclature_ids'])
+        return warehouses, nomenclatures
+
+    def _get_warehouse_pair(self, dataset):
+        """Повертає два склади однієї компанії"""
+        warehouses, __ = self._get_benchmark_records(dataset)
+        source = warehouses[0]
+        destination = (warehouses - source).filtered(lambda w: w.company_id == source.company_id)[:1]
+        return source, destination or warehouses[1]
+
+    def _prepare_receipt_posting(self, dataset):
+        warehouse, nomenclatures = self._get_benchmark_records(dataset)
+        warehouse = warehouse[0]
+        receipt = self.env['stock.receipt.incoming'].with_company(warehouse.company_id).create({
+            'partner_id': dataset['partner_id'],
+            'warehouse_id': warehouse.id,
+            'company_id': warehouse.company_id.id,
+            'line_ids': [(0, 0, {
+                'nomenclature_id': nomenclature.id,
+                'qty': 10.0,
+                'price_unit_no_vat': 1.0,
+            }) for nomenclature in nomenclatures[:self.DOCUMENT_LINES]],
+        })
+        return lambda: receipt._do_posting('current_time')
+
+    def _prepare_disposal_posting(self, dataset):
+        warehouse, nomenclatures = self._get_benchmark_records(dataset)
+        warehouse = warehouse[0]
+        disposal = self.env['stock.receipt.disposal'].with_company(warehouse.company_id).create({
+            'warehouse_id': warehouse.id,
+            'company_id': warehouse.company_id.id,
+            'line_ids': [(0, 0, {
+                'nomenclature_id': nomenclature.id,
+                'qty': 10.0,
+            }) for nomenclature in nomenclatures[:self.DOCUMENT_LINES]],
+        })
+        return lambda: disposal._do_posting('current_time')
+
+    def _prepare_transfer_done_fifo(self, dataset):
+        source, destination = self._get_warehouse_pair(dataset)
+        __, nomenclatures = self._get_benchmark_records(dataset)
+        transfer = self.env['stock.transfer'].create({
+            'transfer_type': 'warehouse',
+            'company_id': source.company_id.id,
+            'warehouse_from_id': source.id,
+            'warehouse_to_id': destination.id,
+            'line_ids': [(0, 0, {
+                'nomenclature_id': nomenclature.id,
+                'selected_uom_id': nomenclature.base_uom_id.id,
+                'qty': 1.0,
+            }) for nomenclature in nomenclatures[:self.DOCUMENT_LINES]],
+        })
+        return transfer.action_done
+
+    def _prepare_transfer_line_form(self, dataset):
+        source, destination = self._get_warehouse_pair(dataset)
+        __, nomenclatures = self._get_benchmark_records(dataset)
+        transfer = self.env['stock.transfer'].create({
+            'transfer_type': 'warehouse',
+            'company_id': source.company_id.id,
+            'warehouse_from_id': source.id,
+            'warehouse_to_id': destination.id,
+        })
+
+        def open_line_form():
+            # Форма переміщення, випадаючий список номенклатури відправника та onchange позиції
+            self.env['stock.transfer'].get_views([(False, 'form')])
+            self.env['product.nomenclature'].with_context(
+                balance_transfer_type=transfer.transfer_type,
+                balance_warehouse_id=source.id,
+                balance_company_id=transfer.company_id.id,
+            ).name_search('', [('is_available_in_source', '=', True)], limit=8)
+            line = self.env['stock.transfer.line'].new({
+                'transfer_id': transfer.id,
+                'nomenclature_id': nomenclatures[0].id,
+            })
+            line._onchange_nomenclature_id()
+            line.available_qty
+        return open_line_form
+
+    def _prepare_serial_wizard_1k(self, dataset):
+        warehouse, __ = self._get_benchmark_records(dataset)
+        warehouse = warehouse[0]
+        nomenclature = self.env['product.nomenclature'].browse(dataset['serial_nomenclature_ids'][:1])
+        receipt = self.env['stock.receipt.incoming'].with_company(warehouse.company_id).create({
+            'partner_id': dataset['partner_id'],
+            'warehouse_id': warehouse.id,
+            'company_id': warehouse.company_id.id,
+            'line_ids': [(0, 0, {
+                'nomenclature_id': nomenclature.id,
+                'qty': self.SERIAL_WIZARD_SIZE,
+            })],
+        })
+        prefix = uuid.uuid4().hex[:8]
+        serials = [f'{prefix}-{index}' for index in range(self.SERIAL_WIZARD_SIZE)]
+
+        def save_serials():
+            wizard = self.env['stock.receipt.serial.wizard'].with_context(
+                default_selected_line_id=receipt.line_ids.id,
+            ).create({
+                'serial_line_ids': [(0, 0, {'serial_number': serial}) for serial in serials],
+            })
+            wizard.action_save_and_close()
+        return save_serials
+
+    def _prepare_balance_report(self, dataset):
+        warehouse, __ = self._get_benchmark_records(dataset)
+        wizard = self.env['stock.balance.report.wizard'].create({
+            'report_type': 'by_warehouse',
+            'company_id': warehouse[0].company_id.id,
+        })
+
+        def open_report():
+            action = wizard.action_generate_report()
+            self.env['stock.balance'].web_read_group(
+                action['domain'], ['qty_available:sum'], action['context']['group_by'][:1], limit=80,
+            )
+        return open_report
+
+    def _prepare_batch_report(self, dataset):
+        warehouse, __ = self._get_benchmark_records(dataset)
+        wizard = self.env['stock.batch.report.wizard'].create({
+            'report_type': 'balance',
+            'company_id': warehouse[0].company_id.id,
+            'detail_level': 'batch',
+        })
+        return lambda: self.env['ir.actions.report']._render_qweb_html(
+            'stock_batch_management.balance_report_template', wizard.ids,
+        )
+
+    def _prepare_serial_report(self, dataset):
+        def open_report():
+            SerialReport = self.env['stock.serial.report']
+            SerialReport.web_search_read([], {
+                'nomenclature_name': {}, 'serial_number': {}, 'warehouse_name': {},
+                'employee_name': {}, 'batch_number': {}, 'document_reference': {},
+            }, limit=80)
+        return open_report
+
+    def _prepare_receipt_dashboard(self, dataset):
+        def open_dashboard():
+            Documents = self.env['stock.receipt.documents.line']
+            Documents.web_search_read([], {
+                'document_type': {}, 'number': {}, 'date': {}, 'warehouse_id': {'fields': {'display_name': {}}},
+                'partner_id': {'fields': {'display_name': {}}}, 'state': {},
+            }, limit=80)
+            Documents.read_group([], ['state'], ['state'])
+        return open_dashboard
@@ -0,0 +1,54 @@
+import os
+
+from odoo.tests.common import TransactionCase, tagged
+
+from odoo.addons.stock_benchmark.models.stock_benchmark_scenario import BENCHMARK_SCENARIOS
+
+
+@tagged('-standard', 'post_install', '-at_install', 'stock_benchmark')
+class TestStockBenchmark(TransactionCase):
+    """
+    Бенчмарк гарячих сценаріїв складу на локальному Postgres.
+    Не входить до стандартного набору; розмір даних задається змінними середовища:
+    BENCHMARK_NOMENCLATURES=10000 BENCHMARK_SERIALS=1000000 odoo-bin -d <db> --test-tags stock_benchmark
+    Щоб зберегти результати між запусками (порівняння з базовим), запускайте run_benchmark
+    з odoo-bin shell і комітьте транзакцію.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dataset = cls.env['stock.benchmark.generator'].generate(
+            companies=int(os.environ.get('BENCHMARK_COMPANIES', 2)),
+            warehouses_per_company=int(os.environ.get('BENCHMARK_WAREHOUSES', 2)),
+            employees_per_company=int(os.environ.get('BENCHMARK_EMPLOYEES', 2)),
+            nomenclatures=int(os.environ.get('BENCHMARK_NOMENCLATURES', 60)),
+            serials=int(os.environ.get('BENCHMARK_SERIALS', 2000)),
+        )
+
+    def test_generator_dataset(self):
+        self.assertTrue(self.dataset['nomenclature_ids'])
+        self.assertTrue(self.dataset['serial_nomenclature_ids'])
+        self.assertGreaterEqual(self.dataset['serial_count'], 2000)
+        balances = self.env['stock.balance'].search_count([
+            ('warehouse_id', 'in', self.dataset['warehouse_ids']),
+            ('qty_available', '>', 0),
+        ])
+        self.assertEqual(balances, len(self.dataset['warehouse_ids']) * (
+            len(self.dataset['nomenclature_ids']) + len(self.dataset['serial_nomenclature_ids'])
+        ))
+
+    def test_run_all_scenarios(self):
+        Run = self.env['stock.benchmark.run']
+        baseline = Run.run_benchmark(self.dataset, name='baseline', is_baseline=True)
+        self.assertEqual(baseline.result_ids.mapped('scenario'), [code for code, __ in BENCHMARK_SCENARIOS])
+        for result in baseline.result_ids:
+            self.assertGreater(result.wall_time, 0, result.scenario)
+            self.assertGreater(result.query_count, 0, result.scenario)
+
+        run = Run.run_benchmark(self.dataset, name='compare', scenarios=['balance_report'])
+        self.assertEqual(run.result_ids.scenario, 'balance_report')
+        self.assertEqual(
+            run.result_ids.baseline_query_count,
+            baseline.result_ids.filtered(lambda r: r.scenario == 'balance_report').query_count,
+        )
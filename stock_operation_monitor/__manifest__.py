@@ -0,0 +1,28 @@
+{
+    'name': 'Моніторинг складських операцій',
+    'version': '18.0.1.0.0',
+    'category': 'Inventory/Inventory',
+    'summary': 'Кількість SQL запитів та час виконання проведень і звітів',
+    'description': '''
+        Легкий шар профілювання складських операцій на робочій базі:
+        - Проведення прихідних накладних і актів оприходування, переміщення, рухи та оновлення залишків, звіти
+        - Кількість SQL запитів, час SQL, час Python та кількість записів на кожен виклик
+        - Журнал обмеженого розміру (кільцевий буфер)
+        - Повна траса SQL запитів для повільних операцій (пошук N+1)
+    ''',
+    'author': 'Петровський Юрій',
+    'depends': [
+        'custom_stock_receipt',
+        'stock_transfer',
+        'stock_batch_management',
+        'stock_balance_management',
+    ],
+    'data': [
+        'security/ir.model.access.csv',
+        'data/ir_config_parameter.xml',
+        'views/stock_operation_log_views.xml',
+    ],
+    'installable': True,
+    'application': False,
+    'license': 'LGPL-3',
+}
@@ -0,0 +1,3 @@
+from . import utils
+from . import stock_operation_log
+from . import stock_operation_hooks
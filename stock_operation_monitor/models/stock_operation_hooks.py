@@ -0,0 +1,85 @@
+# stock_operation_monitor/models/stock_operation_hooks.py
+# Вимірювання точок входу проведень, рухів залишків та звітів
+
+from odoo import models, api
+from .utils import monitor_operation
+
+
+class StockReceiptIncoming(models.Model):
+    _inherit = 'stock.receipt.incoming'
+
+    def _do_posting(self, posting_time, custom_datetime=None):
+        with monitor_operation(self, '_do_posting', record_count=len(self.line_ids)):
+            return super()._do_posting(posting_time, custom_datetime)
+
+
+class StockReceiptDisposal(models.Model):
+    _inherit = 'stock.receipt.disposal'
+
+    def _do_posting(self, posting_time, custom_datetime=None):
+        with monitor_operation(self, '_do_posting', record_count=len(self.line_ids)):
+            return super()._do_posting(posting_time, custom_datetime)
+
+
+class StockTransfer(models.Model):
+    _inherit = 'stock.transfer'
+
+    def _do_posting(self, allocations=None):
+        with monitor_operation(self, '_do_posting', record_count=len(self.line_ids)):
+            return super()._do_posting(allocations)
+
+
+class StockBalanceMovement(models.Model):
+    _inherit = 'stock.balance.movement'
+
+    @api.model
+    def create_movement(self, *args, **kwargs):
+        with monitor_operation(self, 'create_movement', record_count=1):
+            return super().create_movement(*args, **kwargs)
+
+    @api.model
+    def create_movements_bulk(self, specs):
+        with monitor_operation(self, 'create_movements_bulk', record_count=len(specs)):
+            return super().create_movements_bulk(specs)
+
+
+class StockBalance(models.Model):
+    _inherit = 'stock.balance'
+
+    @api.model
+    def update_balance(self, *args, **kwargs):
+        with monitor_operation(self, 'update_balance', record_count=1):
+            return super().update_balance(*args, **kwargs)
+
+    @api.model
+    def update_balance_bulk(self, specs):
+        with monitor_operation(self, 'update_balance_bulk', record_count=len(specs)):
+            return super().update_balance_bulk(specs)
+
+
+class StockBalanceReportWizard(models.TransientModel):
+    _inherit = 'stock.balance.report.wizard'
+
+    def action_generate_report(self):
+        with monitor_operation(self, 'action_generate_report'):
+            return super().action_generate_report()
+
+
+class StockTurnoverReportWizard(models.TransientModel):
+    _inherit = 'stock.turnover.report.wizard'
+
+    def get_turnover_data(self):
+        with monitor_operation(self, 'get_turnover_data'):
+            return super().get_turnover_data()
+
+
+class StockBatchReportWizard(models.TransientModel):
+    _inherit = 'stock.batch.report.wizard'
+
+    def get_movement_report_data(self):
+        with monitor_operation(self, 'get_movement_report_data'):
+            return super().get_movement_report_data()
+
+    def get_balance_report_data(self):
+        with monitor_operation(self, 'get_balance_report_data'):
+            return super().get_balance_report_data()
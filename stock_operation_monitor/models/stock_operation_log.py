@@ -0,0 +1,88 @@
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+from collections import Counter
+import logging
+import re
+
+_logger = logging.getLogger(__name__)
+
+# Як часто (по id запису) обрізати журнал до розміру кільцевого буфера
+LOG_TRIM_EVERY = 100
+
+
+class StockOperationLog(models.Model):
+    """
+    Журнал вимірів складських операцій (кільцевий буфер: зберігаються останні N записів).
+    Для повільних операцій зберігається траса SQL запитів.
+    """
+    _name = 'stock.operation.log'
+    _description = 'Журнал складських операцій'
+    _order = 'id desc'
+    _rec_name = 'operation'
+
+    operation = fields.Char('Операція', required=True, readonly=True, index=True)
+    model = fields.Char('Модель', readonly=True)
+    res_ids = fields.Char('ID записів', readonly=True)
+    record_count = fields.Integer('Записів', readonly=True)
+    depth = fields.Integer('Вкладеність', readonly=True, help='0 - операція верхнього рівня')
+    query_count = fields.Integer('SQL запитів', readonly=True)
+    sql_time = fields.Float('Час SQL, мс', readonly=True, digits=(16, 1))
+    python_time = fields.Float('Час Python, мс', readonly=True, digits=(16, 1))
+    total_time = fields.Float('Загальний час, мс', readonly=True, digits=(16, 1))
+    is_slow = fields.Boolean('Повільна', readonly=True, index=True)
+    query_trace = fields.Text('Траса SQL', readonly=True)
+
+    @api.model
+    @tools.ormcache()
+    def _get_monitor_settings(self):
+        """Повертає (увімкнено, поріг повільної операції в секундах, розмір журналу)"""
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        return (
+            get_param('stock_operation_monitor.enabled', '1') not in ('0', 'False', 'false', ''),
+            float(get_param('stock_operation_monitor.slow_threshold_ms', 2000)) / 1000,
+            int(get_param('stock_operation_monitor.log_size', 10000)),
+        )
+
+    @api.model
+    def _is_monitor_enabled(self):
+        return self._get_monitor_settings()[0]
+
+    @api.model
+    def _record_operation(self, records, operation, stats, total_time, record_count, depth=0):
+        """Записує вимір операції; повільні операції отримують трасу SQL запитів"""
+        __, threshold, log_size = self._get_monitor_settings()
+        is_slow = total_time >= threshold
+        log = self.sudo().create({
+            'operation': operation,
+            'model': records._name,
+            'res_ids': ','.join(map(str, records.ids[:50])),
+            'record_count': record_count,
+            'depth': depth,
+            'query_count': stats.query_count,
+            'sql_time': stats.sql_time * 1000,
+            'python_time': max(total_time - stats.sql_time, 0.0) * 1000,
+            'total_time': total_time * 1000,
+            'is_slow': is_slow,
+            'query_trace': self._format_query_trace(stats.queries) if is_slow else False,
+        })
+        if is_slow:
+            _logger.warning(
+                "Slow stock operation %s.%s: %.0f ms, %s queries",
+                records._name, operation, total_time * 1000, stats.query_count,
+            )
+        if log.id % LOG_TRIM_EVERY == 0:
+            self.env.cr.execute(SQL("DELETE FROM stock_operation_log WHERE id <= %s", log.id - log_size))
+        return log
+
+    @api.model
+    def _format_query_trace(self, queries):
+        """
+        Формує трасу SQL: спочатку запити, що повторюються (нормалізовані без параметрів) -
+        ознака N+1, далі всі запити в порядку виконання з тривалістю.
+        """
+        repeated = Counter(re.sub(r'\s+', ' ', query).strip() for query, __, __ in queries)
+        lines = ['-- Повторювані запити (кількість x запит)']
+        lines += [f'{count} x {query}' for query, count in repeated.most_common(20) if count > 1]
+        lines.append('-- Всі запити (мс | запит | параметри)')
+        lines += [f'{delay * 1000:.2f} | {query} | {params!r:.500}' for query, params, delay in queries]
+        return '\n'.join(lines)
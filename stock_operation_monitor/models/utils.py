@@ -0,0 +1,73 @@
+"""
+Загальні утиліти для модуля stock_operation_monitor
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+_logger = logging.getLogger(__name__)
+
+# Максимальна кількість запитів, які зберігаються в трасі однієї операції
+MAX_TRACE_QUERIES = 5000
+
+
+class OperationStats:
+    """Лічильники операції, які наповнює query hook курсора"""
+
+    def __init__(self, cr):
+        self.cr = cr
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.queries = []
+        self.paused = False
+
+    def hook(self, cr, query, params, start, delay):
+        if self.paused or cr is not self.cr:
+            return
+        self.query_count += 1
+        self.sql_time += delay
+        if len(self.queries) < MAX_TRACE_QUERIES:
+            self.queries.append((query, params, delay))
+
+
+@contextmanager
+def monitor_operation(records, operation, record_count=None):
+    """
+    Вимірює виклик складської операції: кількість SQL запитів, час SQL, час Python
+    та кількість записів, і записує результат у журнал stock.operation.log.
+    Запити рахуються через query_hooks потоку, які курсор Odoo викликає після кожного execute.
+    """
+    env = records.env
+    Log = env['stock.operation.log']
+    if not Log._is_monitor_enabled():
+        yield
+        return
+    thread = threading.current_thread()
+    stats = OperationStats(env.cr)
+    active = getattr(thread, 'stock_operation_stats', [])
+    previous_hooks = getattr(thread, 'query_hooks', None)
+    thread.query_hooks = (*(previous_hooks or ()), stats.hook)
+    thread.stock_operation_stats = active + [stats]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        total_time = time.perf_counter() - start
+        if previous_hooks is None:
+            del thread.query_hooks
+        else:
+            thread.query_hooks = previous_hooks
+        thread.stock_operation_stats = active
+    # Операція з помилкою відкочується разом з транзакцією - журнал пишемо лише для успішних
+    # і не враховуємо запис журналу в лічильниках зовнішніх операцій
+    for outer in active:
+        outer.paused = True
+    try:
+        Log._record_operation(
+            records, operation, stats, total_time,
+            len(records) if record_count is None else record_count, depth=len(active),
+        )
+    finally:
+        for outer in active:
+            outer.paused = False
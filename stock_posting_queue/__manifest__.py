@@ -0,0 +1,31 @@
+{
+    'name': 'Фонове проведення документів',
+    'version': '18.0.1.1.0',
+    'category': 'Inventory/Inventory',
+    'summary': 'Черга проведення великих документів частинами з прогресом та журналом помилок',
+    'description': '''
+        Фонове проведення великих складських документів:
+        - Прихідні накладні, акти оприходування та переміщення проводяться через чергу
+        - Позиції обробляються частинами, кожна частина фіксується окремою транзакцією
+        - Контрольна точка дозволяє продовжити проведення після збою або перезапуску
+        - Прогрес та журнал помилок відображаються на документі
+        - Масове проведення вибраних документів зі списку з підсумком по кожному документу
+    ''',
+    'author': 'Петровський Юрій',
+    'depends': [
+        'custom_stock_receipt',
+        'stock_transfer',
+        'stock_batch_management',
+        'stock_balance_management',
+    ],
+    'data': [
+        'security/ir.model.access.csv',
+        'data/ir_cron.xml',
+        'views/stock_posting_job_views.xml',
+        'views/stock_posting_document_views.xml',
+        'views/stock_mass_posting_views.xml',
+    ],
+    'installable': True,
+    'application': False,
+    'license': 'LGPL-3',
+}
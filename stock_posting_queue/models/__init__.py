@@ -0,0 +1,4 @@
+from . import stock_posting_job
+from . import stock_posting_documents
+from . import stock_posting_wizards
+from . import stock_mass_posting
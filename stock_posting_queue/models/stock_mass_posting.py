@@ -0,0 +1,144 @@
+# stock_posting_queue/models/stock_mass_posting.py
+# Масове проведення вибраних документів зі списку
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+from odoo.addons.stock_balance_management.models.utils import read_committed_env
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Поле майстра з документами для кожної моделі
+MASS_POSTING_FIELDS = {
+    'stock.receipt.incoming': 'receipt_ids',
+    'stock.receipt.disposal': 'disposal_ids',
+    'stock.transfer': 'transfer_ids',
+}
+
+
+class StockMassPostingWizard(models.TransientModel):
+    """
+    Масове проведення вибраних документів однією транзакцією або частинами
+    (кожна частина фіксується окремо). Результат - підсумок по кожному документу.
+    """
+    _name = 'stock.mass.posting.wizard'
+    _description = 'Масове проведення документів'
+
+    res_model = fields.Char('Модель документів', required=True, readonly=True)
+    receipt_ids = fields.Many2many('stock.receipt.incoming', string='Прихідні накладні')
+    disposal_ids = fields.Many2many('stock.receipt.disposal', string='Акти оприходування')
+    transfer_ids = fields.Many2many('stock.transfer', string='Переміщення')
+    document_count = fields.Integer('Документів', compute='_compute_document_count')
+    posting_time = fields.Selection([
+        ('start_of_day', 'Початок дня'),
+        ('end_of_day', 'Кінець дня'),
+        ('current_time', 'Поточний час'),
+    ], 'Час проведення', required=True, default='end_of_day',
+        help='Для прихідних документів: час проведення на дату кожного документа')
+    transaction_mode = fields.Selection([
+        ('single', 'Однією транзакцією'),
+        ('chunked', 'Частинами'),
+    ], 'Транзакції', required=True, default='chunked',
+        help='Частинами - кожна частина документів фіксується окремо, '
+             'помилка в частині не відкочує вже проведені частини')
+    chunk_size = fields.Integer('Документів у частині', default=50)
+    state = fields.Selection([
+        ('draft', 'Вибір'),
+        ('done', 'Результат'),
+    ], default='draft')
+    result_line_ids = fields.One2many('stock.mass.posting.result', 'wizard_id', 'Результат')
+    success_count = fields.Integer('Проведено', compute='_compute_result_counts')
+    error_count = fields.Integer('З помилкою', compute='_compute_result_counts')
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        res_model = self.env.context.get('active_model')
+        if res_model in MASS_POSTING_FIELDS and self.env.context.get('active_ids'):
+            res['res_model'] = res_model
+            res[MASS_POSTING_FIELDS[res_model]] = [(6, 0, self.env.context['active_ids'])]
+        return res
+
+    @api.depends('receipt_ids', 'disposal_ids', 'transfer_ids')
+    def _compute_document_count(self):
+        for wizard in self:
+            wizard.document_count = len(wizard._get_documents())
+
+    @api.depends('result_line_ids.is_success')
+    def _compute_result_counts(self):
+        for wizard in self:
+            wizard.success_count = len(wizard.result_line_ids.filtered('is_success'))
+            wizard.error_count = len(wizard.result_line_ids) - wizard.success_count
+
+    def _get_documents(self):
+        self.ensure_one()
+        if self.res_model not in MASS_POSTING_FIELDS:
+            return self.env['stock.transfer']
+        return self[MASS_POSTING_FIELDS[self.res_model]]
+
+    def action_post_documents(self):
+        """
+        Проводить документи частинами, кожну в окремій транзакції READ COMMITTED:
+        паралельні проведення чекають на блокування залишків замість помилки серіалізації,
+        помилка частини відкочує лише її.
+        """
+        self.ensure_one()
+        documents = self._get_documents().sorted('id')
+        if not documents:
+            raise UserError(_('Виберіть документи для проведення.'))
+        chunked = self.transaction_mode == 'chunked'
+        if chunked and self.chunk_size <= 0:
+            raise UserError(_('Кількість документів у частині має бути більшою за нуль.'))
+        chunk_size = self.chunk_size if chunked else len(documents)
+        results = {}
+        for document_ids in split_every(chunk_size, documents.ids):
+            try:
+                with read_committed_env(self.env) as env:
+                    results.update(env[documents._name].browse(document_ids)._mass_post(self.posting_time))
+            except Exception as e:
+                _logger.warning("Mass posting chunk of %s %s failed: %s", len(document_ids), documents._name, e)
+                results.update(dict.fromkeys(document_ids, str(e)))
+        documents.invalidate_recordset()
+        self.write({
+            'state': 'done',
+            'result_line_ids': [(0, 0, {
+                'res_id': document.id,
+                'document_name': document.display_name,
+                'is_success': not results.get(document.id),
+                'message': results.get(document.id) or _('Проведено'),
+            }) for document in documents],
+        })
+        _logger.info(
+            "Mass posting of %s %s: %s posted, %s failed",
+            len(documents), self.res_model, self.success_count, self.error_count,
+        )
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+
+class StockMassPostingResult(models.TransientModel):
+    """Результат масового проведення по документу"""
+    _name = 'stock.mass.posting.result'
+    _description = 'Результат масового проведення'
+    _order = 'is_success, id'
+
+    wizard_id = fields.Many2one('stock.mass.posting.wizard', required=True, ondelete='cascade')
+    res_id = fields.Integer('ID документа')
+    document_name = fields.Char('Документ')
+    is_success = fields.Boolean('Проведено')
+    message = fields.Text('Повідомлення')
+
+    def action_open_document(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self.wizard_id.res_model,
+            'res_id': self.res_id,
+            'view_mode': 'form',
+        }
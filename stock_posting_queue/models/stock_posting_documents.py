@@ -0,0 +1,366 @@
+# stock_posting_queue/models/stock_posting_documents.py
+# Фонове проведення прихідних накладних, актів оприходування та переміщень
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class StockPostingJobMixin(models.AbstractModel):
+    """
+    Спільна логіка документів з фоновим проведенням: поточне завдання черги,
+    прогрес та обмеження позицій частиною, яку обробляє завдання.
+    """
+    _name = 'stock.posting.job.mixin'
+    _description = 'Фонове проведення документа'
+
+    posting_job_id = fields.Many2one('stock.posting.job', 'Завдання проведення', compute='_compute_posting_job_id')
+    posting_job_state = fields.Selection(related='posting_job_id.state', string='Фонове проведення')
+    posting_job_progress = fields.Float(related='posting_job_id.progress', string='Прогрес проведення, %')
+    posting_job_error_log = fields.Text(related='posting_job_id.error_log', string='Журнал помилок проведення')
+
+    def _compute_posting_job_id(self):
+        jobs = self.env['stock.posting.job'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', 'in', self.ids),
+        ], order='id desc')
+        job_by_document = {}
+        for job in jobs:
+            job_by_document.setdefault(job.res_id, job)
+        for document in self:
+            document.posting_job_id = job_by_document.get(document.id, False)
+
+    def _filter_posting_job_lines(self, lines):
+        """Обмежує позиції частиною поточного кроку завдання (контекст posting_line_ids)"""
+        line_ids = self.env.context.get('posting_line_ids')
+        if line_ids is None:
+            return lines
+        line_ids = set(line_ids)
+        return lines.filtered(lambda l: l.id in line_ids)
+
+    def _check_no_posting_job(self):
+        for document in self:
+            if document.posting_job_id.state in ('pending', 'running'):
+                raise UserError(_('Документ %s проводиться у фоновому режимі.') % document.display_name)
+
+    def _check_posting_job_lock(self):
+        """
+        Забороняє змінювати документ та його позиції, поки його проводить завдання черги:
+        позиції до контрольної точки вже проведені, а нові потрапили б у наступні частини.
+        Саме завдання працює з документом в контексті posting_job_id.
+        """
+        if not self.env.context.get('posting_job_id'):
+            self._check_no_posting_job()
+
+    def write(self, vals):
+        self._check_posting_job_lock()
+        return super().write(vals)
+
+    def unlink(self):
+        self._check_posting_job_lock()
+        return super().unlink()
+
+    def _mass_post_each(self, func):
+        """
+        Виконує func для кожного документа в окремій точці збереження.
+        Повертає (документи без помилок, {id документа: текст помилки}).
+        """
+        done = self.browse()
+        errors = {}
+        for document in self:
+            try:
+                with self.env.cr.savepoint():
+                    func(document)
+                done |= document
+            except Exception as e:
+                # Відкат точки збереження не скидає кеш залишків транзакції
+                self.env['stock.balance']._invalidate_balance_snapshot()
+                _logger.warning("Mass posting %s(%s) failed: %s", document._name, document.id, e)
+                errors[document.id] = str(e)
+        return done, errors
+
+    def _mass_post(self, posting_time):
+        """
+        Проводить вибрані документи одним пакетом.
+        Повертає {id документа: текст помилки або False}.
+        """
+        raise NotImplementedError()
+
+    def _posting_job_start(self, job):
+        """Підготовка документа перед обробкою позицій"""
+        raise NotImplementedError()
+
+    def _posting_job_process_lines(self):
+        """Обробляє позиції поточної частини (_get_posting_lines з контекстом posting_line_ids)"""
+        raise NotImplementedError()
+
+    def _posting_job_finish(self, job):
+        """Завершує проведення документа після обробки всіх позицій"""
+        raise NotImplementedError()
+
+    def action_open_posting_job(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'stock.posting.job',
+            'res_id': self.posting_job_id.id,
+            'view_mode': 'form',
+        }
+
+
+class StockPostingJobLineMixin(models.AbstractModel):
+    """Позиції документа з фоновим проведенням: зміни заборонені, поки документ проводиться"""
+    _name = 'stock.posting.job.line.mixin'
+    _description = 'Позиція документа з фоновим проведенням'
+
+    # Поле позиції з документом (stock.posting.job.mixin)
+    _posting_document_field = None
+
+    def _check_posting_job_lock(self):
+        self.mapped(self._posting_document_field)._check_posting_job_lock()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._check_posting_job_lock()
+        return lines
+
+    def write(self, vals):
+        self._check_posting_job_lock()
+        result = super().write(vals)
+        if self._posting_document_field in vals:
+            self._check_posting_job_lock()
+        return result
+
+    def unlink(self):
+        self._check_posting_job_lock()
+        return super().unlink()
+
+
+class StockReceiptPostingJobMixin(models.AbstractModel):
+    """Фонове проведення прихідних документів: партії та рухи залишків частинами"""
+    _name = 'stock.receipt.posting.job.mixin'
+    _inherit = 'stock.posting.job.mixin'
+    _description = 'Фонове проведення прихідного документа'
+
+    def _posting_job_start(self, job):
+        self.ensure_one()
+        if self.state != 'draft':
+            raise UserError(_('Документ %s вже проведено.') % self.number)
+        self.write({
+            'posting_time': job.posting_time,
+            'posting_datetime': self._get_posting_datetime(job.posting_time, job.custom_datetime),
+        })
+
+    def _posting_job_process_lines(self):
+        self.ensure_one()
+        for line in self._get_posting_lines():
+            self._create_batch_for_line(line)
+        self.env['stock.balance.movement'].create_movements_bulk(self._get_balance_movement_specs())
+
+    def _posting_job_finish(self, job):
+        self.ensure_one()
+        self.state = 'posted'
+        self.message_post(
+            body=_('Документ проведено у фоновому режимі: %s - %s. Позицій: %s.') % (
+                self._get_posting_time_label(self.posting_time), self.posting_datetime, job.line_done,
+            )
+        )
+
+    def _mass_post(self, posting_time):
+        """
+        Проводить прихідні документи пакетом: номенклатура та позиції завантажуються один раз,
+        партії шукаються одним запитом, рухи залишків всіх документів створюються
+        одним create_movements_bulk (зміни залишків по однакових ключах сумуються).
+        """
+        self._get_posting_lines().nomenclature_id.mapped('base_uom_id')
+
+        def prepare(document):
+            if document.state != 'draft':
+                raise UserError(_('Документ %s вже проведено.') % document.number)
+            document._check_no_posting_job()
+            if not document._get_posting_lines():
+                raise UserError(_('Додайте хоча б одну позицію до документа!'))
+            posting_datetime = document._get_posting_datetime(posting_time)
+            document.write({
+                'state': 'posted',
+                'posting_time': posting_time,
+                'posting_datetime': posting_datetime,
+            })
+            for line in document._get_posting_lines():
+                document._create_batch_for_line(line)
+            document.message_post(
+                body=_('Документ проведено масовим проведенням: %s - %s.') % (
+                    document._get_posting_time_label(posting_time), posting_datetime,
+                )
+            )
+
+        posted, errors = self._mass_post_each(prepare)
+        if posted:
+            existing = {reference for [reference] in self.env['stock.balance.movement']._read_group([
+                ('document_reference', 'in', posted.mapped('number')),
+                ('operation_type', '=', posted._get_balance_operation_type()),
+            ], ['document_reference'])}
+            batches = posted._get_balance_batches()
+            specs = []
+            for document in posted.filtered(lambda d: d.number not in existing):
+                specs += document._get_balance_movement_specs(batches)
+            self.env['stock.balance.movement'].create_movements_bulk(specs)
+        return {**dict.fromkeys(posted.ids, False), **errors}
+
+    def action_post_async(self, posting_time, custom_datetime=None):
+        """Ставить документ в чергу фонового проведення"""
+        self.ensure_one()
+        if self.state != 'draft':
+            raise UserError(_('Проводити можна лише чернетки.'))
+        return self.env['stock.posting.job']._enqueue(self, posting_time, custom_datetime)
+
+
+class StockReceiptIncoming(models.Model):
+    _name = 'stock.receipt.incoming'
+    _inherit = ['stock.receipt.incoming', 'stock.receipt.posting.job.mixin']
+
+    def _get_posting_lines(self):
+        return self._filter_posting_job_lines(super()._get_posting_lines())
+
+    def action_post(self):
+        self._check_no_posting_job()
+        return super().action_post()
+
+
+class StockReceiptIncomingLine(models.Model):
+    _name = 'stock.receipt.incoming.line'
+    _inherit = ['stock.receipt.incoming.line', 'stock.posting.job.line.mixin']
+    _posting_document_field = 'receipt_id'
+
+
+class StockReceiptDisposal(models.Model):
+    _name = 'stock.receipt.disposal'
+    _inherit = ['stock.receipt.disposal', 'stock.receipt.posting.job.mixin']
+
+    def _get_posting_lines(self):
+        return self._filter_posting_job_lines(super()._get_posting_lines())
+
+    def action_post(self):
+        self._check_no_posting_job()
+        return super().action_post()
+
+
+class StockReceiptDisposalLine(models.Model):
+    _name = 'stock.receipt.disposal.line'
+    _inherit = ['stock.receipt.disposal.line', 'stock.posting.job.line.mixin']
+    _posting_document_field = 'disposal_id'
+
+
+class StockTransfer(models.Model):
+    """
+    Фонове проведення переміщень. Доступність перевіряється при постановці в чергу,
+    рухи партій та залишків (FIFO) створюються частинами.
+    """
+    _name = 'stock.transfer'
+    _inherit = ['stock.transfer', 'stock.posting.job.mixin']
+
+    def _get_posting_lines(self):
+        return self._filter_posting_job_lines(super()._get_posting_lines())
+
+    def _posting_job_start(self, job):
+        self.ensure_one()
+        if self.state != 'confirmed':
+            raise UserError(_('Переміщення %s не в статусі "Підтверджено".') % self.number)
+        self.posting_datetime = fields.Datetime.now()
+
+    def _posting_job_process_lines(self):
+        self.ensure_one()
+        self._create_posting_movements()
+
+    def _posting_job_finish(self, job):
+        self.ensure_one()
+        self.state = 'done'
+        self.message_post(body=_('Переміщення проведено у фоновому режимі. Позицій: %s.') % job.line_done)
+
+    def action_done(self):
+        self._check_no_posting_job()
+        return super().action_done()
+
+    def _mass_post(self, posting_time=None):
+        """
+        Проводить переміщення пакетом. FIFO-розподіл виконується одним запитом на локацію
+        відправника для всіх переміщень з неї, тому кожне наступне переміщення бачить
+        списання попередніх. Кожне переміщення проводиться тим самим _do_posting, що й
+        action_done, з готовим розподілом.
+        """
+        errors = {}
+        for transfer in self:
+            if transfer.state != 'confirmed':
+                errors[transfer.id] = _('Переміщення %s не в статусі "Підтверджено".') % transfer.number
+            elif transfer.posting_job_id.state in ('pending', 'running'):
+                errors[transfer.id] = _('Документ %s проводиться у фоновому режимі.') % transfer.display_name
+        transfers = self.filtered(lambda t: t.id not in errors)
+        transfers._get_posting_lines().nomenclature_id.mapped('base_uom_id')
+        allocations = transfers._get_mass_fifo_allocations(errors)
+
+        done, post_errors = transfers.filtered(lambda t: t.id in allocations)._mass_post_each(
+            lambda transfer: transfer._do_posting(allocations)
+        )
+        errors.update(post_errors)
+        return {**dict.fromkeys(done.ids, False), **errors}
+
+    def _get_mass_fifo_allocations(self, errors):
+        """
+        Розподіляє позиції переміщень по залишках відправника за FIFO, групуючи переміщення
+        за доменом локації відправника. Області залишків відправників та одержувачів усіх
+        переміщень блокуються одним упорядкованим проходом до розподілу. Переміщення з нестачею товару записуються в errors,
+        а розподіл повторюється без них. Повертає {id переміщення: [(позиція, розподіл)]}.
+        """
+        self.env['stock.balance']._lock_balance_scopes(self._get_balance_lock_scopes())
+        groups = {}
+        for transfer in self:
+            if transfer.transfer_type not in ['warehouse', 'warehouse_employee', 'employee', 'employee_warehouse']:
+                errors[transfer.id] = _('Невідомий тип переміщення: %s') % transfer.transfer_type
+                continue
+            domain = transfer._get_balance_source_domain()
+            groups.setdefault(repr(domain), (domain, []))[1].append(transfer)
+        allocations = {}
+        for domain, transfers in groups.values():
+            while transfers:
+                owners = [
+                    (transfer, line)
+                    for transfer in transfers
+                    for line in transfer._get_posting_lines().filtered(lambda l: l.qty > 0)
+                ]
+                result = self.env['stock.balance']._allocate_fifo(
+                    domain, [(line.nomenclature_id.id, line.qty) for __, line in owners], lock=True,
+                )
+                group_allocations = {transfer.id: [] for transfer in transfers}
+                shortages = {}
+                for (transfer, line), allocation in zip(owners, result):
+                    group_allocations[transfer.id].append((line, allocation))
+                    available_qty = sum(qty for __, qty in allocation)
+                    if available_qty < line.qty and transfer.id not in shortages:
+                        shortages[transfer.id] = _('Недостатньо товару "%s". Доступно: %s, потрібно: %s') % (
+                            line.nomenclature_id.name, available_qty, line.qty,
+                        )
+                if not shortages:
+                    allocations.update(group_allocations)
+                    break
+                errors.update(shortages)
+                transfers = [transfer for transfer in transfers if transfer.id not in shortages]
+        return allocations
+
+    def action_done_async(self):
+        """Перевіряє доступність товарів та ставить переміщення в чергу фонового проведення"""
+        for transfer in self:
+            if transfer.state != 'confirmed':
+                raise UserError(_('Проводити можна лише підтверджені переміщення.'))
+            for line in transfer._get_posting_lines():
+                transfer._check_line_availability(line)
+            self.env['stock.posting.job']._enqueue(transfer)
+        return True
+
+
+class StockTransferLine(models.Model):
+    _name = 'stock.transfer.line'
+    _inherit = ['stock.transfer.line', 'stock.posting.job.line.mixin']
+    _posting_document_field = 'transfer_id'
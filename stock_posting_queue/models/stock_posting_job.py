@@ -0,0 +1,151 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+from odoo.addons.stock_balance_management.models.utils import read_committed_env
+import logging
+import traceback
+
+_logger = logging.getLogger(__name__)
+
+# Кількість невдалих спроб, після якої завдання позначається помилковим
+MAX_ATTEMPTS = 3
+
+
+class StockPostingJob(models.Model):
+    """
+    Завдання фонового проведення документа.
+    Позиції обробляються частинами в порядку id; після кожної частини транзакція
+    фіксується разом з контрольною точкою, тому перерване завдання продовжується з неї.
+    """
+    _name = 'stock.posting.job'
+    _description = 'Завдання фонового проведення'
+    _order = 'id desc'
+    _rec_name = 'document_name'
+
+    res_model = fields.Char('Модель документа', required=True, readonly=True, index=True)
+    res_id = fields.Integer('ID документа', required=True, readonly=True, index=True)
+    document_name = fields.Char('Документ', readonly=True)
+    posting_time = fields.Char('Час проведення', readonly=True)
+    custom_datetime = fields.Datetime('Власний час', readonly=True)
+    state = fields.Selection([
+        ('pending', 'В черзі'),
+        ('running', 'Виконується'),
+        ('done', 'Виконано'),
+        ('failed', 'Помилка'),
+    ], 'Статус', default='pending', required=True, readonly=True, index=True)
+    line_total = fields.Integer('Всього позицій', readonly=True)
+    line_done = fields.Integer('Оброблено позицій', readonly=True)
+    checkpoint_line_id = fields.Integer(
+        'Контрольна точка', readonly=True,
+        help='ID останньої обробленої позиції; наступна частина починається після неї'
+    )
+    progress = fields.Float('Прогрес, %', compute='_compute_progress')
+    attempt_count = fields.Integer('Спроб', readonly=True)
+    error_log = fields.Text('Журнал помилок', readonly=True)
+    user_id = fields.Many2one('res.users', 'Користувач', readonly=True, default=lambda self: self.env.user)
+    company_id = fields.Many2one('res.company', 'Компанія', readonly=True, default=lambda self: self.env.company)
+    date_started = fields.Datetime('Початок', readonly=True)
+    date_done = fields.Datetime('Завершення', readonly=True)
+
+    @api.depends('line_total', 'line_done')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = job.line_done / job.line_total * 100 if job.line_total else 0.0
+
+    @api.model
+    def _enqueue(self, document, posting_time=None, custom_datetime=None):
+        """Ставить документ в чергу проведення та запускає обробник"""
+        document.ensure_one()
+        if document.posting_job_id.state in ('pending', 'running'):
+            raise UserError(_('Документ %s вже в черзі проведення.') % document.display_name)
+        job = self.create({
+            'res_model': document._name,
+            'res_id': document.id,
+            'document_name': document.display_name,
+            'posting_time': posting_time,
+            'custom_datetime': custom_datetime,
+            'line_total': len(document._get_posting_lines()),
+            'company_id': document.company_id.id,
+        })
+        self.env.ref('stock_posting_queue.ir_cron_stock_posting_job')._trigger()
+        return job
+
+    def _get_document(self):
+        self.ensure_one()
+        return self.env[self.res_model].with_user(self.user_id).with_company(self.company_id).with_context(
+            posting_job_id=self.id,
+        ).browse(self.res_id)
+
+    @api.model
+    def _get_chunk_size(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param('stock_posting_queue.chunk_size', 100))
+
+    @api.model
+    def _cron_process_jobs(self):
+        """
+        Обробляє завдання черги по черзі, кожне на окремому курсорі READ COMMITTED:
+        паралельні проведення чекають на блокування залишків замість помилки серіалізації.
+        Помилка одного завдання не зупиняє інші.
+        """
+        chunk_size = self._get_chunk_size()
+        for job_id in self.search([('state', 'in', ('pending', 'running'))], order='id').ids:
+            try:
+                with read_committed_env(self.env) as env:
+                    env[self._name].browse(job_id)._process(chunk_size)
+            except Exception:
+                error = traceback.format_exc()
+                with read_committed_env(self.env) as env:
+                    env[self._name].browse(job_id)._register_failure(error)
+
+    def _process(self, chunk_size):
+        """
+        Проводить документ: підготовка, позиції частинами після контрольної точки, завершення.
+        Кожен крок фіксується окремою транзакцією.
+        """
+        self.ensure_one()
+        document = self._get_document()
+        if self.state == 'pending':
+            document._posting_job_start(self)
+            self.write({'state': 'running', 'date_started': fields.Datetime.now()})
+            self.env.cr.commit()
+        lines = document._get_posting_lines().filtered(lambda l: l.id > self.checkpoint_line_id)
+        for line_ids in split_every(chunk_size, sorted(lines.ids)):
+            document.with_context(posting_line_ids=line_ids)._posting_job_process_lines()
+            self.write({
+                'checkpoint_line_id': line_ids[-1],
+                'line_done': self.line_done + len(line_ids),
+            })
+            self.env.cr.commit()
+        document._posting_job_finish(self)
+        self.write({'state': 'done', 'date_done': fields.Datetime.now()})
+        self.env.cr.commit()
+        _logger.info("Posting job %s: %s posted, %s lines", self.id, self.document_name, self.line_done)
+
+    def _register_failure(self, error):
+        """Записує помилку в журнал; після MAX_ATTEMPTS спроб завдання зупиняється"""
+        self.ensure_one()
+        attempt_count = self.attempt_count + 1
+        _logger.error("Posting job %s (%s) failed, attempt %s:\n%s", self.id, self.document_name, attempt_count, error)
+        self.write({
+            'attempt_count': attempt_count,
+            'state': 'failed' if attempt_count >= MAX_ATTEMPTS else self.state,
+            'error_log': f"{self.error_log or ''}[{fields.Datetime.now()}] Спроба {attempt_count}\n{error}\n",
+        })
+
+    def action_retry(self):
+        """Повертає помилкові завдання в чергу; обробка продовжується з контрольної точки"""
+        for job in self.filtered(lambda j: j.state == 'failed'):
+            job.write({
+                'state': 'running' if job.date_started else 'pending',
+                'attempt_count': 0,
+            })
+        self.env.ref('stock_posting_queue.ir_cron_stock_posting_job')._trigger()
+
+    def action_open_document(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self.res_model,
+            'res_id': self.res_id,
+            'view_mode': 'form',
+        }
@@ -0,0 +1,65 @@
+# stock_posting_queue/models/stock_posting_wizards.py
+# Вибір фонового проведення у майстрах проведення прихідних документів
+
+from odoo import models, fields, api
+
+
+class StockPostingWizardMixin(models.AbstractModel):
+    """Спільна логіка вибору фонового проведення для майстрів проведення"""
+    _name = 'stock.posting.wizard.mixin'
+    _description = 'Фонове проведення в майстрі'
+
+    run_in_background = fields.Boolean(
+        'Провести у фоновому режимі',
+        help='Позиції обробляються частинами у фоні; прогрес відображається на документі'
+    )
+
+    @api.model
+    def _get_default_run_in_background(self, document):
+        """Пропонує фонове проведення для документів з великою кількістю позицій"""
+        threshold = int(self.env['ir.config_parameter'].sudo().get_param(
+            'stock_posting_queue.async_line_threshold', 300
+        ))
+        return len(document._get_posting_lines()) >= threshold
+
+    def _post_in_background(self, document):
+        document.action_post_async(self.posting_time, self._get_custom_datetime())
+        return {'type': 'ir.actions.act_window_close'}
+
+
+class StockReceiptPostingWizard(models.TransientModel):
+    _name = 'stock.receipt.posting.wizard'
+    _inherit = ['stock.receipt.posting.wizard', 'stock.posting.wizard.mixin']
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if res.get('receipt_id'):
+            document = self.env['stock.receipt.incoming'].browse(res['receipt_id'])
+            res['run_in_background'] = self._get_default_run_in_background(document)
+        return res
+
+    def action_confirm_posting(self):
+        self.ensure_one()
+        if self.run_in_background:
+            return self._post_in_background(self.receipt_id)
+        return super().action_confirm_posting()
+
+
+class StockDisposalPostingWizard(models.TransientModel):
+    _name = 'stock.disposal.posting.wizard'
+    _inherit = ['stock.disposal.posting.wizard', 'stock.posting.wizard.mixin']
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if res.get('disposal_id'):
+            document = self.env['stock.receipt.disposal'].browse(res['disposal_id'])
+            res['run_in_background'] = self._get_default_run_in_background(document)
+        return res
+
+    def action_confirm_posting(self):
+        self.ensure_one()
+        if self.run_in_background:
+            return self._post_in_background(self.disposal_id)
+        return super().action_confirm_posting()
@@ -0,0 +1,2 @@
+from . import test_parallel_posting
+from . import test_posting_job_lock
@@ -0,0 +1,104 @@
+import threading
+
+from odoo import api, SUPERUSER_ID
+from odoo.modules.registry import Registry
+from odoo.tests.common import BaseCase, get_db_name, tagged
+
+
+@tagged('-standard', 'post_install', '-at_install', 'stock_posting_stress')
+class TestParallelMassPosting(BaseCase):
+    """
+    Стрес-тест паралельного проведення документів: N потоків одночасно проводять
+    масовим проведенням переміщення зі складу, що списують ті самі залишки за FIFO.
+    Тест комітить документи в базу, тому запускається лише на тестовій базі:
+    odoo-bin -d <db> --test-tags stock_posting_stress
+    """
+
+    WORKERS = 6
+    QTY = 1.0
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.registry = Registry(get_db_name())
+
+    def _env(self, cr):
+        return api.Environment(cr, SUPERUSER_ID, {})
+
+    def _prepare(self, env):
+        """Створює та проводить прихідну накладну на склад, повертає параметри переміщень"""
+        warehouse = env['stock.warehouse'].search([], limit=1)
+        employee = env['hr.employee'].search([('company_id', 'in', [warehouse.company_id.id, False])], limit=1)
+        partner = env['res.partner'].search([], limit=1)
+        nomenclatures = env['product.nomenclature'].search([('tracking_serial', '=', False)], limit=2)
+        if not warehouse or not employee or not partner or len(nomenclatures) < 2:
+            self.skipTest('Потрібні склад, працівник, контрагент та дві номенклатури без серійного обліку')
+        receipt = env['stock.receipt.incoming'].create({
+            'partner_id': partner.id,
+            'warehouse_id': warehouse.id,
+            'company_id': warehouse.company_id.id,
+            'line_ids': [(0, 0, {
+                'nomenclature_id': nomenclature.id,
+                'qty': self.WORKERS * self.QTY,
+                'price_unit_no_vat': 1.0,
+            }) for nomenclature in nomenclatures],
+        })
+        errors = receipt._mass_post('current_time')
+        self.assertFalse(errors[receipt.id], errors[receipt.id])
+        return warehouse, employee, nomenclatures
+
+    def _get_qty(self, warehouse_id, nomenclature_ids):
+        with self.registry.cursor() as cr:
+            env = self._env(cr)
+            return [sum(env['stock.balance'].search([
+                ('nomenclature_id', '=', nomenclature_id),
+                ('location_type', '=', 'warehouse'),
+                ('warehouse_id', '=', warehouse_id),
+            ]).mapped('qty_on_hand')) for nomenclature_id in nomenclature_ids]
+
+    def test_parallel_mass_posting(self):
+        with self.registry.cursor() as cr:
+            env = self._env(cr)
+            warehouse, employee, nomenclatures = self._prepare(env)
+            transfers = env['stock.transfer'].create([{
+                'transfer_type': 'warehouse_employee',
+                'company_id': warehouse.company_id.id,
+                'warehouse_from_id': warehouse.id,
+                'employee_to_id': employee.id,
+                'state': 'confirmed',
+                'line_ids': [(0, 0, {
+                    'nomenclature_id': nomenclature.id,
+                    'selected_uom_id': nomenclature.base_uom_id.id,
+                    'qty': self.QTY,
+                }) for nomenclature in nomenclatures],
+            } for _worker in range(self.WORKERS)])
+            transfer_ids = transfers.ids
+            warehouse_id, nomenclature_ids = warehouse.id, nomenclatures.ids
+        initial = self._get_qty(warehouse_id, nomenclature_ids)
+        errors = []
+        barrier = threading.Barrier(self.WORKERS)
+
+        def worker(transfer_id):
+            try:
+                with self.registry.cursor() as cr:
+                    env = self._env(cr)
+                    wizard = env['stock.mass.posting.wizard'].with_context(
+                        active_model='stock.transfer', active_ids=[transfer_id],
+                    ).create({'transaction_mode': 'single'})
+                    barrier.wait()
+                    wizard.action_post_documents()
+                    errors.extend(wizard.result_line_ids.filtered(lambda r: not r.is_success).mapped('message'))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(transfer_id,)) for transfer_id in transfer_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(errors, 'Паралельне проведення завершилось з помилками: %s' % errors)
+        expected = [qty - self.WORKERS * self.QTY for qty in initial]
+        self.assertEqual(self._get_qty(warehouse_id, nomenclature_ids), expected)
+        with self.registry.cursor() as cr:
+            states = self._env(cr)['stock.transfer'].browse(transfer_ids).mapped('state')
+        self.assertEqual(states, ['done'] * self.WORKERS)
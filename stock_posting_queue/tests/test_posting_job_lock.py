@@ -0,0 +1,62 @@
+from odoo.exceptions import UserError
+from odoo.tests.common import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install', 'stock_posting_job_lock')
+class TestPostingJobLock(TransactionCase):
+    """Документ у черзі фонового проведення та його позиції не змінюються до завершення завдання"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        category = cls.env['product.nomenclature.category'].create({'name': 'Posting Job Lock'})
+        cls.nomenclature = cls.env['product.nomenclature'].create({
+            'name': 'Posting Job Lock',
+            'category_id': category.id,
+            'base_uom_id': cls.env.ref('uom.product_uom_unit').id,
+        })
+        warehouse = cls.env['stock.warehouse'].create({'name': 'Posting Job Lock', 'code': 'PJLK'})
+        employee = cls.env['hr.employee'].create({'name': 'Posting Job Lock', 'company_id': warehouse.company_id.id})
+        cls.transfer = cls.env['stock.transfer'].create({
+            'transfer_type': 'warehouse_employee',
+            'company_id': warehouse.company_id.id,
+            'warehouse_from_id': warehouse.id,
+            'employee_to_id': employee.id,
+            'state': 'confirmed',
+            'line_ids': [(0, 0, {
+                'nomenclature_id': cls.nomenclature.id,
+                'selected_uom_id': cls.nomenclature.base_uom_id.id,
+                'qty': 1.0,
+            })],
+        })
+        cls.job = cls.env['stock.posting.job']._enqueue(cls.transfer)
+        cls.transfer.invalidate_recordset(['posting_job_id'])
+
+    def test_document_locked_while_job_pending(self):
+        line = self.transfer.line_ids
+        with self.assertRaises(UserError):
+            line.write({'qty': 2.0})
+        with self.assertRaises(UserError):
+            self.env['stock.transfer.line'].create({
+                'transfer_id': self.transfer.id,
+                'nomenclature_id': self.nomenclature.id,
+                'selected_uom_id': self.nomenclature.base_uom_id.id,
+                'qty': 1.0,
+            })
+        with self.assertRaises(UserError):
+            line.unlink()
+        with self.assertRaises(UserError):
+            self.transfer.write({'state': 'draft'})
+        with self.assertRaises(UserError):
+            self.transfer.unlink()
+
+    def test_job_writes_document(self):
+        document = self.job._get_document()
+        document._posting_job_start(self.job)
+        self.assertTrue(document.posting_datetime)
+
+    def test_document_unlocked_after_job(self):
+        self.job.write({'state': 'done'})
+        self.transfer.invalidate_recordset(['posting_job_id'])
+        self.transfer.line_ids.write({'qty': 2.0})
+        self.assertEqual(self.transfer.line_ids.qty, 2.0)
@@ -5,7 +5,7 @@
     'description': 'Довідник для управління районами з кодом та найменуванням у налаштуваннях складу.',
     'category': 'Inventory',
     'author': 'Петровський Юрій',
-    'depends': ['stock'],
+    'depends': ['stock', 'company_hierarchy'],
     'data': [
         'security/ir.model.access.csv',
         'views/region_views.xml',
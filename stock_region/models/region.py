@@ -21,19 +21,13 @@ class StockRegion(models.Model):
     @api.model
     def _get_default_company(self):
         """Повертає головну компанію для поточної компанії користувача"""
-        company = self.env.company
-        # Якщо поточна компанія є дочірньою, шукаємо головну
-        while company.parent_id:
-            company = company.parent_id
-        return company
+        return self.env.company._get_root_company()
     
     @api.model
     def search(self, args, offset=0, limit=None, order=None, count=False):
         """Переписуємо метод search для фільтрації за поточною компанією"""
         # Отримуємо головну компанію для поточної компанії
-        current_company = self.env.company
-        while current_company.parent_id:
-            current_company = current_company.parent_id
+        current_company = self.env.company._get_root_company()
         
         # Додаємо фільтр за компанією, якщо його ще немає
         if self._context.get('force_company_filter', True):
@@ -14,7 +14,8 @@
         'base', 
         'stock', 
         'hr', 
-        'mail'
+        'mail',
+        'company_hierarchy'
     ],
     'data': [
         'security/ir.model.access.csv',
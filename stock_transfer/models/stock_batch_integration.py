@@ -10,96 +10,91 @@ class StockTransfer(models.Model):
     """Розширення для інтеграції з партіями"""
     _inherit = 'stock.transfer'
 
-    def action_done(self):
+    def _do_posting(self, allocations=None):
         """Додаємо створення рухів партій"""
         # Спочатку стандартна логіка
-        result = super().action_done()
+        result = super()._do_posting(allocations)
         
         # Потім створюємо рухи партій якщо модуль встановлений
-        if 'stock.batch.movement' in self.env:
-            for line in self.line_ids:
-                self._create_batch_movements_for_line(line)
+        if 'stock.batch.movement' in self.env and 'stock.balance' in self.env:
+            for transfer in self:
+                transfer._create_posting_movements((allocations or {}).get(transfer.id))
         
         return result
 
-    def _create_batch_movements_for_line(self, line):
-        """Створює рухи партій для позиції переміщення"""
-        if line.qty <= 0:
-            return
-        
-        BatchMovement = self.env['stock.batch.movement']
-        company_ids = self._get_child_companies(self.company_id)
-        
-        # Знаходимо партії які беруть участь в переміщенні (FIFO)
-        if self.transfer_type in ['warehouse', 'warehouse_employee']:
-            source_location_type = 'warehouse'
-            source_id = self.warehouse_from_id.id
-        elif self.transfer_type in ['employee', 'employee_warehouse']:
-            source_location_type = 'employee'
-            source_id = self.employee_from_id.id
-        else:
-            return
-        
-        # Шукаємо залишки з партіями за FIFO
-        domain = [
-            ('nomenclature_id', '=', line.nomenclature_id.id),
-            ('location_type', '=', source_location_type),
-            ('company_id', 'in', company_ids),
-            ('qty_available', '>', 0),
-            ('batch_id', '!=', False)  # Тільки з партіями
-        ]
-        
-        if source_location_type == 'warehouse':
-            domain.append(('warehouse_id', '=', source_id))
-        else:
-            domain.append(('employee_id', '=', source_id))
-        
-        balances = self.env['stock.balance'].search(domain, order='batch_id ASC, id ASC')
-        
-        remaining_qty = line.qty
-        for balance in balances:
-            if remaining_qty <= 0:
-                break
-            
-            if not balance.batch_id:
-                continue
-                
-            take_qty = min(balance.qty_available, remaining_qty)
-            
-            # Створюємо рух партії (списання)
-            BatchMovement.create({
-                'batch_id': balance.batch_id.id,
-                'movement_type': 'transfer_out',
-                'operation_type': 'transfer',
-                'qty': take_qty,
-                'uom_id': line.selected_uom_id.id,
-                'location_from_id': self._get_location_from_balance(balance),
-                'location_to_id': self._get_location_to_transfer(),
-                'document_reference': self.number,
-                'notes': self._get_transfer_notes(),
-                'date': self.posting_datetime or fields.Datetime.now(),
-                'user_id': self.env.user.id,
-                'company_id': balance.company_id.id,
-            })
-            
-            # Якщо є пункт призначення - створюємо рух надходження
-            if self._should_create_destination_movement():
-                BatchMovement.create({
+    def _create_posting_movements(self, allocations=None):
+        """
+        Створює рухи проведення переміщення за одним FIFO-розподілом на документ
+        (за замовчуванням - _get_fifo_allocations). Повертає використаний розподіл.
+        """
+        self.ensure_one()
+        if allocations is None:
+            allocations = self._get_fifo_allocations()
+        self._create_batch_movements(allocations)
+        return allocations
+
+    def _get_fifo_allocations(self):
+        """
+        Повертає FIFO-розподіл позицій по залишках відправника: [(позиція, ((залишок, кількість), ...))].
+        Розподіл обчислюється одним запитом на документ і спільний для рухів партій та залишків.
+        """
+        self.ensure_one()
+        lines = self._get_posting_lines().filtered(lambda l: l.qty > 0)
+        if not lines or self.transfer_type not in ['warehouse', 'warehouse_employee', 'employee', 'employee_warehouse']:
+            return []
+        allocations = self.env['stock.balance']._allocate_fifo(
+            self._get_balance_source_domain(),
+            [(line.nomenclature_id.id, line.qty) for line in lines],
+            lock=True,
+        )
+        return list(zip(lines, allocations))
+
+    def _create_batch_movements(self, allocations=None):
+        """Створює рухи партій для всіх позицій переміщення одним пакетом"""
+        self.ensure_one()
+        return self.env['stock.batch.movement'].create(self._get_batch_movement_vals_list(allocations))
+
+    def _get_batch_movement_vals_list(self, allocations=None):
+        """
+        Формує значення рухів партій за FIFO-розподілом позицій
+        (за замовчуванням - розподіл _get_fifo_allocations).
+        """
+        self.ensure_one()
+        if allocations is None:
+            allocations = self._get_fifo_allocations()
+        location_to_id = self._get_location_to_transfer()
+        notes = self._get_transfer_notes()
+        date = self.posting_datetime or fields.Datetime.now()
+        create_destination = self._should_create_destination_movement()
+        vals_list = []
+        for line, allocation in allocations:
+            for balance, take_qty in allocation:
+                # Рухи партій створюються тільки для залишків з партіями
+                if not balance.batch_id:
+                    continue
+                vals = {
                     'batch_id': balance.batch_id.id,
-                    'movement_type': 'transfer_in',
+                    'movement_type': 'transfer_out',
                     'operation_type': 'transfer',
                     'qty': take_qty,
                     'uom_id': line.selected_uom_id.id,
                     'location_from_id': self._get_location_from_balance(balance),
-                    'location_to_id': self._get_location_to_transfer(),
+                    'location_to_id': location_to_id,
                     'document_reference': self.number,
-                    'notes': self._get_transfer_notes(),
-                    'date': self.posting_datetime or fields.Datetime.now(),
+                    'notes': notes,
+                    'date': date,
                     'user_id': self.env.user.id,
-                    'company_id': self.company_id.id,  # Компанія одержувача
-                })
-            
-            remaining_qty -= take_qty
+                    'company_id': balance.company_id.id,
+                }
+                vals_list.append(vals)
+                # Якщо є пункт призначення - створюємо рух надходження
+                if create_destination:
+                    vals_list.append(dict(
+                        vals,
+                        movement_type='transfer_in',
+                        company_id=self.company_id.id,  # Компанія одержувача
+                    ))
+        return vals_list
 
     def _get_location_from_balance(self, balance):
         """Повертає ID локації з залишку"""
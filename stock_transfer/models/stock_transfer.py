@@ -90,8 +90,19 @@ class StockTransfer(models.Model):
         self.state = 'confirmed'
         
     def action_done(self):
-        self.state = 'done'
-        self.posting_datetime = fields.Datetime.now()
+        return self._do_posting()
+
+    def _do_posting(self, allocations=None):
+        """
+        Проводить переміщення. Спільний метод ручного (action_done) та масового проведення;
+        allocations - готові FIFO-розподіли {id переміщення: [(позиція, розподіл)]}.
+        """
+        self.write({'state': 'done', 'posting_datetime': fields.Datetime.now()})
+        return True
+
+    def _get_posting_lines(self):
+        """Повертає позиції, які обробляє проведення переміщення"""
+        return self.line_ids
         
     def action_cancel(self):
         self.state = 'cancelled'
@@ -167,18 +178,21 @@ class StockTransfer(models.Model):
     
     def _get_child_companies(self, company):
         """Повертає список ID головної компанії та всіх її дочірніх компаній"""
-        company_ids = [company.id]
-        
-        # Рекурсивно додаємо всі дочірні компанії
-        def add_children(parent_company):
-            children = self.env['res.company'].search([('parent_id', '=', parent_company.id)])
-            for child in children:
-                if child.id not in company_ids:
-                    company_ids.append(child.id)
-                    add_children(child)  # Рекурсивно додаємо дочірні дочірніх
-        
-        add_children(company)
-        return company_ids
+        return company._get_child_company_ids()
+
+    def _get_balance_source_domain(self):
+        """Повертає домен залишків локації відправника"""
+        self.ensure_one()
+        company_ids = self._get_child_companies(self.company_id)
+        domain = [
+            ('company_id', 'in', company_ids),
+            ('qty_available', '>', 0),
+        ]
+        if self.transfer_type in ['warehouse', 'warehouse_employee']:
+            domain += [('location_type', '=', 'warehouse'), ('warehouse_id', '=', self.warehouse_from_id.id)]
+        else:
+            domain += [('location_type', '=', 'employee'), ('employee_id', '=', self.employee_from_id.id)]
+        return domain
     
     @api.depends('nomenclature_id', 'transfer_id.transfer_type', 'transfer_id.warehouse_from_id', 'transfer_id.employee_from_id')
     def _compute_available_qty_basic(self):
@@ -279,11 +293,8 @@ class StockTransfer(models.Model):
             _logger.info(f"Line ID: {test_line.id}")
             _logger.info(f"Nomenclature: {test_line.nomenclature_id.name} (ID: {test_line.nomenclature_id.id})")
             
-            # Викликаємо compute
-            test_line._compute_available_nomenclature_ids()
-            
             _logger.info(f"=== РЕЗУЛЬТАТ COMPUTE ===")
-            _logger.info(f"Available nomenclature IDs: {test_line.available_nomenclature_ids.ids}")
+            _logger.info(f"Available qty: {test_line.available_qty}")
             
             # Видаляємо тестову позицію
             test_line.unlink()
@@ -359,13 +370,6 @@ class StockTransferLine(models.Model):
         required=True
     )
     
-    # Поле для домену доступних товарів
-    available_nomenclature_ids = fields.Many2many(
-        'product.nomenclature',
-        compute='_compute_available_nomenclature_ids',
-        string='Доступні товари'
-    )
-    
     # Поле для показу доступної кількості
     available_qty = fields.Float(
         'Доступна кількість',
@@ -385,109 +389,9 @@ class StockTransferLine(models.Model):
         default=1.0
     )
 
-    @api.depends('transfer_id.transfer_type', 'transfer_id.warehouse_from_id', 'transfer_id.employee_from_id')
-    def _compute_available_nomenclature_ids(self):
-        """Обчислює доступні товари залежно від відправника"""
-        for line in self:
-            _logger.info("=== ПОЧАТОК ОБЧИСЛЕННЯ ДОСТУПНИХ ТОВАРІВ ===")
-            
-            # Якщо немає переміщення
-            if not line.transfer_id:
-                _logger.info("Немає переміщення - показуємо всі товари")
-                all_products = self.env['product.nomenclature'].search([])
-                line.available_nomenclature_ids = [(6, 0, all_products.ids)]
-                continue
-            
-            transfer = line.transfer_id
-            _logger.info(f"Тип переміщення: {transfer.transfer_type}")
-            _logger.info(f"Склад відправник: {transfer.warehouse_from_id.name if transfer.warehouse_from_id else 'Не вибрано'}")
-            _logger.info(f"Працівник відправник: {transfer.employee_from_id.name if transfer.employee_from_id else 'Не вибрано'}")
-            _logger.info(f"Головна компанія: {transfer.company_id.name} (ID: {transfer.company_id.id})")
-            
-            # Отримуємо всі дочірні компанії + головну
-            company_ids = self._get_child_companies(transfer.company_id)
-            _logger.info(f"Компанії для пошуку (головна + дочірні): {company_ids}")
-            
-            # Перевіряємо наявність модуля stock.balance
-            if 'stock.balance' not in self.env:
-                _logger.info("Модуль stock.balance відсутній - показуємо всі товари")
-                all_products = self.env['product.nomenclature'].search([])
-                line.available_nomenclature_ids = [(6, 0, all_products.ids)]
-                continue
-            
-            try:
-                Balance = self.env['stock.balance']
-                _logger.info("Модуль stock.balance знайдено")
-                
-                # Формуємо домен для пошуку залишків
-                domain = [
-                    ('qty_available', '>', 0),
-                    ('company_id', 'in', company_ids)  # Шукаємо в головній + дочірніх компаніях
-                ]
-                _logger.info(f"Базовий домен: {domain}")
-                
-                # Додаємо умови залежно від типу переміщення
-                if transfer.transfer_type in ['warehouse', 'warehouse_employee'] and transfer.warehouse_from_id:
-                    domain.extend([
-                        ('location_type', '=', 'warehouse'),
-                        ('warehouse_id', '=', transfer.warehouse_from_id.id)
-                    ])
-                    _logger.info(f"Фінальний домен для складу: {domain}")
-                    
-                elif transfer.transfer_type in ['employee', 'employee_warehouse'] and transfer.employee_from_id:
-                    domain.extend([
-                        ('location_type', '=', 'employee'),
-                        ('employee_id', '=', transfer.employee_from_id.id)
-                    ])
-                    _logger.info(f"Фінальний домен для працівника: {domain}")
-                    
-                else:
-                    _logger.info("Не вибрано відправника - показуємо всі товари")
-                    all_products = self.env['product.nomenclature'].search([])
-                    line.available_nomenclature_ids = [(6, 0, all_products.ids)]
-                    continue
-                
-                # Шукаємо залишки
-                balances = Balance.search(domain)
-                _logger.info(f"Знайдено залишків: {len(balances)}")
-                
-                # Логуємо всі знайдені залишки
-                for balance in balances:
-                    _logger.info(f"  - {balance.nomenclature_id.name}: {balance.qty_available} шт. "
-                               f"(склад: {balance.warehouse_id.name if balance.warehouse_id else 'N/A'}, "
-                               f"працівник: {balance.employee_id.name if balance.employee_id else 'N/A'}, "
-                               f"компанія: {balance.company_id.name} ID:{balance.company_id.id})")
-                
-                if balances:
-                    nomenclature_ids = balances.mapped('nomenclature_id.id')
-                    _logger.info(f"ID доступних товарів: {nomenclature_ids}")
-                    line.available_nomenclature_ids = [(6, 0, nomenclature_ids)]
-                else:
-                    _logger.info("Немає доступних товарів - порожній список")
-                    line.available_nomenclature_ids = [(6, 0, [])]
-                    
-            except Exception as e:
-                _logger.error(f"Помилка при обчисленні доступних товарів: {e}")
-                # При помилці показуємо всі товари
-                all_products = self.env['product.nomenclature'].search([])
-                line.available_nomenclature_ids = [(6, 0, all_products.ids)]
-            
-            _logger.info("=== КІНЕЦЬ ОБЧИСЛЕННЯ ДОСТУПНИХ ТОВАРІВ ===")
-    
     def _get_child_companies(self, company):
         """Повертає список ID головної компанії та всіх її дочірніх компаній"""
-        company_ids = [company.id]
-        
-        # Рекурсивно додаємо всі дочірні компанії
-        def add_children(parent_company):
-            children = self.env['res.company'].search([('parent_id', '=', parent_company.id)])
-            for child in children:
-                if child.id not in company_ids:
-                    company_ids.append(child.id)
-                    add_children(child)  # Рекурсивно додаємо дочірні дочірніх
-        
-        add_children(company)
-        return company_ids
+        return company._get_child_company_ids()
 
     @api.depends('qty', 'price_unit_no_vat', 'vat_rate')
     def _compute_amounts(self):
@@ -503,38 +407,16 @@ class StockTransferLine(models.Model):
             if hasattr(self.nomenclature_id, 'base_uom_id'):
                 self.selected_uom_id = self.nomenclature_id.base_uom_id
             
-            # Показуємо інформацію про доступну кількість
+            # Показуємо інформацію про доступну кількість (з кешованого знімка залишків)
             if self.transfer_id and 'stock.balance' in self.env:
-                Balance = self.env['stock.balance']
                 transfer = self.transfer_id
-                company_ids = transfer._get_child_companies(transfer.company_id)
-                
                 if transfer.transfer_type in ['warehouse', 'warehouse_employee'] and transfer.warehouse_from_id:
-                    domain = [
-                        ('nomenclature_id', '=', self.nomenclature_id.id),
-                        ('location_type', '=', 'warehouse'),
-                        ('warehouse_id', '=', transfer.warehouse_from_id.id),
-                        ('company_id', 'in', company_ids),
-                        ('qty_available', '>', 0)
-                    ]
-                    balances = Balance.search(domain)
-                    available_qty = sum(balance.qty_available for balance in balances)
                     location_name = transfer.warehouse_from_id.name
-                    
                 elif transfer.transfer_type in ['employee', 'employee_warehouse'] and transfer.employee_from_id:
-                    domain = [
-                        ('nomenclature_id', '=', self.nomenclature_id.id),
-                        ('location_type', '=', 'employee'),
-                        ('employee_id', '=', transfer.employee_from_id.id),
-                        ('company_id', 'in', company_ids),
-                        ('qty_available', '>', 0)
-                    ]
-                    balances = Balance.search(domain)
-                    available_qty = sum(balance.qty_available for balance in balances)
                     location_name = transfer.employee_from_id.name
                 else:
-                    available_qty = 0.0
                     location_name = 'Невідомо'
+                available_qty = self.available_qty if location_name != 'Невідомо' else 0.0
                 
                 # Показуємо повідомлення з доступною кількістю
                 if available_qty > 0: